@@ -0,0 +1,246 @@
+"""
+IPC empalmado base dic-2016 (lo que hace Inflacion.ipynb), CER diario y deflactor diario.
+
+    - `empalmar` encadena los tramos de TRAMOS de cualquier base: cada tramo se usa desde su
+      fecha `desde` y los anteriores se reescalan con el factor de enlace del mes `desde`,
+      en el que se solapan con el tramo siguiente (cociente de los dos índices ese mes).
+      No hay constantes a mano (antes, 1350.48 = IPC San Luis de dic-2016).
+    - `conciliar_cer` compara la variación mensual del CER (BCRA, diario) con la inflación
+      del índice empalmado y elige el rezago con el que mejor coinciden. El CER de cada mes
+      replica la inflación de unos meses antes, y entre 2007 y 2015 sigue al IPC del INDEC,
+      no al de San Luis.
+    - `indice_diario` interpola el índice mensual día por día en forma geométrica, como el
+      CER: cada mes se ancla en DIA_ANCLA (precio promedio del mes) y entre anclas crece a
+      tasa diaria constante. `deflactor_diario` es base / índice para cada día calendario,
+      y `deflactar` / `rendimientos_reales` lo aplican a cualquier serie diaria de precios
+      con una indexación por posición (días desde el primero) y una multiplicación.
+
+Uso:
+    python indice_inflacion.py                # reescribe df_comb.csv y guarda deflactor_diario.parquet
+    python indice_inflacion.py --benchmark
+"""
+import argparse
+import importlib.util
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(CARPETA)
+RUTA_DF_COMB = "df_comb.csv"
+RUTA_CER = "diario diar_cer 2002.xls"
+RUTA_DEFLACTOR = "deflactor_diario.parquet"
+
+# Tramos del más viejo al más nuevo. 'desde': primer mes en que se usa el tramo (tiene que
+# solaparse con el anterior ese mes). Tramo 2 (San Luis) reemplaza al INDEC desde la
+# intervención de 2007; tramo 3 es el IPC nacional base dic-2016.
+TRAMOS = [
+    {"archivo": "IpcTramo1.csv", "columna": "indice_tramo1"},
+    {"archivo": "IpcTramo2.csv", "columna": "indice_tramo2", "desde": "2007-01-01"},
+    {"archivo": "IpcTramo3.csv", "columna": "indice_tramo3", "desde": "2016-12-01"},
+]
+FECHA_BASE = "2016-12-01"
+COLUMNA_BASE = "base_2016_12"
+
+DIA_ANCLA = 15
+REZAGOS_CER = range(0, 4)
+
+
+def leer_tramos(carpeta=CARPETA, tramos=TRAMOS):
+    """DataFrame mensual (índice fecha) con una columna por tramo."""
+    series = []
+    for tramo in tramos:
+        df = pd.read_csv(os.path.join(carpeta, tramo["archivo"]), parse_dates=["fecha"])
+        series.append(df.set_index("fecha")[tramo["columna"]])
+    return pd.concat(series, axis=1).sort_index()
+
+
+def empalmar(df_tramos, tramos=TRAMOS, fecha_base=FECHA_BASE):
+    """
+    Índice encadenado (base `fecha_base` = 100) de las columnas de `df_tramos`. Devuelve
+    (índice, factores de enlace por tramo).
+    """
+    columnas = [t["columna"] for t in tramos]
+    desde = [pd.Timestamp(t["desde"]) if "desde" in t else df_tramos[t["columna"]].first_valid_index()
+             for t in tramos]
+
+    # Factores acumulados hacia atrás (numerador / denominador): el tramo más nuevo queda en su escala
+    numeradores, denominadores = np.ones(len(tramos)), np.ones(len(tramos))
+    for i in range(len(tramos) - 2, -1, -1):
+        nuevo, viejo = df_tramos.at[desde[i + 1], columnas[i + 1]], df_tramos.at[desde[i + 1], columnas[i]]
+        if pd.isna(nuevo) or pd.isna(viejo):
+            raise ValueError(f"Los tramos {columnas[i]} y {columnas[i + 1]} no se solapan en {desde[i + 1]:%Y-%m}")
+        numeradores[i] = numeradores[i + 1] * nuevo
+        denominadores[i] = denominadores[i + 1] * viejo
+
+    # Tramo vigente en cada mes: el último cuyo 'desde' ya pasó
+    vigente = np.searchsorted(np.array(desde, dtype="datetime64[ns]"), df_tramos.index.to_numpy(), side="right") - 1
+    vigente = np.maximum(vigente, 0)
+    valores = df_tramos[columnas].to_numpy(float) / denominadores * numeradores
+    indice = pd.Series(valores[np.arange(len(valores)), vigente], index=df_tramos.index, name=COLUMNA_BASE)
+    indice = indice * (100 / indice.at[pd.Timestamp(fecha_base)])
+    return indice, pd.Series(numeradores / denominadores, index=columnas, name="factor_enlace")
+
+
+def df_comb(carpeta=CARPETA):
+    """Mismas columnas que df_comb.csv del notebook: los tramos y base_2016_12."""
+    tramos = leer_tramos(carpeta)
+    indice, _ = empalmar(tramos)
+    return tramos.assign(**{COLUMNA_BASE: indice}).reset_index()
+
+
+# --- CER ---
+
+def _leer_planilla(ruta, hoja=0):
+    """Hoja de un Excel desde la caché en parquet de planillas.py (en la raíz del repo)."""
+    spec = importlib.util.spec_from_file_location("planillas", os.path.join(RAIZ, "planillas.py"))
+    planillas = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(planillas)
+    return planillas.leer_planilla(ruta, hoja)
+
+
+def leer_cer(ruta=None):
+    """CER diario del BCRA (base 2.2.2002 = 1) como Serie indexada por fecha."""
+    crudo = _leer_planilla(ruta or os.path.join(CARPETA, RUTA_CER))
+    fechas = pd.to_datetime(crudo[0], format="%d/%m/%Y", errors="coerce")
+    validas = fechas.notna()
+    return pd.Series(pd.to_numeric(crudo.loc[validas, 1], errors="coerce").to_numpy(),
+                     index=pd.DatetimeIndex(fechas[validas], name="fecha"), name="cer").dropna()
+
+
+def conciliar_cer(indice_mensual, cer, rezagos=REZAGOS_CER):
+    """
+    Inflación mensual del índice empalmado contra la variación del CER entre el día 6 de un
+    mes y el del siguiente (el CER ajusta del 6 al 5). Devuelve (DataFrame mensual con las
+    dos variaciones al rezago elegido, rezago en meses, tabla de error por rezago).
+    """
+    dias_6 = cer[cer.index.day == 6]
+    variacion_cer = dias_6.pct_change()
+    variacion_cer.index = variacion_cer.index.to_period("M").to_timestamp()
+    inflacion = indice_mensual.pct_change()
+
+    errores = {}
+    for rezago in rezagos:
+        alineada = inflacion.shift(rezago).reindex(variacion_cer.index)
+        errores[rezago] = (variacion_cer - alineada).abs().median()
+    rezago = min(errores, key=errores.get)
+    conciliacion = pd.DataFrame({"variacion_cer": variacion_cer,
+                                 "inflacion_rezagada": inflacion.shift(rezago).reindex(variacion_cer.index)})
+    conciliacion["diferencia"] = conciliacion["variacion_cer"] - conciliacion["inflacion_rezagada"]
+    return conciliacion.dropna(), rezago, pd.Series(errores, name="mediana_error_absoluto")
+
+
+# --- Diario ---
+
+def indice_diario(indice_mensual, dia_ancla=DIA_ANCLA, hasta=None):
+    """
+    Índice para cada día calendario: interpolación geométrica entre los valores mensuales
+    anclados en el día `dia_ancla`. Antes de la primera ancla y después de la última se
+    extiende con la tasa diaria del mes más cercano (hasta `hasta`).
+    """
+    mensual = indice_mensual.dropna()
+    anclas = (mensual.index + pd.Timedelta(days=dia_ancla - 1)).to_numpy("datetime64[D]").astype(np.int64)
+    log_indice = np.log(mensual.to_numpy(float))
+    inicio = anclas[0] - dia_ancla + 1
+    fin = pd.Timestamp(hasta).to_datetime64().astype("datetime64[D]").astype(np.int64) if hasta else anclas[-1] + 31
+    dias = np.arange(inicio, fin + 1)
+
+    # np.interp no extrapola: se agregan anclas ficticias con la pendiente de los extremos
+    pendiente_inicial = (log_indice[1] - log_indice[0]) / (anclas[1] - anclas[0])
+    pendiente_final = (log_indice[-1] - log_indice[-2]) / (anclas[-1] - anclas[-2])
+    x = np.r_[dias[0], anclas, dias[-1]]
+    y = np.r_[log_indice[0] - pendiente_inicial * (anclas[0] - dias[0]), log_indice,
+              log_indice[-1] + pendiente_final * (dias[-1] - anclas[-1])]
+    fechas = pd.DatetimeIndex(dias.astype("datetime64[D]").astype("datetime64[ns]"), name="fecha")
+    return pd.Series(np.exp(np.interp(dias, x, y)), index=fechas, name="indice_diario")
+
+
+def deflactor_diario(indice_mensual, fecha_base=FECHA_BASE, **kwargs):
+    """DataFrame por día calendario con indice_diario y deflactor (multiplica precios nominales -> base)."""
+    diario = indice_diario(indice_mensual, **kwargs)
+    base = indice_mensual.at[pd.Timestamp(fecha_base)]
+    return pd.DataFrame({"indice_diario": diario, "deflactor": base / diario})
+
+
+def deflactar(fechas, precios, deflactor):
+    """Precios en moneda de la base. `deflactor`: salida de `deflactor_diario` (días consecutivos)."""
+    dias = pd.DatetimeIndex(fechas).normalize().to_numpy("datetime64[D]").astype(np.int64)
+    primero = deflactor.index[0].to_datetime64().astype("datetime64[D]").astype(np.int64)
+    posiciones = dias - primero
+    fuera = (posiciones < 0) | (posiciones >= len(deflactor))
+    factores = deflactor["deflactor"].to_numpy()[np.clip(posiciones, 0, len(deflactor) - 1)]
+    factores[fuera] = np.nan
+    return np.asarray(precios, dtype=float) * factores
+
+
+def rendimientos_reales(precios, deflactor):
+    """Rendimientos logarítmicos reales de una Serie de precios nominales indexada por fecha."""
+    reales = deflactar(precios.index, precios.to_numpy(), deflactor)
+    return pd.Series(np.log(reales), index=precios.index).diff().rename("rendimiento_real")
+
+
+def procesar(carpeta=CARPETA):
+    """Reescribe df_comb.csv con el empalme y guarda deflactor_diario.parquet; informa la conciliación con el CER."""
+    comb = df_comb(carpeta)
+    comb.to_csv(os.path.join(carpeta, RUTA_DF_COMB), index=False)
+    indice = comb.set_index("fecha")[COLUMNA_BASE]
+    _, factores = empalmar(leer_tramos(carpeta))
+    print("INFO: factores de enlace " + ", ".join(f"{c} {f:.6g}" for c, f in factores.items()))
+
+    cer = leer_cer(os.path.join(carpeta, RUTA_CER))
+    conciliacion, rezago, errores = conciliar_cer(indice, cer)
+    print(f"INFO: CER vs IPC empalmado: rezago {rezago} meses, mediana |diferencia| "
+          f"{errores[rezago] * 100:.2f} p.p. mensuales")
+    por_periodo = conciliacion["diferencia"].abs().groupby(
+        pd.cut(conciliacion.index.year, [2001, 2006, 2016, 2100], labels=["2002-2006", "2007-2016", "2017-"])
+    ).median()
+    for periodo, valor in por_periodo.items():
+        print(f"    {periodo}: {valor * 100:.2f} p.p.")
+
+    # Después del último IPC se extiende con la inflación del último mes, hasta donde llega el CER
+    deflactor = deflactor_diario(indice, hasta=cer.index.max())
+    deflactor.reset_index().to_parquet(os.path.join(carpeta, RUTA_DEFLACTOR), index=False)
+    print(f"✅ {RUTA_DF_COMB} y {RUTA_DEFLACTOR} ({len(deflactor)} días) guardados")
+    return comb, deflactor
+
+
+def benchmark(carpeta=CARPETA, ruta_precios=os.path.join("..", "00-Cotizacion", "GGAL.csv")):
+    """Rendimientos reales de GGAL: búsqueda mensual fila por fila contra el deflactor diario."""
+    precios = pd.read_csv(os.path.join(carpeta, ruta_precios), usecols=["Date", "Close"])
+    precios = pd.Series(precios["Close"].to_numpy(),
+                        index=pd.DatetimeIndex(pd.to_datetime(precios["Date"].str[:10]), name="fecha"))
+    indice = df_comb(carpeta).set_index("fecha")[COLUMNA_BASE]
+
+    inicio = time.perf_counter()
+    mensual = indice.to_dict()
+    base = indice.at[pd.Timestamp(FECHA_BASE)]
+    reales = [p * base / mensual.get(f.replace(day=1), np.nan) for f, p in precios.items()]
+    fila_por_fila = np.log(pd.Series(reales, index=precios.index)).diff()
+    t_filas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    deflactor = deflactor_diario(indice)
+    t_preparar = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    vectorizado = rendimientos_reales(precios, deflactor)
+    t_vectorizado = time.perf_counter() - inicio
+
+    print(f"GGAL: {len(precios)} ruedas ({precios.index.min():%Y-%m-%d} a {precios.index.max():%Y-%m-%d})")
+    print(f"  búsqueda mensual fila por fila: {t_filas * 1000:8.2f} ms")
+    print(f"  deflactor diario (una vez):     {t_preparar * 1000:8.2f} ms")
+    print(f"  rendimientos reales vectorizado:{t_vectorizado * 1000:8.2f} ms (x{t_filas / t_vectorizado:.0f})")
+    print(f"  desvío de rendimientos reales diario vs mensual escalonado: "
+          f"{vectorizado.std():.5f} vs {fila_por_fila.std():.5f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="IPC empalmado, conciliación con el CER y deflactor diario")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        procesar()
@@ -0,0 +1,242 @@
+"""
+Almacenamiento compacto de df_opciones: dataset parquet con tipos chicos, ordenado por fecha.
+
+    - Serie como diccionario (cada serie se repite en muchas ruedas),
+    - precios, porcentajes y deltas en float32 (2-3 decimales en los informes),
+      Lotes en int32, Volumen_$ en float64 (supera los 1.000 millones), opcion y Mes_Vto en int8,
+    - filas ordenadas por Fecha / Mes_Vto / strike en un solo archivo zstd con row groups
+      grandes (FILAS_POR_ROW_GROUP) y page index: las estadísticas min/max de cada row group
+      y de cada página permiten saltear lo que no cumple el filtro de fechas.
+
+No se particiona por año: con ~8.000 filas por año, los archivos y row groups chicos
+comprimían peor y el dataset quedaba más grande que df_opciones.parquet.
+
+`consultar_opciones` arma un filtro de pyarrow con fechas, strikes, vencimientos y tipo de opción:
+pyarrow descarta los row groups que no pueden cumplir el filtro, sin cargarlos.
+
+Uso:
+    python almacen_opciones.py [df_opciones.parquet] [--destino df_opciones]
+    python almacen_opciones.py --benchmark
+"""
+import argparse
+import io
+import multiprocessing
+import numbers
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+RUTA_DATASET = "df_opciones"
+# Row groups grandes comprimen mejor; el filtro fino lo dan las estadísticas de página (page index)
+FILAS_POR_ROW_GROUP = 65536
+NIVEL_ZSTD = 9
+
+ESQUEMA = pa.schema([
+    ("Fecha", pa.timestamp("ns")),
+    ("Serie", pa.dictionary(pa.int32(), pa.string())),
+    ("Ultimo_Precio", pa.float32()),
+    ("Variacion_%", pa.float32()),
+    ("Min", pa.float32()),
+    ("Max", pa.float32()),
+    ("Lotes", pa.int32()),
+    ("Volumen_$", pa.float64()),
+    ("Ult_Precio/Cotiz_sub_%", pa.float32()),
+    ("Prima_Teorica", pa.float32()),
+    ("Delta", pa.float32()),
+    ("Efec_Palanca", pa.float32()),
+    ("Volat_Implicita_%", pa.float32()),
+    ("Delta_Implic", pa.float32()),
+    ("strike", pa.float32()),
+    ("opcion", pa.int8()),
+    ("Mes_Vto", pa.int8()),
+])
+
+
+def guardar_opciones(df, ruta_dataset=RUTA_DATASET):
+    """
+    Escribe `df` (columnas de df_opciones) en `ruta_dataset`, reemplazando lo que hubiera.
+    Devuelve la cantidad de archivos escritos.
+    """
+    df = df.sort_values(["Fecha", "Mes_Vto", "strike"], kind="stable")
+    tabla = pa.Table.from_pandas(df[ESQUEMA.names], schema=ESQUEMA, preserve_index=False)
+
+    temporal = ruta_dataset + ".tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    archivos = []
+    ds.write_dataset(
+        tabla, temporal, format="parquet",
+        max_rows_per_group=FILAS_POR_ROW_GROUP, min_rows_per_group=FILAS_POR_ROW_GROUP,
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd", compression_level=NIVEL_ZSTD,
+                                                               write_page_index=True),
+        basename_template="parte-{i}.parquet", file_visitor=lambda f: archivos.append(f.path),
+    )
+    shutil.rmtree(ruta_dataset, ignore_errors=True)
+    os.replace(temporal, ruta_dataset)
+    return len(archivos)
+
+
+def _filtro(desde=None, hasta=None, strike_min=None, strike_max=None, mes_vto=None, opcion=None):
+    """Expresión de pyarrow para los filtros."""
+    condiciones = []
+    if desde is not None:
+        desde = pd.Timestamp(desde)
+        condiciones.append(ds.field("Fecha") >= desde)
+    if hasta is not None:
+        hasta = pd.Timestamp(hasta)
+        condiciones.append(ds.field("Fecha") <= hasta)
+    if strike_min is not None:
+        condiciones.append(ds.field("strike") >= strike_min)
+    if strike_max is not None:
+        condiciones.append(ds.field("strike") <= strike_max)
+    if mes_vto is not None:
+        # np.int8 / np.int32 (ej. df["Mes_Vto"].iloc[0]) también son un solo mes
+        meses = [int(mes_vto)] if isinstance(mes_vto, numbers.Integral) else [int(m) for m in mes_vto]
+        condiciones.append(ds.field("Mes_Vto").isin(meses))
+    if opcion is not None:
+        condiciones.append(ds.field("opcion") == int(opcion))
+
+    filtro = None
+    for condicion in condiciones:
+        filtro = condicion if filtro is None else filtro & condicion
+    return filtro
+
+
+def dataset_opciones(ruta_dataset=RUTA_DATASET):
+    return ds.dataset(ruta_dataset, format="parquet")
+
+
+def consultar_opciones(ruta_dataset=RUTA_DATASET, desde=None, hasta=None, strike_min=None, strike_max=None,
+                  mes_vto=None, opcion=None, columnas=None):
+    """
+    Opciones de `ruta_dataset` que cumplen los filtros (todos opcionales):
+        desde / hasta          fechas de rueda (inclusive)
+        strike_min / strike_max
+        mes_vto                número de mes o lista de meses
+        opcion                 1 compra, 2 venta
+    `columnas` limita las columnas leídas. Serie vuelve como categoría.
+    """
+    filtro = _filtro(desde, hasta, strike_min, strike_max, mes_vto, opcion)
+    columnas = columnas or ESQUEMA.names
+    tabla = dataset_opciones(ruta_dataset).to_table(columns=columnas, filter=filtro)
+    return tabla.to_pandas()
+
+
+def row_groups_leidos(ruta_dataset=RUTA_DATASET, **filtros):
+    """(row groups que hay que leer para `filtros`, row groups totales del dataset)."""
+    dataset = dataset_opciones(ruta_dataset)
+    filtro = _filtro(**filtros)
+    total = sum(f.num_row_groups for f in dataset.get_fragments())
+    leidos = sum(len(f.split_by_row_group(filtro)) for f in dataset.get_fragments(filter=filtro))
+    return leidos, total
+
+
+def _consulta_pandas(ruta_parquet, filtros):
+    """Como hoy: se carga df_opciones.parquet completo y se filtra en pandas."""
+    df = pd.read_parquet(ruta_parquet)
+    mascara = pd.Series(True, index=df.index)
+    if "desde" in filtros:
+        mascara &= df["Fecha"] >= filtros["desde"]
+    if "hasta" in filtros:
+        mascara &= df["Fecha"] <= filtros["hasta"]
+    if "mes_vto" in filtros:
+        mascara &= df["Mes_Vto"] == filtros["mes_vto"]
+    if "strike_min" in filtros:
+        mascara &= df["strike"] >= filtros["strike_min"]
+    if "strike_max" in filtros:
+        mascara &= df["strike"] <= filtros["strike_max"]
+    return df[mascara]
+
+
+def _medir(funcion, *args):
+    """
+    Corre la consulta y devuelve (filas, segundos, pico de memoria en bytes). El pico suma
+    la memoria de arrow (max_memory del pool) y la de numpy/pandas (tracemalloc).
+    """
+    # Calentamiento: que los imports diferidos de pandas/pyarrow no cuenten como memoria de la consulta
+    tabla = pa.table({"Serie": pa.array(["GFGC1.0EN"]).dictionary_encode(), "x": pa.array([1.0], pa.float32())})
+    buffer = io.BytesIO()
+    pq.write_table(tabla, buffer)
+    pd.read_parquet(io.BytesIO(buffer.getvalue()))
+
+    pool = pa.default_memory_pool()
+    arrow_antes = pool.bytes_allocated()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    df = funcion(*args)
+    duracion = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] + max(pool.max_memory() - arrow_antes, 0)
+    tracemalloc.stop()
+    return len(df), duracion, pico
+
+
+def _medir_en_proceso(funcion, *args):
+    """`_medir` en un proceso nuevo ('spawn'), para que el pico de arrow no arrastre consultas anteriores."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_medir, funcion, *args).result()
+
+
+def _leer_con_filtros(ruta_dataset, filtros):
+    return consultar_opciones(ruta_dataset, **filtros)
+
+
+def _tamanio(ruta):
+    if os.path.isfile(ruta):
+        return os.path.getsize(ruta)
+    return sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(ruta) for f in fs)
+
+
+def benchmark(ruta_parquet="df_opciones.parquet"):
+    """
+    Tamaño en disco, tiempo y memoria: df_opciones.parquet completo + filtro en pandas contra
+    consultar_opciones. El dataset se arma de nuevo en una carpeta temporal; falla si ocupa
+    más que `ruta_parquet`.
+    """
+    carpeta = tempfile.mkdtemp(prefix="bench_opciones_")
+    try:
+        _benchmark(ruta_parquet, os.path.join(carpeta, RUTA_DATASET))
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def _benchmark(ruta_parquet, ruta_dataset):
+    guardar_opciones(pd.read_parquet(ruta_parquet), ruta_dataset)
+    origen, dataset = _tamanio(ruta_parquet), _tamanio(ruta_dataset)
+    print(f"En disco: {ruta_parquet} {origen / 1e6:.2f} MB | dataset {dataset / 1e6:.2f} MB "
+          f"({dataset / origen:.2f}x)")
+    assert dataset <= origen, f"El dataset ({dataset} bytes) ocupa más que {ruta_parquet} ({origen} bytes)"
+
+    consultas = {
+        "todo": {},
+        "un mes": {"desde": "2023-03-01", "hasta": "2023-03-31"},
+        "2021, vto abril, strike 100-200": {"desde": "2021-01-01", "hasta": "2021-12-31", "mes_vto": 4,
+                                           "strike_min": 100, "strike_max": 200},
+    }
+    for nombre, filtros in consultas.items():
+        filas, t_antes, pico_antes = _medir_en_proceso(_consulta_pandas, ruta_parquet, filtros)
+        filas_despues, t_despues, pico_despues = _medir_en_proceso(_leer_con_filtros, ruta_dataset, filtros)
+        assert filas == filas_despues, (nombre, filas, filas_despues)
+        leidos, total = row_groups_leidos(ruta_dataset, **filtros)
+        print(f"{nombre:>32}: {filas:6d} filas | pandas {t_antes:5.2f}s, pico {pico_antes / 1e6:5.1f} MB | "
+              f"pyarrow {t_despues:5.2f}s, pico {pico_despues / 1e6:5.1f} MB | row groups {leidos}/{total}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dataset compacto y particionado de df_opciones")
+    parser.add_argument("parquet", nargs="?", default="df_opciones.parquet")
+    parser.add_argument("--destino", default=RUTA_DATASET)
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.parquet)
+    else:
+        n = guardar_opciones(pd.read_parquet(args.parquet), args.destino)
+        print(f"✅ {n} archivos guardados en {args.destino}")
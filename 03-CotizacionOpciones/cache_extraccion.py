@@ -0,0 +1,135 @@
+"""
+Caché de la extracción de PDFs, para que agregar un informe no obligue a re-extraer todo el archivo.
+
+Cada PDF se identifica por su hash SHA-256 y la versión del extractor. Sólo se
+vuelven a procesar los PDFs nuevos, los que cambiaron de contenido o los que se
+extrajeron con otra versión del extractor. Los errores (PDFs sin fecha o que no se
+pudieron abrir) también quedan guardados, para no re-intentarlos en cada corrida.
+
+La caché es un SQLite dentro de la carpeta del dataset (`_cache_extraccion.sqlite`);
+pyarrow ignora los archivos que empiezan con '_' al leer el dataset.
+"""
+import os
+import sqlite3
+from datetime import datetime
+
+from manifiesto_iamc import hash_archivo
+
+NOMBRE_CACHE = "_cache_extraccion.sqlite"
+
+ESTADO_OK = "ok"
+ESTADO_SIN_FECHA = "sin_fecha"
+ESTADO_ERROR = "error"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS extracciones (
+    ruta        TEXT PRIMARY KEY,
+    sha256      TEXT NOT NULL,
+    tamanio     INTEGER NOT NULL,
+    mtime       REAL NOT NULL,
+    version     INTEGER NOT NULL,
+    estado      TEXT NOT NULL,      -- ok, sin_fecha, error
+    fecha       TEXT,
+    archivo     TEXT,               -- parquet(s) con las filas del PDF dentro del dataset, uno por línea
+    paginas     INTEGER,
+    filas       INTEGER,
+    detalle     TEXT,
+    actualizado TEXT NOT NULL
+)
+"""
+
+
+class CacheExtraccion:
+    """Acceso a la caché de extracción de un dataset. Se puede usar como context manager."""
+
+    def __init__(self, ruta_dataset):
+        os.makedirs(ruta_dataset, exist_ok=True)
+        self.conexion = sqlite3.connect(os.path.join(ruta_dataset, NOMBRE_CACHE))
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute(_ESQUEMA)
+        self.conexion.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conexion.close()
+
+    def _registro(self, ruta):
+        fila = self.conexion.execute("SELECT * FROM extracciones WHERE ruta = ?", (os.path.abspath(ruta),)).fetchone()
+        return dict(fila) if fila else None
+
+    def hash_actual(self, ruta):
+        """
+        Hash del PDF. Si el tamaño y la fecha de modificación no cambiaron desde la
+        última corrida se reutiliza el hash guardado, sin volver a leer el archivo.
+        """
+        stat = os.stat(ruta)
+        registro = self._registro(ruta)
+        if registro and registro["tamanio"] == stat.st_size and registro["mtime"] == stat.st_mtime:
+            return registro["sha256"], stat
+        return hash_archivo(ruta), stat
+
+    def clasificar(self, pdfs, version):
+        """
+        Separa los PDFs en (a_procesar, vigentes). Un PDF está vigente si ya se extrajo
+        (o falló) con el mismo contenido y la misma versión del extractor.
+        `a_procesar` es una lista de (ruta, sha256, stat).
+        """
+        a_procesar, vigentes = [], []
+        for ruta in pdfs:
+            sha256, stat = self.hash_actual(ruta)
+            registro = self._registro(ruta)
+            if registro and registro["sha256"] == sha256 and registro["version"] == version:
+                vigentes.append(ruta)
+            else:
+                a_procesar.append((ruta, sha256, stat))
+        return a_procesar, vigentes
+
+    def archivos_anteriores(self, ruta):
+        """Parquets escritos en la corrida anterior para `ruta` (lista vacía si no hay)."""
+        registro = self._registro(ruta)
+        if not registro or not registro["archivo"]:
+            return []
+        return registro["archivo"].split("\n")
+
+    def registrar(self, ruta, sha256, stat, version, resultado):
+        """
+        Guarda el resultado de un extractor para `ruta`. El resultado trae `archivos`
+        (lista) o, como `extraer_pdf_a_parquet`, un único `archivo`.
+        """
+        if resultado["error"] is None:
+            estado, detalle = ESTADO_OK, None
+        elif resultado["error"] == ESTADO_SIN_FECHA:
+            estado, detalle = ESTADO_SIN_FECHA, None
+        else:
+            estado, detalle = ESTADO_ERROR, resultado["error"]
+        archivos = resultado.get("archivos") or ([resultado["archivo"]] if resultado.get("archivo") else [])
+        self.conexion.execute(
+            """
+            INSERT OR REPLACE INTO extracciones
+                (ruta, sha256, tamanio, mtime, version, estado, fecha, archivo, paginas, filas, detalle, actualizado)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (os.path.abspath(ruta), sha256, stat.st_size, stat.st_mtime, version, estado, resultado["fecha"],
+             "\n".join(archivos) or None, resultado["paginas"], resultado["filas"], detalle,
+             datetime.now().isoformat(timespec="seconds")),
+        )
+        self.conexion.commit()
+
+    def eliminar(self, ruta):
+        self.conexion.execute("DELETE FROM extracciones WHERE ruta = ?", (os.path.abspath(ruta),))
+        self.conexion.commit()
+
+    def rutas(self):
+        return [fila["ruta"] for fila in self.conexion.execute("SELECT ruta FROM extracciones")]
+
+    def errores(self):
+        """PDFs sin fecha (ruta) y PDFs con error (mensaje), como el txt de informes_sin_fecha."""
+        filas = self.conexion.execute(
+            "SELECT ruta, estado, detalle FROM extracciones WHERE estado != ? ORDER BY ruta", (ESTADO_OK,)
+        ).fetchall()
+        return [fila["ruta"] if fila["estado"] == ESTADO_SIN_FECHA else fila["detalle"] for fila in filas]
@@ -0,0 +1,172 @@
+"""
+Página local que imita el calendario de https://www.iamc.com.ar/informediario/
+para probar el scraper (y el pool de drivers) sin acceso a la red.
+
+Reproduce solamente el DOM que usa `scraper_iamc.py`:
+    - datepicker con las clases de jQuery UI (ui-datepicker-calendar, -month, -year, -prev, -next)
+      y los atributos data-month / data-year en cada celda de día
+    - un `jQuery('.hasDatepicker').datepicker('setDate', fecha)` mínimo para el salto directo de mes
+    - enlace <a><div class="descripcion">Informe Renta Fija DD/MM/AAAA</div></a> si hay informe
+    - <span class="sinInformes">No se encontraron Informes</span> si no lo hay
+    - un streamer de PDFs en /Handlers/BaseStreamer.ashx?fecha=AAAAMMDD
+
+Hay informe todos los días hábiles salvo los de FERIADOS_FALSOS.
+
+Uso:
+    python calendario_falso.py --puerto 8765
+"""
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Días hábiles sin informe, para ejercitar la rama "No se encontraron Informes"
+FERIADOS_FALSOS = {"0101", "0501", "0525", "0709", "1225"}
+
+PDF_FALSO = b"%PDF-1.4\n% informe falso\n"
+
+PAGINA = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Informe diario (falso)</title></head>
+<body>
+<div id="calendario" class="ui-datepicker hasDatepicker">
+  <div class="ui-datepicker-header">
+    <a class="ui-datepicker-prev" href="#">Ant</a>
+    <a class="ui-datepicker-next" href="#">Sig</a>
+    <div class="ui-datepicker-title">
+      <span class="ui-datepicker-month"></span> <span class="ui-datepicker-year"></span>
+    </div>
+  </div>
+  <table class="ui-datepicker-calendar"><tbody></tbody></table>
+</div>
+<div id="resultados"></div>
+<script>
+var MESES = ["enero","febrero","marzo","abril","mayo","junio","julio","agosto",
+             "septiembre","octubre","noviembre","diciembre"];
+var FERIADOS = %(feriados)s;
+var hoy = new Date();
+var visible = {anio: hoy.getFullYear(), mes: hoy.getMonth()};
+
+function dos(n) { return (n < 10 ? "0" : "") + n; }
+
+function dibujar() {
+  document.querySelector(".ui-datepicker-month").textContent = MESES[visible.mes];
+  document.querySelector(".ui-datepicker-year").textContent = visible.anio;
+  var cuerpo = document.querySelector(".ui-datepicker-calendar tbody");
+  var dias = new Date(visible.anio, visible.mes + 1, 0).getDate();
+  var html = "<tr>";
+  for (var d = 1; d <= dias; d++) {
+    html += '<td data-handler="selectDay" data-month="' + visible.mes + '" data-year="' + visible.anio + '">' +
+            '<a class="ui-state-default" href="#">' + d + '</a></td>';
+    if (d %% 7 === 0) html += "</tr><tr>";
+  }
+  cuerpo.innerHTML = html + "</tr>";
+}
+
+function mover(delta) {
+  var f = new Date(visible.anio, visible.mes + delta, 1);
+  visible = {anio: f.getFullYear(), mes: f.getMonth()};
+  dibujar();
+}
+
+function seleccionar(dia) {
+  var f = new Date(visible.anio, visible.mes, dia);
+  var clave = dos(f.getMonth() + 1) + dos(dia);
+  var res = document.getElementById("resultados");
+  var finde = f.getDay() === 0 || f.getDay() === 6;
+  if (finde || FERIADOS.indexOf(clave) >= 0) {
+    res.innerHTML = '<span class="sinInformes">No se encontraron Informes</span>';
+  } else {
+    var aaaammdd = f.getFullYear() + dos(f.getMonth() + 1) + dos(dia);
+    res.innerHTML = '<a href="/Handlers/BaseStreamer.ashx?fecha=' + aaaammdd + '">' +
+                    '<div class="descripcion">Informe Renta Fija ' + dos(dia) + "/" + dos(f.getMonth() + 1) + "/" +
+                    f.getFullYear() + '</div></a>';
+  }
+}
+
+// Imitación mínima de jQuery UI: sólo $('.hasDatepicker').datepicker('setDate', fecha)
+window.jQuery = function (selector) {
+  var nodos = document.querySelectorAll(selector);
+  return {
+    length: nodos.length,
+    datepicker: function (metodo, fecha) {
+      if (metodo === "setDate") { visible = {anio: fecha.getFullYear(), mes: fecha.getMonth()}; dibujar(); }
+      return this;
+    }
+  };
+};
+window.jQuery.fn = {datepicker: true};
+
+document.querySelector(".ui-datepicker-prev").onclick = function (e) { e.preventDefault(); mover(-1); };
+document.querySelector(".ui-datepicker-next").onclick = function (e) { e.preventDefault(); mover(1); };
+document.querySelector(".ui-datepicker-calendar").onclick = function (e) {
+  if (e.target.classList.contains("ui-state-default")) { e.preventDefault(); seleccionar(parseInt(e.target.textContent, 10)); }
+};
+dibujar();
+</script>
+</body></html>
+"""
+
+
+class _ManejadorCalendario(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") == "/informediario":
+            feriados = "[" + ",".join(f'"{f}"' for f in sorted(FERIADOS_FALSOS)) + "]"
+            self._responder(200, "text/html; charset=utf-8", (PAGINA % {"feriados": feriados}).encode("utf-8"))
+        elif url.path.lower() == "/handlers/basestreamer.ashx":
+            fecha = parse_qs(url.query).get("fecha", [""])[0]
+            try:
+                datetime.strptime(fecha, "%Y%m%d")
+            except ValueError:
+                self._responder(404, "text/plain", b"fecha invalida")
+                return
+            self._responder(200, "application/pdf", PDF_FALSO + fecha.encode())
+        else:
+            self._responder(404, "text/plain", b"no encontrado")
+
+    def _responder(self, estado, tipo, cuerpo):
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ServidorCalendario:
+    """Levanta el calendario falso en un hilo. `url_base` apunta a la página del calendario."""
+
+    def __init__(self, puerto=0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", puerto), _ManejadorCalendario)
+        self.httpd.daemon_threads = True
+        self._hilo = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url_base(self):
+        host, puerto = self.httpd.server_address[:2]
+        return f"http://{host}:{puerto}/informediario/"
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calendario falso del IAMC para pruebas offline")
+    parser.add_argument("--puerto", type=int, default=8765)
+    args = parser.parse_args()
+
+    with ServidorCalendario(args.puerto) as servidor:
+        print(f"Calendario falso en {servidor.url_base} (Ctrl+C para terminar)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,261 @@
+"""
+Descarga concurrente de los informes diarios del IAMC.
+
+El navegador (ver `import os.py`) se usa solamente para resolver la URL del PDF
+de cada fecha. Las descargas se hacen después, en paralelo, con una única
+`requests.Session` cuyo pool de conexiones se reutiliza entre hilos, con una
+cantidad acotada de pedidos en vuelo y reintentos con backoff exponencial.
+
+Se respeta la convención de nombres `InformeRentaFija_YYYYMMDD.pdf` y las
+carpetas por mes (`IAMC_Informes_AAAA/MM_Mes`).
+
+Uso:
+    python descarga_iamc.py --benchmark            # mide PDFs/s contra un servidor local
+    python descarga_iamc.py --benchmark --n 400 --workers 1 4 16
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+# El sitio del IAMC se descargaba con verify=False; evitamos una advertencia por PDF
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# === CONFIGURACIÓN ===
+MAX_DESCARGAS_SIMULTANEAS = 8  # Pedidos en vuelo como máximo
+REINTENTOS = 4                 # Intentos adicionales ante errores de red o 429/5xx
+BACKOFF_BASE = 0.5             # Segundos; la espera crece como BACKOFF_BASE * 2**intento
+TIMEOUT = 30
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
+
+# Diccionario para mapear número de mes a nombre del mes en español para las carpetas
+NOMBRES_MESES = {
+    1: "01_Enero", 2: "02_Febrero", 3: "03_Marzo", 4: "04_Abril",
+    5: "05_Mayo", 6: "06_Junio", 7: "07_Julio", 8: "08_Agosto",
+    9: "09_Septiembre", 10: "10_Octubre", 11: "11_Noviembre", 12: "12_Diciembre"
+}
+
+
+def nombre_informe(fecha):
+    return f"InformeRentaFija_{fecha.strftime('%Y%m%d')}.pdf"
+
+
+def carpeta_mes(fecha, carpeta_base=None):
+    """Carpeta del mes de `fecha`; por defecto dentro de IAMC_Informes_AAAA."""
+    if carpeta_base is None:
+        carpeta_base = f"IAMC_Informes_{fecha.year}"
+    return os.path.join(carpeta_base, NOMBRES_MESES[fecha.month])
+
+
+def ruta_informe(fecha, carpeta_base=None):
+    return os.path.join(carpeta_mes(fecha, carpeta_base), nombre_informe(fecha))
+
+
+def crear_sesion(max_conexiones=MAX_DESCARGAS_SIMULTANEAS):
+    """
+    Sesión HTTP con un pool de conexiones del tamaño de la concurrencia,
+    para que cada hilo reutilice una conexión keep-alive en lugar de abrir una nueva.
+    """
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=max_conexiones, pool_maxsize=max_conexiones)
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    sesion.headers.update(HEADERS)
+    sesion.verify = False
+    return sesion
+
+
+def descargar_pdf(sesion, url, ruta_destino, reintentos=REINTENTOS, backoff=BACKOFF_BASE, timeout=TIMEOUT):
+    """
+    Descarga `url` en `ruta_destino` reintentando con backoff exponencial (con jitter)
+    ante errores de red y respuestas 429/5xx.
+
+    El archivo se escribe primero como `.part` y se renombra al terminar, de modo que
+    nunca queda un PDF a medio escribir con el nombre definitivo.
+
+    Devuelve un dict con url, ruta, estado_http, bytes, intentos y error (None si tuvo éxito).
+    Los errores al escribir el archivo (OSError) también se devuelven en `error`.
+    """
+    resultado = {"url": url, "ruta": ruta_destino, "estado_http": None, "bytes": 0, "intentos": 0, "error": None}
+    ruta_temporal = f"{ruta_destino}.part"
+    try:
+        os.makedirs(os.path.dirname(ruta_destino) or ".", exist_ok=True)
+    except OSError as e:
+        resultado["error"] = f"{type(e).__name__}: {e}"
+        return resultado
+
+    for intento in range(reintentos + 1):
+        resultado["intentos"] = intento + 1
+        try:
+            with sesion.get(url, stream=True, timeout=timeout) as response:
+                resultado["estado_http"] = response.status_code
+                if response.status_code in ESTADOS_REINTENTABLES:
+                    raise requests.exceptions.HTTPError(f"HTTP {response.status_code}", response=response)
+                response.raise_for_status()
+
+                bytes_escritos = 0
+                with open(ruta_temporal, 'wb') as pdf_file:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        pdf_file.write(chunk)
+                        bytes_escritos += len(chunk)
+            os.replace(ruta_temporal, ruta_destino)
+            resultado["bytes"] = bytes_escritos
+            resultado["error"] = None
+            return resultado
+        except requests.exceptions.RequestException as e:
+            resultado["error"] = f"{type(e).__name__}: {e}"
+            estado = resultado["estado_http"]
+            # Un 4xx distinto de 429 no se arregla reintentando
+            if estado is not None and 400 <= estado < 500 and estado not in ESTADOS_REINTENTABLES:
+                break
+            if intento < reintentos:
+                time.sleep(backoff * (2 ** intento) * (1 + random.random() * 0.5))
+        except OSError as e:
+            # Error local al escribir (disco lleno, permisos): no se arregla reintentando
+            resultado["error"] = f"{type(e).__name__}: {e}"
+            break
+
+    try:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+    except OSError:
+        pass
+    return resultado
+
+
+def descargar_en_paralelo(tareas, max_workers=MAX_DESCARGAS_SIMULTANEAS, sesion=None, verbose=True, **kwargs_descarga):
+    """
+    Descarga en paralelo una lista de tareas `(fecha, url, ruta_destino)`.
+
+    Como mucho hay `max_workers` pedidos en vuelo. Las tareas cuyo PDF ya existe se saltan.
+    Devuelve la lista de resultados de `descargar_pdf`, cada uno con la clave `fecha` agregada.
+    """
+    tareas = [t for t in tareas if not os.path.exists(t[2])]
+    if not tareas:
+        return []
+
+    cerrar_sesion = sesion is None
+    if sesion is None:
+        sesion = crear_sesion(max_workers)
+
+    resultados = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futuros = {
+                pool.submit(descargar_pdf, sesion, url, ruta, **kwargs_descarga): fecha
+                for fecha, url, ruta in tareas
+            }
+            for futuro in as_completed(futuros):
+                fecha = futuros[futuro]
+                resultado = futuro.result()
+                resultado["fecha"] = fecha
+                resultados.append(resultado)
+                if resultado["error"]:
+                    print(f"ERROR: Falló la descarga para {fecha.strftime('%d-%m-%Y')} tras {resultado['intentos']} intentos: {resultado['error']}")
+                elif verbose:
+                    print(f"ÉXITO: PDF descargado y guardado como: {os.path.basename(resultado['ruta'])}")
+    finally:
+        if cerrar_sesion:
+            sesion.close()
+
+    return resultados
+
+
+# === SERVIDOR LOCAL PARA BENCHMARK ===
+
+class _ManejadorStub(BaseHTTPRequestHandler):
+    """Sirve un PDF falso por URL, con latencia y tasa de errores 503 configurables."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        servidor = self.server
+        time.sleep(servidor.latencia)
+        if random.random() < servidor.tasa_error:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(servidor.contenido)))
+        self.end_headers()
+        self.wfile.write(servidor.contenido)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ServidorStub:
+    """
+    Servidor HTTP local que imita al streamer de PDFs del IAMC, para medir el
+    throughput de descarga sin acceso a la red.
+    """
+
+    def __init__(self, latencia=0.05, tasa_error=0.0, tamanio_kb=200):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ManejadorStub)
+        self.httpd.daemon_threads = True
+        self.httpd.latencia = latencia
+        self.httpd.tasa_error = tasa_error
+        self.httpd.contenido = b"%PDF-1.4\n" + os.urandom(tamanio_kb * 1024)
+        self._hilo = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url_base(self):
+        host, puerto = self.httpd.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def benchmark(n=200, lista_workers=(1, 4, 8, 16), latencia=0.05, tasa_error=0.02):
+    """Mide PDFs/s descargando `n` informes falsos con distintas concurrencias (en una carpeta temporal)."""
+    carpeta = tempfile.mkdtemp(prefix="bench_descargas_")
+    fechas = [datetime(2000, 1, 1) + timedelta(days=i) for i in range(n)]
+    try:
+        with ServidorStub(latencia=latencia, tasa_error=tasa_error) as servidor:
+            print(f"Servidor stub en {servidor.url_base} (latencia={latencia}s, errores={tasa_error:.0%})")
+            for workers in lista_workers:
+                destino = os.path.join(carpeta, f"workers_{workers}")
+                tareas = [
+                    (f, f"{servidor.url_base}/handlers/BaseStreamer.ashx?id={f.strftime('%Y%m%d')}", ruta_informe(f, destino))
+                    for f in fechas
+                ]
+                inicio = time.perf_counter()
+                resultados = descargar_en_paralelo(tareas, max_workers=workers, verbose=False, backoff=0.05)
+                duracion = time.perf_counter() - inicio
+                fallidos = sum(1 for r in resultados if r["error"])
+                print(f"workers={workers:>3}: {n} PDFs en {duracion:6.2f}s -> {n / duracion:7.1f} PDFs/s (fallidos: {fallidos})")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Descarga concurrente de informes del IAMC")
+    parser.add_argument("--benchmark", action="store_true", help="Medir throughput contra un servidor local")
+    parser.add_argument("--n", type=int, default=200, help="Cantidad de PDFs del benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--latencia", type=float, default=0.05, help="Latencia simulada por pedido (s)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(n=args.n, lista_workers=args.workers, latencia=args.latencia)
+    else:
+        parser.print_help()
@@ -0,0 +1,50 @@
+"""
+Esperas por eventos para el scraper del IAMC, en lugar de `time.sleep` fijos.
+
+- Condiciones de WebDriverWait que se resuelven apenas cambia el DOM.
+- `Cronometro`: tiempos por etapa de cada fecha, para ver dónde se van los segundos.
+"""
+import time
+from contextlib import contextmanager
+
+
+class texto_distinto_de:
+    """Condición de WebDriverWait: el texto del elemento `localizador` es distinto de `texto_anterior`."""
+
+    def __init__(self, localizador, texto_anterior):
+        self.localizador = localizador
+        self.texto_anterior = texto_anterior
+
+    def __call__(self, driver):
+        try:
+            texto = driver.find_element(*self.localizador).text
+        except Exception:
+            return False
+        return texto if texto and texto != self.texto_anterior else False
+
+
+class Cronometro:
+    """
+    Acumula la duración de cada etapa del procesamiento de una fecha:
+
+        crono = Cronometro()
+        with crono.etapa("navegacion"):
+            ...
+        crono.tiempos  # {"navegacion": 0.42, ...}
+    """
+
+    def __init__(self):
+        self.tiempos = {}
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tiempos[nombre] = self.tiempos.get(nombre, 0.0) + time.perf_counter() - inicio
+
+    def total(self):
+        self.tiempos["total"] = time.perf_counter() - self._inicio
+        return self.tiempos
@@ -0,0 +1,274 @@
+"""
+ETL de las series de opciones GFG (lo que hace ETL_opciones.ipynb), vectorizado.
+
+    - la serie (ej. 'GFGC15.0FE') se separa en opcion / strike / Mes_Vto con un único
+      `str.extract` sobre un patrón compilado, en lugar de `apply(separar_celda)` fila por fila,
+    - los códigos de mes se convierten con un Categorical (códigos -> número de mes),
+    - las líneas se limpian ('%' y ','), se separan y las 12 columnas numéricas se convierten
+      en una sola pasada con pyarrow ('-' es NaN),
+    - los valores que no se pudieron convertir se devuelven en un DataFrame aparte.
+
+El resultado tiene el mismo esquema que df_opciones.parquet.
+
+Uso:
+    from etl_opciones import etl_opciones
+    df_final, no_convertibles = etl_opciones(df)     # df con Fecha, Texto (datos_todos_los_pdf.parquet)
+                                                     # o con las columnas de extraccion_secciones.leer_opciones
+
+    python etl_opciones.py --benchmark [df_opciones.parquet]
+"""
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+PREFIJO_SERIE = "GFG"
+
+COLUMNAS = ['Fecha', 'Serie', 'Ultimo_Precio', 'Variacion_%', 'Min', 'Max', 'Lotes', 'Volumen_$',
+            'Ult_Precio/Cotiz_sub_%', 'Prima_Teorica', 'Delta', 'Efec_Palanca', 'Volat_Implicita_%',
+            'Delta_Implic']
+COLUMNAS_NUMERICAS = COLUMNAS[2:]
+
+# Códigos de mes de vencimiento de la serie -> número de mes
+CODIGOS_MES = {
+    'DI': 12, 'OC': 10, 'AB': 4, 'FE': 2, 'JU': 6,
+    'G': 8, 'AG': 8, 'J': 6, 'O': 10, 'D': 12,
+    'F': 2, 'A': 4, 'NO': 11, 'MY': 5, 'MA': 3,
+    'JL': 7, 'SE': 9, 'EN': 1, 'Y': 5, 'E': 1
+}
+_NUMERO_MES = np.array(list(CODIGOS_MES.values()), dtype="int8")
+
+# 'GFG' + tipo (C compra, V venta) + strike (102, 102., 102.50) + código de mes al final.
+# El strike se busca desde el 5to caracter, igual que separar_celda.
+PATRON_SERIE = re.compile(r"^.{3}(?P<tipo>.)(?:.*?(?P<strike>\d+(?:\.\d*)?)(?P<mes>[a-zA-Z]+)$)?")
+PATRON_LIMPIEZA = re.compile(r"[%,]")
+VALORES_FALTANTES = pa.array(["-", "", "NaN"])
+
+_TEXTO_ARROW = pd.ArrowDtype(pa.string())
+
+
+def separar_series(serie):
+    """
+    Serie de textos 'GFGC15.0FE' -> DataFrame con strike (float32), opcion (int8: 1 compra,
+    2 venta, 0 otro) y Mes_Vto (int8). Las series sin strike/mes quedan con strike NaN y
+    Mes_Vto 0, igual que los códigos de mes desconocidos.
+    """
+    # Con el dtype de arrow, str.extract corre en pyarrow (extract_regex) y no fila por fila
+    partes = serie.astype(_TEXTO_ARROW).str.extract(PATRON_SERIE.pattern)
+    opcion = partes["tipo"].map({"C": 1, "V": 2}).fillna(0).astype("int8")
+    strike = pd.to_numeric(partes["strike"].replace("", None), errors="coerce").astype("float32")
+    codigos = pd.Categorical(partes["mes"].astype(object), categories=list(CODIGOS_MES))
+    mes_vto = np.where(codigos.codes >= 0, _NUMERO_MES[codigos.codes], 0).astype("int8")
+    return pd.DataFrame({"strike": strike.to_numpy(), "opcion": opcion.to_numpy(), "Mes_Vto": mes_vto},
+                        index=serie.index)
+
+
+def convertir_numeros(textos):
+    """
+    Array de arrow con textos (ej. '2475', '41.43', '-', ya sin '%' ni ',') -> (float64, no_convertibles).
+    Todo se convierte en una sola pasada; '-', vacío y 'NaN' son NaN. `no_convertibles`
+    es una máscara numpy de los valores que no son números ni faltantes.
+    """
+    faltantes = pc.fill_null(pc.is_in(textos, VALORES_FALTANTES), True)
+    textos = pc.if_else(faltantes, None, textos)
+    try:
+        numeros = pc.cast(textos, pa.float64()).to_numpy(zero_copy_only=False)
+    except pa.ArrowInvalid:
+        # Algún valor no es numérico: se convierte con to_numeric para marcar cuáles
+        numeros = pd.to_numeric(pd.Series(textos, dtype=_TEXTO_ARROW), errors="coerce").to_numpy(
+            dtype="float64", na_value=np.nan)
+    no_convertibles = np.isnan(numeros) & ~faltantes.to_numpy(zero_copy_only=False)
+    return numeros, no_convertibles
+
+
+def separar_lineas(lineas):
+    """
+    Líneas 'GFGC15.0FE 4.950 41.43% ...' -> (DataFrame con Serie y las 12 columnas numéricas,
+    máscara de líneas con 13 campos, DataFrame (fila, columna, valor) de no convertibles).
+    Se limpian '%' y ',' de toda la línea, se separa por espacios y se convierte con pyarrow.
+    """
+    texto = pa.array(lineas.to_numpy(dtype=object), pa.string())
+    campos = pc.split_pattern(pc.replace_substring_regex(texto, PATRON_LIMPIEZA.pattern, ""), " ")
+    n_campos = len(COLUMNAS) - 1
+    completas = pc.equal(pc.list_value_length(campos), n_campos).to_numpy(zero_copy_only=False)
+    planos = pc.list_flatten(campos.filter(pa.array(completas)))
+
+    posiciones = np.arange(len(planos)).reshape(-1, n_campos)
+    serie = planos.take(pa.array(posiciones[:, 0]))
+    numeros, no_convertibles = convertir_numeros(planos.take(pa.array(posiciones[:, 1:].ravel())))
+    forma = (len(posiciones), n_campos - 1)
+
+    df = pd.DataFrame(numeros.reshape(forma), columns=COLUMNAS_NUMERICAS)
+    df.insert(0, "Serie", pd.Series(serie.to_numpy(zero_copy_only=False)).astype("str"))
+    filas, columnas = np.nonzero(no_convertibles.reshape(forma))
+    malos = pd.DataFrame({"fila": filas, "columna": np.array(COLUMNAS_NUMERICAS)[columnas],
+                          "valor": posiciones[:, 1:][filas, columnas]})
+    malos["valor"] = planos.take(pa.array(malos["valor"].to_numpy())).to_numpy(zero_copy_only=False)
+    return df, completas, malos
+
+
+def etl_opciones(df, verbose=True):
+    """
+    Devuelve (df_final, no_convertibles).
+
+    `df` puede ser el texto crudo (columnas Fecha, Texto: se filtran las líneas GFG, se
+    ordena por fecha, se quitan duplicados y se separan los 13 campos) o las filas ya
+    tipadas de extraccion_secciones. Las líneas GFG que no tienen 13 campos, los valores
+    no numéricos y las series sin mes reconocible se informan en `no_convertibles`
+    (Fecha, columna, valor; los valores numéricos ya sin '%' ni ',').
+    """
+    reportes = []
+    if "Texto" in df.columns:
+        lineas = df.loc[df["Texto"].str.startswith(PREFIJO_SERIE, na=False), ["Fecha", "Texto"]]
+        lineas = lineas.sort_values(by="Fecha", kind="stable").drop_duplicates().reset_index(drop=True)
+        campos, completas, malos = separar_lineas(lineas["Texto"])
+        incompletas = lineas.loc[~completas]
+        reportes.append(pd.DataFrame({"Fecha": incompletas["Fecha"].to_numpy(), "columna": "Texto",
+                                      "valor": incompletas["Texto"].to_numpy()}))
+        fechas = lineas.loc[completas, "Fecha"].to_numpy()
+        reportes.append(pd.DataFrame({"Fecha": fechas[malos["fila"].to_numpy()], "columna": malos["columna"],
+                                      "valor": malos["valor"]}))
+        df_final = pd.concat([pd.Series(fechas, name="Fecha"), campos], axis=1)
+    else:
+        df_final = df[COLUMNAS].sort_values(by="Fecha", kind="stable").drop_duplicates()
+    df_final = df_final.reset_index(drop=True)
+
+    df_final["Fecha"] = pd.to_datetime(df_final["Fecha"], errors="coerce").astype("datetime64[ns]")
+    series = separar_series(df_final["Serie"])
+    sin_mes = (series["Mes_Vto"] == 0).to_numpy()
+    reportes.append(pd.DataFrame({"Fecha": df_final.loc[sin_mes, "Fecha"].to_numpy(), "columna": "Serie",
+                                  "valor": df_final.loc[sin_mes, "Serie"].to_numpy()}))
+    df_final = pd.concat([df_final, series], axis=1)
+
+    reportes = [r for r in reportes if len(r)]
+    no_convertibles = (pd.concat(reportes, ignore_index=True) if reportes
+                       else pd.DataFrame(columns=["Fecha", "columna", "valor"]))
+    no_convertibles["Fecha"] = pd.to_datetime(no_convertibles["Fecha"], errors="coerce")
+    if verbose:
+        if len(no_convertibles):
+            print(f"ADVERTENCIA: {len(no_convertibles)} valores no convertibles")
+            print(no_convertibles.groupby("columna")["valor"].agg(["count", "first"]))
+        else:
+            print("INFO: todos los valores se convirtieron")
+    return df_final, no_convertibles
+
+
+# --- Versión anterior (ETL_opciones.ipynb), sólo para el benchmark ---
+
+def separar_celda(valor):
+    valor = str(valor)
+    cuarto_char = valor[3] if len(valor) > 3 else ''
+
+    if cuarto_char == 'C':  # Opcion de Compra o Call
+        opcion = 1
+    elif cuarto_char == 'V':  # Opcion de Venta o Put
+        opcion = 2
+    else:
+        opcion = 0
+
+    resto = valor[4:]
+
+    # Regex flexible que permite números como 102, 102., 102.50
+    patron = r"(\d+(?:\.\d*)?)([a-zA-Z]+)$"
+    match = re.search(patron, resto)
+
+    if match:
+        strike_raw = match.group(1).rstrip('.')  # elimina el punto si está solo
+        try:
+            strike = float(strike_raw)
+        except:
+            strike = None
+        vencimiento = match.group(2)
+        return pd.Series([opcion, strike, vencimiento])
+    else:
+        return pd.Series([opcion, None, None])
+
+
+def etl_opciones_apply(df):
+    """Las celdas de ETL_opciones.ipynb (sin los prints de diagnóstico), tal como estaban."""
+    df_filtrado = df[df['Texto'].str.startswith('GFG')]
+    df_sin_duplicados = df_filtrado.sort_values(by='Fecha').drop_duplicates().reset_index(drop=True)
+    df_separado = df_sin_duplicados['Texto'].str.split(' ', expand=True)
+    df_final = pd.concat([df_sin_duplicados[['Fecha']].reset_index(drop=True), df_separado], axis=1)
+    df_final.columns = COLUMNAS
+
+    cols = ['Variacion_%', 'Ult_Precio/Cotiz_sub_%', 'Volat_Implicita_%', 'Efec_Palanca']
+    for col in cols:
+        df_final[col] = df_final[col].astype(str).str.replace('%', '', regex=False)
+    for col in cols:
+        df_final[col] = df_final[col].replace('-', np.nan)
+        df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
+
+    df_final['Fecha'] = pd.to_datetime(df_final['Fecha'], errors='coerce')
+    for col in df_final.columns[2:]:
+        if not pd.api.types.is_numeric_dtype(df_final[col]):  # en pandas 3 el texto ya no es 'object'
+            df_final[col] = df_final[col].str.replace(',', '', regex=False)
+            df_final[col] = df_final[col].astype(float)
+
+    df_final[['opcion', 'strike', 'Mes_Vto']] = df_final['Serie'].apply(separar_celda)
+    df_final['opcion'] = df_final['opcion'].astype('int8')
+    df_final['strike'] = df_final['strike'].astype('float32')
+    df_final['Mes_Vto'] = df_final['Mes_Vto'].replace(CODIGOS_MES).astype('int8')
+    return df_final
+
+
+def _a_texto(df_opciones):
+    """Reconstruye las líneas 'GFG...' del PDF a partir de df_opciones.parquet (formato de los informes)."""
+    def fmt(col, formato, sufijo=""):
+        valores = df_opciones[col]
+        texto = valores.map(lambda v: format(v, formato)) + sufijo
+        # Fuera de las columnas con '%' el apply no acepta '-': se usa 'NaN', que float() sí acepta
+        return texto.where(valores.notna(), "-" if sufijo else "NaN")
+
+    partes = [df_opciones["Serie"], fmt("Ultimo_Precio", ".3f"), fmt("Variacion_%", ".2f", "%"),
+              fmt("Min", ".3f"), fmt("Max", ".3f"), fmt("Lotes", ",.0f"), fmt("Volumen_$", ",.0f"),
+              fmt("Ult_Precio/Cotiz_sub_%", ".2f", "%"), fmt("Prima_Teorica", ".3f"), fmt("Delta", ".3f"),
+              fmt("Efec_Palanca", ".2f", "%"), fmt("Volat_Implicita_%", ".2f", "%"), fmt("Delta_Implic", ".3f")]
+    texto = partes[0].str.cat(partes[1:], sep=" ")
+    return pd.DataFrame({"Fecha": df_opciones["Fecha"].dt.strftime("%Y-%m-%d"), "Texto": texto})
+
+
+def benchmark(ruta_parquet="df_opciones.parquet", factor=10):
+    """Filas/s de la versión vectorizada contra el apply, al tamaño de df_opciones y `factor` veces más."""
+    base = _a_texto(pd.read_parquet(ruta_parquet))
+    # Otras líneas del informe, que el filtro 'GFG' tiene que descartar
+    ruido = pd.DataFrame({"Fecha": base["Fecha"], "Texto": "Vencimiento Febrero - 20/02/2015 - 49 días"})
+    base = pd.concat([base, ruido], ignore_index=True)
+
+    # Copias con las fechas corridas k días, para que drop_duplicates no las colapse
+    copias = []
+    for k in range(factor):
+        copia = base.copy()
+        copia["Fecha"] = (pd.to_datetime(copia["Fecha"]) + pd.Timedelta(days=k)).dt.strftime("%Y-%m-%d")
+        copias.append(copia)
+    grande = pd.concat(copias, ignore_index=True)
+
+    for nombre, df in (("df_opciones", base), (f"x{factor}", grande)):
+        inicio = time.perf_counter()
+        vectorizado, _ = etl_opciones(df, verbose=False)
+        t_vectorizado = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        con_apply = etl_opciones_apply(df)
+        t_apply = time.perf_counter() - inicio
+
+        pd.testing.assert_frame_equal(vectorizado, con_apply[vectorizado.columns], check_dtype=False)
+        n = len(vectorizado)
+        print(f"{nombre:>12}: {n:8d} filas | apply {t_apply:7.2f}s ({n / t_apply:10.0f} filas/s) | "
+              f"vectorizado {t_vectorizado:6.2f}s ({n / t_vectorizado:10.0f} filas/s) | x{t_apply / t_vectorizado:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ETL vectorizado de las opciones GFG")
+    parser.add_argument("parquet", nargs="?", default="df_opciones.parquet")
+    parser.add_argument("--factor", type=int, default=10)
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.parquet, args.factor)
+    else:
+        parser.print_help()
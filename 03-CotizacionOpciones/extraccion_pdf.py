@@ -0,0 +1,294 @@
+"""
+Extracción en paralelo del texto de los informes del IAMC a un dataset parquet.
+
+Reemplaza a `procesar_ruta_abuelo` de LeerInformes.ipynb:
+    - cada PDF se procesa en un proceso del pool (pdfplumber es CPU-bound),
+    - cada worker escribe sus filas página por página con un `ParquetWriter`,
+      de modo que la memoria no depende del tamaño del archivo histórico,
+    - el resultado es un dataset particionado `anio=AAAA/mes=MM/<informe>.parquet`
+      con las mismas columnas que antes (Fecha, Texto), sin `pd.concat` acumulativo,
+    - sólo se extraen los PDFs nuevos o modificados (ver cache_extraccion.py).
+
+`pd.read_parquet(ruta_dataset)` lee el dataset completo (agrega las columnas anio y mes).
+
+Uso:
+    python extraccion_pdf.py <ruta_abuelo> [--workers N]
+    python extraccion_pdf.py --benchmark ["../04-Cotizacion Futuros/IAMC_Informes_2015_01"]
+"""
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pdfplumber
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from cache_extraccion import CacheExtraccion
+
+NOMBRE_DATASET = "datos_todos_los_pdf.parquet"
+# Subir este número cuando cambie la lógica de extracción: invalida la caché y re-extrae todo
+VERSION_EXTRACTOR = 1
+PARTICION_SIN_FECHA = "__HIVE_DEFAULT_PARTITION__"  # Mismo valor que usa pyarrow para particiones nulas
+
+ESQUEMA = pa.schema([("Fecha", pa.string()), ("Texto", pa.string())])
+
+MESES = {
+    'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5,
+    'junio': 6, 'julio': 7, 'agosto': 8, 'septiembre': 9,
+    'octubre': 10, 'noviembre': 11, 'diciembre': 12
+}
+
+PATRON_INTERVALO = re.compile(r"Ruedas del \d+ al (\d+) de (\w+) de (\d{4})")
+PATRON_SIMPLE = re.compile(r"Rueda del (\d+) de (\w+) de (\d{4})")
+PATRON_ANEXO = re.compile(r"Anexo A Análisis de opciones (\d{2}/\d{2}/\d{4})")
+
+
+def convertir_mes_a_numero(mes_str):
+    return MESES.get(mes_str)
+
+
+def extraer_fecha_linea(linea):
+    """
+    Extrae fecha según patrones:
+    - 'Ruedas del 2 al 5 de enero de 2024'
+    - 'Rueda del 4 de enero de 2024'
+    - 'Anexo A Análisis de opciones 31/01/2022'
+    """
+    # Los tres patrones empiezan con 'Rueda' o 'Anexo': se descarta el resto de las líneas sin regex
+    if not (linea.startswith("Rueda") or linea.startswith("Anexo")):
+        return None
+
+    for patron in (PATRON_INTERVALO, PATRON_SIMPLE):
+        match = patron.match(linea)
+        if match:
+            dia, mes_str, anio = match.groups()
+            mes_num = convertir_mes_a_numero(mes_str.lower())
+            if mes_num:
+                return datetime(int(anio), mes_num, int(dia)).strftime("%Y-%m-%d")
+
+    match = PATRON_ANEXO.match(linea)
+    if match:
+        return datetime.strptime(match.group(1), "%d/%m/%Y").strftime("%Y-%m-%d")
+
+    return None
+
+
+def listar_pdfs(ruta_abuelo):
+    """Todos los PDFs bajo `ruta_abuelo`, ordenados para que las corridas sean reproducibles."""
+    pdfs = []
+    for root, dirs, files in os.walk(ruta_abuelo):
+        pdfs.extend(os.path.join(root, f) for f in files if f.lower().endswith('.pdf'))
+    return sorted(pdfs)
+
+
+def ruta_particion(ruta_dataset, fecha):
+    """Carpeta `anio=AAAA/mes=MM` de una fecha 'AAAA-MM-DD' (o la partición nula si no hay fecha)."""
+    if fecha is None:
+        return os.path.join(ruta_dataset, f"anio={PARTICION_SIN_FECHA}", f"mes={PARTICION_SIN_FECHA}")
+    return os.path.join(ruta_dataset, f"anio={fecha[:4]}", f"mes={fecha[5:7]}")
+
+
+def _lote(fecha, lineas):
+    return pa.record_batch([pa.array([fecha] * len(lineas), pa.string()), pa.array(lineas, pa.string())], schema=ESQUEMA)
+
+
+def extraer_pdf_a_parquet(ruta_pdf, ruta_dataset):
+    """
+    Extrae las líneas de `ruta_pdf` y las escribe en la partición de su fecha.
+
+    Las líneas se acumulan sólo hasta encontrar la fecha (normalmente en la primera
+    página); desde ahí cada página se escribe como un record batch y se descarta.
+    Devuelve un dict con ruta, fecha, paginas, filas, archivo y error.
+    """
+    resultado = {"ruta": ruta_pdf, "fecha": None, "paginas": 0, "filas": 0, "archivo": None, "error": None}
+    nombre = os.path.splitext(os.path.basename(ruta_pdf))[0] + ".parquet"
+    pendientes = []
+    escritor = None
+    ruta_temporal = None
+    try:
+        with pdfplumber.open(ruta_pdf) as pdf:
+            for pagina in pdf.pages:
+                resultado["paginas"] += 1
+                texto = pagina.extract_text()
+                pagina.flush_cache()  # libera los objetos de la página ya procesada
+                if not texto:
+                    continue
+                lineas = texto.split('\n')
+                if resultado["fecha"] is None:
+                    for linea in lineas:
+                        resultado["fecha"] = extraer_fecha_linea(linea)
+                        if resultado["fecha"]:
+                            break
+                pendientes.extend(lineas)
+                if resultado["fecha"] is None:
+                    continue
+
+                if escritor is None:
+                    carpeta = ruta_particion(ruta_dataset, resultado["fecha"])
+                    os.makedirs(carpeta, exist_ok=True)
+                    resultado["archivo"] = os.path.join(carpeta, nombre)
+                    ruta_temporal = resultado["archivo"] + ".tmp"
+                    escritor = pq.ParquetWriter(ruta_temporal, ESQUEMA)
+                escritor.write_batch(_lote(resultado["fecha"], pendientes))
+                resultado["filas"] += len(pendientes)
+                pendientes = []
+
+        if escritor is None:
+            # No se encontró la fecha: se guardan las líneas igual, con Fecha nula, como antes
+            resultado["error"] = "sin_fecha"
+            carpeta = ruta_particion(ruta_dataset, None)
+            os.makedirs(carpeta, exist_ok=True)
+            resultado["archivo"] = os.path.join(carpeta, nombre)
+            ruta_temporal = resultado["archivo"] + ".tmp"
+            escritor = pq.ParquetWriter(ruta_temporal, ESQUEMA)
+            escritor.write_batch(_lote(None, pendientes))
+            resultado["filas"] = len(pendientes)
+        escritor.close()
+        escritor = None
+        os.replace(ruta_temporal, resultado["archivo"])
+    except Exception as e:
+        # Captura cualquier error que ocurra al abrir o procesar el PDF
+        resultado["error"] = f"Error al procesar el archivo '{ruta_pdf}': {e}"
+        if escritor is not None:
+            escritor.close()
+        if ruta_temporal and os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        resultado["archivo"] = None
+    return resultado
+
+
+def extraer_en_paralelo(pdfs, ruta_dataset, workers=None, verbose=True, extractor=None):
+    """
+    Procesa la lista de PDFs con un pool de `workers` procesos. Devuelve la lista de resultados.
+    `extractor(ruta_pdf, ruta_dataset)` es por defecto `extraer_pdf_a_parquet`.
+    """
+    workers = workers or os.cpu_count()
+    extractor = extractor or extraer_pdf_a_parquet
+    resultados = []
+    if workers == 1:
+        iterador = (extractor(p, ruta_dataset) for p in pdfs)
+        for r in iterador:
+            resultados.append(r)
+            if verbose:
+                print(f"Procesado: {r['ruta']} ({r['paginas']} páginas, {r['filas']} filas)")
+        return resultados
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for r in pool.map(extractor, pdfs, [ruta_dataset] * len(pdfs), chunksize=4):
+            resultados.append(r)
+            if verbose:
+                print(f"Procesado: {r['ruta']} ({r['paginas']} páginas, {r['filas']} filas)")
+    return resultados
+
+
+def guardar_errores(errores, ruta_errores):
+    """Guarda en un txt los PDFs sin fecha o con error, como hacía extraer_mes_carpeta."""
+    if errores:
+        with open(ruta_errores, "w", encoding="utf-8") as f:
+            for path in errores:
+                f.write(f"{path}\n")
+        print(f"⚠️ Archivos sin fecha o con error: {len(errores)}. Ver {ruta_errores}")
+    elif os.path.exists(ruta_errores):
+        # La lista sale de la caché completa: si quedó vacía, el txt de una corrida anterior ya no aplica
+        os.remove(ruta_errores)
+    return errores
+
+
+def procesar_ruta_abuelo(ruta_abuelo, ruta_dataset=None, workers=None, incremental=True):
+    """
+    Recorre recursivamente todas las subcarpetas desde la ruta_abuelo, extrae en paralelo
+    los PDFs nuevos o modificados y los escribe en el dataset particionado `ruta_dataset`
+    (por defecto `<ruta_abuelo>/datos_todos_los_pdf.parquet`).
+
+    Con `incremental=False` se ignora la caché y se re-extraen todos los PDFs.
+    Devuelve los resultados de los PDFs procesados en esta corrida. Si `ruta_dataset` es el
+    parquet consolidado de la versión anterior, se lanza FileExistsError sin tocarlo.
+    """
+    ruta_dataset = ruta_dataset or os.path.join(ruta_abuelo, NOMBRE_DATASET)
+    if os.path.isfile(ruta_dataset):
+        # Versión anterior: un único archivo parquet consolidado. No se borra: son datos del usuario
+        raise FileExistsError(
+            f"{ruta_dataset} es un parquet consolidado de una versión anterior; el dataset particionado "
+            f"necesita esa ruta como carpeta. Moverlo o renombrarlo (o pasar otra `ruta_dataset`) y volver a correr.")
+    return procesar_incremental(ruta_abuelo, ruta_dataset, extraer_pdf_a_parquet, VERSION_EXTRACTOR,
+                                workers, incremental)
+
+
+def procesar_incremental(ruta_abuelo, ruta_dataset, extractor, version, workers=None, incremental=True,
+                         nombre_errores="informes_sin_fecha.txt"):
+    """
+    Extrae con `extractor` los PDFs de `ruta_abuelo` que no están vigentes en la caché
+    de `ruta_dataset` para `version`, y borra los parquets de los PDFs que ya no existen.
+    Los PDFs sin fecha o con error se listan en `<ruta_abuelo>/<nombre_errores>`.
+    """
+    os.makedirs(ruta_dataset, exist_ok=True)
+
+    pdfs = listar_pdfs(ruta_abuelo)
+    with CacheExtraccion(ruta_dataset) as cache:
+        # PDFs que ya no están en disco: se quitan sus filas del dataset
+        actuales = {os.path.abspath(p) for p in pdfs}
+        for ruta in cache.rutas():
+            if ruta not in actuales:
+                for archivo in cache.archivos_anteriores(ruta):
+                    _eliminar_archivo(archivo)
+                cache.eliminar(ruta)
+
+        if incremental:
+            a_procesar, vigentes = cache.clasificar(pdfs, version)
+        else:
+            a_procesar, vigentes = [(p, *cache.hash_actual(p)) for p in pdfs], []
+        print(f"📁 {len(pdfs)} PDFs en {ruta_abuelo}: {len(a_procesar)} a extraer, {len(vigentes)} sin cambios")
+
+        resultados = extraer_en_paralelo([p for p, _, _ in a_procesar], ruta_dataset, workers, extractor=extractor)
+        for (ruta, sha256, stat), resultado in zip(a_procesar, resultados):
+            # Si el PDF cambió de fecha (o de salida), sus filas anteriores quedaron en otro archivo
+            nuevos = set(resultado.get("archivos") or [resultado.get("archivo")])
+            for anterior in cache.archivos_anteriores(ruta):
+                if anterior not in nuevos:
+                    _eliminar_archivo(anterior)
+            cache.registrar(ruta, sha256, stat, version, resultado)
+
+        guardar_errores(cache.errores(), os.path.join(ruta_abuelo, nombre_errores))
+    print(f"✅ Dataset parquet particionado guardado en:\n{ruta_dataset}")
+    return resultados
+
+
+def _eliminar_archivo(ruta):
+    if ruta and os.path.exists(ruta):
+        os.remove(ruta)
+
+
+def benchmark(carpeta, lista_workers=None):
+    """Páginas/s extrayendo todos los PDFs de `carpeta` con 1, 2, 4 y N workers."""
+    n = os.cpu_count() or 1
+    lista_workers = lista_workers or sorted({1, 2, 4, n})
+    pdfs = listar_pdfs(carpeta)
+    print(f"Benchmark sobre {len(pdfs)} PDFs de {carpeta} ({n} CPUs)")
+    for workers in lista_workers:
+        destino = tempfile.mkdtemp(prefix="bench_extraccion_")
+        try:
+            inicio = time.perf_counter()
+            resultados = extraer_en_paralelo(pdfs, destino, workers, verbose=False)
+            duracion = time.perf_counter() - inicio
+        finally:
+            shutil.rmtree(destino, ignore_errors=True)
+        paginas = sum(r["paginas"] for r in resultados)
+        print(f"workers={workers:>3}: {paginas} páginas en {duracion:6.2f}s -> {paginas / duracion:7.1f} páginas/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extracción de texto de los informes del IAMC a parquet")
+    parser.add_argument("ruta", nargs="?", default=os.path.join("..", "04-Cotizacion Futuros", "IAMC_Informes_2015_01"))
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.ruta, args.workers)
+    else:
+        procesar_ruta_abuelo(args.ruta, workers=args.workers[0] if args.workers else None)
@@ -0,0 +1,306 @@
+"""
+Extracción dirigida del "Anexo A Análisis de opciones" de los informes del IAMC.
+
+ETL_opciones.ipynb sólo usa las líneas que empiezan con 'GFG' y ETL_Vto_Tasas.ipynb
+las que empiezan con 'Vencimiento', y las dos están en el Anexo A (2 o 3 páginas de
+11-15). En lugar de extraer todo el texto de cada informe con pdfplumber:
+    - las páginas del anexo se ubican con PyPDF2, que lee el texto de una página
+      unas 10 veces más rápido que pdfplumber, empezando por la página donde
+      estaba el anexo en los informes conocidos (PAGINA_ANEXO_HABITUAL),
+    - sólo esas páginas se pasan por pdfplumber (cuyo orden de columnas es el que
+      esperan los notebooks),
+    - se escriben directamente filas tipadas, con la misma limpieza que los notebooks:
+        opciones/anio=AAAA/mes=MM/<informe>.parquet      (columnas de df_opciones sin strike/opcion/Mes_Vto)
+        vencimientos/anio=AAAA/mes=MM/<informe>.parquet  (columnas de df_vtos_tasa)
+    - si el informe no tiene un Anexo A reconocible se extrae el texto completo, como
+      antes, en texto/anio=AAAA/mes=MM/<informe>.parquet.
+
+La caché incremental es la de extraccion_pdf.py (una por dataset).
+
+Uso:
+    python extraccion_secciones.py <ruta_abuelo> [--workers N]
+    python extraccion_secciones.py --benchmark ["../04-Cotizacion Futuros/IAMC_Informes_2015_01"]
+"""
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import pdfplumber
+import pyarrow as pa
+import pyarrow.parquet as pq
+from PyPDF2 import PdfReader
+
+from extraccion_pdf import (MESES, PATRON_ANEXO, extraer_en_paralelo, extraer_pdf_a_parquet, listar_pdfs,
+                            procesar_incremental, ruta_particion)
+
+NOMBRE_DATASET = "datos_secciones_pdf"
+# Subir este número cuando cambie la lógica de extracción: invalida la caché y re-extrae todo
+VERSION_EXTRACTOR = 1
+
+SUBCARPETA_OPCIONES = "opciones"
+SUBCARPETA_VENCIMIENTOS = "vencimientos"
+SUBCARPETA_TEXTO = "texto"
+
+MARCA_ANEXO = "Análisis de opciones"
+# En los informes diarios el Anexo A empieza en la página 10 (índice 9)
+PAGINA_ANEXO_HABITUAL = 9
+
+PREFIJO_SERIE = "GFG"
+COLUMNAS_OPCIONES = ['Serie', 'Ultimo_Precio', 'Variacion_%', 'Min', 'Max', 'Lotes', 'Volumen_$',
+                     'Ult_Precio/Cotiz_sub_%', 'Prima_Teorica', 'Delta', 'Efec_Palanca',
+                     'Volat_Implicita_%', 'Delta_Implic']
+
+ESQUEMA_OPCIONES = pa.schema(
+    [("Fecha", pa.timestamp("ns")), ("Serie", pa.string())]
+    + [(col, pa.float64()) for col in COLUMNAS_OPCIONES[1:]]
+)
+ESQUEMA_VENCIMIENTOS = pa.schema([
+    ("Fecha", pa.timestamp("ns")),
+    ("Mes_Vto", pa.int32()),
+    ("Fecha_Vto", pa.timestamp("ns")),
+    ("Dias_Vto", pa.int32()),
+    ("Tasa_Tipo", pa.int32()),
+    ("Tasa", pa.float64()),
+])
+
+# 'Vencimiento Febrero - 20/02/2015 - 49 días - Tasa Baibar 22.85%'
+PATRON_VENCIMIENTO = re.compile(
+    r"Vencimiento\s+(\w+)\s*-\s*(\d{2}/\d{2}/\d{4})\s*-\s*(\d+)\s*días\s*-\s*(.+?)\s+(-?[\d.,]+)%"
+)
+
+# Mismos códigos que ETL_Vto_Tasas.ipynb
+TIPOS_TASA = {
+    'Tasa Baibar': 1,
+    'Tasa Promedio de Caución a 30 días': 2
+}
+
+
+def paginas_anexo_opciones(ruta_pdf, pagina_inicial=PAGINA_ANEXO_HABITUAL):
+    """
+    Índices de las páginas del Anexo A con series GFG o líneas de vencimiento, leyendo
+    con PyPDF2 la menor cantidad posible de páginas.
+
+    Primero se prueba `pagina_inicial`: si es del anexo se retrocede hasta su primera
+    página y se avanza hasta la última. Si no, se recorre el informe desde el final
+    (el anexo está cerca del final, antes del Anexo B). La primera página del anexo
+    se incluye siempre porque tiene la fecha. Devuelve (paginas, total_paginas).
+    """
+    lector = PdfReader(ruta_pdf)
+    total = len(lector.pages)
+    textos = {}
+
+    def es_anexo(indice):
+        if indice not in textos:
+            textos[indice] = lector.pages[indice].extract_text() or ""
+        return MARCA_ANEXO in textos[indice]
+
+    paginas = []
+    if pagina_inicial < total and es_anexo(pagina_inicial):
+        inicio = pagina_inicial
+        while inicio > 0 and es_anexo(inicio - 1):
+            inicio -= 1
+        fin = pagina_inicial
+        while fin + 1 < total and es_anexo(fin + 1):
+            fin += 1
+        paginas = list(range(inicio, fin + 1))
+    else:
+        for indice in range(total - 1, -1, -1):
+            if es_anexo(indice):
+                paginas.insert(0, indice)
+            elif paginas:
+                break  # Se pasó la primera página del anexo
+
+    paginas = [i for i in paginas
+               if i == paginas[0] or PREFIJO_SERIE in textos[i] or "Vencimiento" in textos[i]]
+    return paginas, total
+
+
+def _numero(valor):
+    """'2,475' -> 2475.0, '41.43%' -> 41.43, '-' -> None (como la limpieza de ETL_opciones)."""
+    valor = valor.replace('%', '').replace(',', '')
+    if valor in ('', '-'):
+        return None
+    return float(valor)
+
+
+def parsear_linea_opcion(linea):
+    """Línea 'GFGC15.0FE 4.950 41.43% ...' -> lista [Serie, 12 números] o None si no tiene 13 campos."""
+    campos = linea.split(' ')
+    if len(campos) != len(COLUMNAS_OPCIONES):
+        return None
+    try:
+        return [campos[0]] + [_numero(c) for c in campos[1:]]
+    except ValueError:
+        return None
+
+
+def parsear_linea_vencimiento(linea):
+    """
+    Línea 'Vencimiento Febrero - 20/02/2015 - 49 días - Tasa Baibar 22.85%'
+    -> [Mes_Vto, Fecha_Vto, Dias_Vto, Tasa_Tipo, Tasa] o None si no tiene ese formato.
+    La fecha de vencimiento se lee como DD/MM/AAAA.
+    """
+    match = PATRON_VENCIMIENTO.match(linea)
+    if not match:
+        return None
+    mes_str, fecha_vto, dias, tipo, tasa = match.groups()
+    mes = MESES.get(mes_str.lower())
+    if mes is None:
+        return None
+    return [mes, datetime.strptime(fecha_vto, "%d/%m/%Y"), int(dias),
+            TIPOS_TASA.get(tipo.strip()), float(tasa.replace(',', ''))]
+
+
+def _escribir(tabla, ruta_dataset, subcarpeta, fecha, nombre):
+    carpeta = ruta_particion(os.path.join(ruta_dataset, subcarpeta), fecha)
+    os.makedirs(carpeta, exist_ok=True)
+    archivo = os.path.join(carpeta, nombre)
+    pq.write_table(tabla, archivo + ".tmp")
+    os.replace(archivo + ".tmp", archivo)
+    return archivo
+
+
+def extraer_secciones_pdf(ruta_pdf, ruta_dataset):
+    """
+    Extrae las filas de opciones GFG y de vencimientos/tasas del Anexo A de `ruta_pdf`.
+
+    Devuelve un dict con ruta, fecha, paginas, paginas_leidas, filas, archivos, descartadas
+    (líneas GFG o Vencimiento que no se pudieron convertir), modo ('secciones' o 'texto') y error.
+    """
+    resultado = {"ruta": ruta_pdf, "fecha": None, "paginas": 0, "paginas_leidas": 0, "filas": 0,
+                 "archivos": [], "descartadas": [], "modo": "secciones", "error": None}
+    nombre = os.path.splitext(os.path.basename(ruta_pdf))[0] + ".parquet"
+    try:
+        paginas, resultado["paginas"] = paginas_anexo_opciones(ruta_pdf)
+        lineas = []
+        if paginas:
+            with pdfplumber.open(ruta_pdf) as pdf:
+                for indice in paginas:
+                    texto = pdf.pages[indice].extract_text()
+                    pdf.pages[indice].flush_cache()
+                    if texto:
+                        lineas.extend(texto.split('\n'))
+            resultado["paginas_leidas"] = len(paginas)
+
+        fecha = None
+        for linea in lineas:
+            match = PATRON_ANEXO.match(linea)
+            if match:
+                fecha = datetime.strptime(match.group(1), "%d/%m/%Y")
+                break
+        if fecha is None:
+            return _extraer_texto_completo(ruta_pdf, ruta_dataset, resultado)
+        resultado["fecha"] = fecha.strftime("%Y-%m-%d")
+
+        # Las líneas de vencimiento se repiten para compra y venta: se quitan duplicados como en los notebooks
+        opciones, vencimientos = [], []
+        for linea in dict.fromkeys(lineas):
+            if linea.startswith(PREFIJO_SERIE):
+                fila = parsear_linea_opcion(linea)
+                destino = opciones
+            elif linea.startswith("Vencimiento"):
+                fila = parsear_linea_vencimiento(linea)
+                destino = vencimientos
+            else:
+                continue
+            if fila is None:
+                resultado["descartadas"].append(linea)
+            else:
+                destino.append([fecha] + fila)
+
+        for filas, esquema, subcarpeta in ((opciones, ESQUEMA_OPCIONES, SUBCARPETA_OPCIONES),
+                                           (vencimientos, ESQUEMA_VENCIMIENTOS, SUBCARPETA_VENCIMIENTOS)):
+            if not filas:
+                continue
+            columnas = list(zip(*filas))
+            tabla = pa.table([pa.array(c, t) for c, t in zip(columnas, esquema.types)], schema=esquema)
+            resultado["archivos"].append(_escribir(tabla, ruta_dataset, subcarpeta, resultado["fecha"], nombre))
+            resultado["filas"] += len(filas)
+    except Exception as e:
+        # Captura cualquier error que ocurra al abrir o procesar el PDF
+        resultado["error"] = f"Error al procesar el archivo '{ruta_pdf}': {e}"
+        for archivo in resultado["archivos"]:
+            os.remove(archivo)
+        resultado["archivos"] = []
+    return resultado
+
+
+def _extraer_texto_completo(ruta_pdf, ruta_dataset, resultado):
+    """Formato desconocido: se extrae todo el texto con `extraer_pdf_a_parquet` en la subcarpeta texto/."""
+    completo = extraer_pdf_a_parquet(ruta_pdf, os.path.join(ruta_dataset, SUBCARPETA_TEXTO))
+    resultado.update(fecha=completo["fecha"], paginas=completo["paginas"], paginas_leidas=completo["paginas"],
+                     filas=completo["filas"], error=completo["error"], modo="texto",
+                     archivos=[completo["archivo"]] if completo["archivo"] else [])
+    return resultado
+
+
+def procesar_secciones(ruta_abuelo, ruta_dataset=None, workers=None, incremental=True):
+    """
+    Como `extraccion_pdf.procesar_ruta_abuelo`, pero extrae sólo el Anexo A de cada informe
+    al dataset `ruta_dataset` (por defecto `<ruta_abuelo>/datos_secciones_pdf`).
+    Devuelve los resultados de los PDFs procesados en esta corrida.
+    """
+    ruta_dataset = ruta_dataset or os.path.join(ruta_abuelo, NOMBRE_DATASET)
+    resultados = procesar_incremental(ruta_abuelo, ruta_dataset, extraer_secciones_pdf, VERSION_EXTRACTOR,
+                                      workers, incremental, nombre_errores="informes_sin_anexo.txt")
+
+    texto_completo = [r["ruta"] for r in resultados if r["modo"] == "texto" and r["error"] is None]
+    if texto_completo:
+        print(f"⚠️ {len(texto_completo)} informes sin Anexo A reconocible: se extrajo el texto completo "
+              f"en {os.path.join(ruta_dataset, SUBCARPETA_TEXTO)}")
+    descartadas = [linea for r in resultados for linea in r["descartadas"]]
+    if descartadas:
+        print(f"⚠️ {len(descartadas)} líneas GFG/Vencimiento con formato inesperado, por ejemplo:")
+        for linea in descartadas[:5]:
+            print(f"   {linea}")
+    return resultados
+
+
+def leer_opciones(ruta_dataset):
+    """Filas de opciones de todo el dataset (mismas columnas que df_final en ETL_opciones antes de separar la serie)."""
+    return pq.read_table(os.path.join(ruta_dataset, SUBCARPETA_OPCIONES), partitioning="hive").to_pandas()
+
+
+def leer_vencimientos(ruta_dataset):
+    """Filas de vencimientos y tasas de todo el dataset (columnas de df_vtos_tasa)."""
+    return pq.read_table(os.path.join(ruta_dataset, SUBCARPETA_VENCIMIENTOS), partitioning="hive").to_pandas()
+
+
+def _tamanio_carpeta(carpeta):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(carpeta) for f in files)
+
+
+def benchmark(carpeta, workers=1):
+    """Tiempo y tamaño del dataset: texto completo (extraccion_pdf) contra sólo el Anexo A."""
+    pdfs = listar_pdfs(carpeta)
+    print(f"Benchmark sobre {len(pdfs)} PDFs de {carpeta} (workers={workers})")
+    for modo, extractor in (("texto completo", extraer_pdf_a_parquet), ("Anexo A", extraer_secciones_pdf)):
+        destino = tempfile.mkdtemp(prefix="bench_secciones_")
+        try:
+            inicio = time.perf_counter()
+            resultados = extraer_en_paralelo(pdfs, destino, workers, verbose=False, extractor=extractor)
+            duracion = time.perf_counter() - inicio
+            tamanio = _tamanio_carpeta(destino)
+        finally:
+            shutil.rmtree(destino, ignore_errors=True)
+        filas = sum(r["filas"] for r in resultados)
+        leidas = sum(r.get("paginas_leidas", r["paginas"]) for r in resultados)
+        print(f"{modo:>15}: {duracion:6.2f}s, {leidas:4d} páginas parseadas con pdfplumber, "
+              f"{filas:6d} filas, {tamanio / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extracción del Anexo A (opciones) de los informes del IAMC")
+    parser.add_argument("ruta", nargs="?", default=os.path.join("..", "04-Cotizacion Futuros", "IAMC_Informes_2015_01"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.ruta, args.workers or 1)
+    else:
+        procesar_secciones(args.ruta, workers=args.workers)
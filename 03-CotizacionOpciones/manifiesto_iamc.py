@@ -0,0 +1,165 @@
+"""
+Manifiesto persistente (SQLite) de las fechas ya procesadas por el scraper del IAMC.
+
+Por cada fecha guarda la URL del PDF resuelta, el estado HTTP de la descarga,
+el hash SHA-256 del archivo y la categoría del resultado, con las mismas
+categorías que los listados del reporte final:
+
+    descargado        -> el PDF está en disco
+    url_resuelta      -> se conoce la URL pero todavía no se descargó
+    no_encontrado     -> informes_no_encontrados
+    fecha_incorrecta  -> informes_fecha_incorrecta
+    error_descarga    -> errores_descarga
+
+En una nueva corrida sólo se vuelven a consultar en el calendario las fechas no
+resueltas, y las que ya tienen URL se descargan directamente.
+"""
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+
+RUTA_MANIFIESTO = "manifiesto_iamc.sqlite"
+
+CATEGORIA_DESCARGADO = "descargado"
+CATEGORIA_URL_RESUELTA = "url_resuelta"
+CATEGORIA_NO_ENCONTRADO = "no_encontrado"
+CATEGORIA_FECHA_INCORRECTA = "fecha_incorrecta"
+CATEGORIA_ERROR = "error_descarga"
+
+# Categorías que no vale la pena volver a consultar en el calendario.
+# 'no_encontrado' sólo cuenta como resuelto si es definitivo (la página dijo
+# "No se encontraron Informes"); un timeout de Selenium se vuelve a intentar.
+CATEGORIAS_RESUELTAS = {CATEGORIA_DESCARGADO, CATEGORIA_FECHA_INCORRECTA}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS manifiesto (
+    fecha        TEXT PRIMARY KEY,   -- YYYY-MM-DD
+    categoria    TEXT NOT NULL,
+    url          TEXT,
+    estado_http  INTEGER,
+    sha256       TEXT,
+    definitivo   INTEGER NOT NULL DEFAULT 0,
+    detalle      TEXT,
+    actualizado  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tiempos (
+    fecha     TEXT NOT NULL,
+    etapa     TEXT NOT NULL,         -- navegacion, clic_dia, pagina_intermedia, ..., total
+    segundos  REAL NOT NULL,
+    PRIMARY KEY (fecha, etapa)
+)
+"""
+
+
+def hash_archivo(ruta, tamanio_bloque=1 << 20):
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tamanio_bloque), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def _clave(fecha):
+    return fecha.strftime("%Y-%m-%d")
+
+
+class Manifiesto:
+    """Acceso al manifiesto SQLite. Se puede usar como context manager."""
+
+    def __init__(self, ruta=RUTA_MANIFIESTO):
+        self.ruta = ruta
+        # Varios workers escriben en el mismo archivo: WAL + timeout para esperar el lock
+        self.conexion = sqlite3.connect(ruta, timeout=30, check_same_thread=False)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.executescript(_ESQUEMA)
+        self.conexion.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conexion.close()
+
+    def registrar(self, fecha, categoria, url=None, estado_http=None, sha256=None, definitivo=False, detalle=None):
+        """
+        Inserta o actualiza la fila de `fecha`. Los campos que llegan en None
+        conservan el valor anterior (por ejemplo, la URL resuelta en una corrida previa).
+        """
+        self.conexion.execute(
+            """
+            INSERT INTO manifiesto (fecha, categoria, url, estado_http, sha256, definitivo, detalle, actualizado)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(fecha) DO UPDATE SET
+                categoria   = excluded.categoria,
+                url         = COALESCE(excluded.url, manifiesto.url),
+                estado_http = COALESCE(excluded.estado_http, manifiesto.estado_http),
+                sha256      = COALESCE(excluded.sha256, manifiesto.sha256),
+                definitivo  = excluded.definitivo,
+                detalle     = excluded.detalle,
+                actualizado = excluded.actualizado
+            """,
+            (_clave(fecha), categoria, url, estado_http, sha256, int(definitivo), detalle,
+             datetime.now().isoformat(timespec="seconds")),
+        )
+        self.conexion.commit()
+
+    def registrar_descarga(self, fecha, ruta_pdf, url=None, estado_http=None):
+        """Marca `fecha` como descargada, guardando el hash del PDF en disco."""
+        self.registrar(fecha, CATEGORIA_DESCARGADO, url=url, estado_http=estado_http,
+                       sha256=hash_archivo(ruta_pdf), definitivo=True)
+
+    def obtener(self, fecha):
+        fila = self.conexion.execute("SELECT * FROM manifiesto WHERE fecha = ?", (_clave(fecha),)).fetchone()
+        return dict(fila) if fila else None
+
+    def esta_resuelta(self, fecha, ruta_pdf=None):
+        """
+        True si no hace falta volver a consultar el calendario para `fecha`.
+        Si se pasa `ruta_pdf`, una fecha 'descargado' cuyo PDF ya no está en disco no cuenta como resuelta.
+        """
+        registro = self.obtener(fecha)
+        if registro is None:
+            return False
+        if registro["categoria"] == CATEGORIA_DESCARGADO and ruta_pdf is not None:
+            return os.path.exists(ruta_pdf)
+        if registro["categoria"] == CATEGORIA_NO_ENCONTRADO:
+            return bool(registro["definitivo"])
+        return registro["categoria"] in CATEGORIAS_RESUELTAS
+
+    def url_conocida(self, fecha):
+        registro = self.obtener(fecha)
+        return registro["url"] if registro else None
+
+    def pendientes(self, fechas):
+        """Fechas de la lista que todavía no están resueltas."""
+        return [f for f in fechas if not self.esta_resuelta(f)]
+
+    def resumen(self):
+        """Cantidad de fechas por categoría."""
+        filas = self.conexion.execute("SELECT categoria, COUNT(*) AS n FROM manifiesto GROUP BY categoria").fetchall()
+        return {fila["categoria"]: fila["n"] for fila in filas}
+
+    def registrar_tiempos(self, fecha, tiempos):
+        """Guarda los segundos por etapa de la última vez que se procesó `fecha`."""
+        self.conexion.execute("DELETE FROM tiempos WHERE fecha = ?", (_clave(fecha),))
+        self.conexion.executemany(
+            "INSERT INTO tiempos (fecha, etapa, segundos) VALUES (?, ?, ?)",
+            [(_clave(fecha), etapa, segundos) for etapa, segundos in tiempos.items()],
+        )
+        self.conexion.commit()
+
+    def resumen_tiempos(self, desde=None, hasta=None):
+        """Promedio y máximo de segundos por etapa, para las fechas en [desde, hasta]."""
+        filas = self.conexion.execute(
+            """
+            SELECT etapa, COUNT(*) AS n, AVG(segundos) AS promedio, MAX(segundos) AS maximo
+            FROM tiempos WHERE fecha BETWEEN ? AND ? GROUP BY etapa ORDER BY promedio DESC
+            """,
+            (_clave(desde) if desde else "0000-00-00", _clave(hasta) if hasta else "9999-99-99"),
+        ).fetchall()
+        return {fila["etapa"]: {"n": fila["n"], "promedio": fila["promedio"], "maximo": fila["maximo"]} for fila in filas}
@@ -0,0 +1,633 @@
+"""
+Scraper de los informes diarios de Renta Fija del IAMC.
+
+Cada `ScraperIAMC` es dueño de su propio driver de Chrome (headless por defecto),
+de sus listados de fallos y de su carpeta de descargas temporales, de modo que
+varios scrapers pueden correr en paralelo en procesos distintos. El navegador
+sólo resuelve las URLs de los PDFs; las descargas se hacen al final, en paralelo,
+con `descarga_iamc.descargar_en_paralelo`.
+
+Uso:
+    python scraper_iamc.py --desde 2009-01-01 --hasta 2012-12-31 --workers 6
+    python scraper_iamc.py --desde 2024-01-01 --hasta 2024-03-31 --workers 2 --calendario-falso   # en una carpeta temporal
+    python scraper_iamc.py --anio 2009 --visible
+"""
+import argparse
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import requests
+from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException, NoSuchWindowException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+from esperas import Cronometro, texto_distinto_de
+from descarga_iamc import descargar_en_paralelo, ruta_informe, HEADERS, MAX_DESCARGAS_SIMULTANEAS
+from manifiesto_iamc import (Manifiesto, RUTA_MANIFIESTO, CATEGORIA_URL_RESUELTA, CATEGORIA_NO_ENCONTRADO,
+                             CATEGORIA_FECHA_INCORRECTA, CATEGORIA_ERROR)
+
+BASE_IAMC_URL = "https://www.iamc.com.ar/informediario/"
+
+# Nombres de mes del título del datepicker; así no hace falta el locale español del sistema
+MESES_ES = {
+    'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6, 'julio': 7,
+    'agosto': 8, 'septiembre': 9, 'setiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
+}
+
+XPATH_SIN_INFORMES = "//span[@class='sinInformes' and contains(text(), 'No se encontraron Informes')]"
+# Se busca *cualquier* informe que el sitio muestre; la fecha se valida después con el texto del enlace
+XPATH_ENLACE_INFORME = "//a[./div[@class='descripcion' and (contains(normalize-space(.), 'Diario') or contains(normalize-space(.), 'Informe Renta Fija'))]]"
+
+
+# Función para parsear una fecha del texto del informe
+def parsear_fecha_de_texto_informe(texto_informe):
+    # Intentar con formato DD/MM/YYYY o DD/MM/YY
+    match = re.search(r'\d{2}/\d{2}/(\d{4}|\d{2})', texto_informe)
+    if match:
+        fecha_str = match.group(0)
+        try:
+            return datetime.strptime(fecha_str, '%d/%m/%Y')
+        except ValueError:
+            try:
+                return datetime.strptime(fecha_str, '%d/%m/%y')
+            except ValueError:
+                return None
+    return None
+
+
+def es_url_pdf_directa(url, fecha):
+    """True si la URL del enlace ya apunta al PDF (o al streamer) y no a una página intermedia."""
+    url = url.lower()
+    return (
+        url.endswith(".pdf")
+        or "/handlers/basestreamer.ashx" in url
+        or "/handlers/basehandler.ashx" in url
+        or ("/informediario/" in url
+            and f"/{fecha.year}/" in url
+            and f"/{fecha.month:02d}/" in url
+            and f"/{fecha.day:02d}" in url
+            and "/contenido/detail/" not in url)
+    )
+
+
+def meses_en_rango(desde, hasta):
+    """Lista de (anio, mes) entre dos fechas, inclusive."""
+    meses = []
+    anio, mes = desde.year, desde.month
+    while (anio, mes) <= (hasta.year, hasta.month):
+        meses.append((anio, mes))
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return meses
+
+
+def dias_habiles(anio, mes, desde=None, hasta=None):
+    """Días de lunes a viernes del mes, recortados opcionalmente a [desde, hasta]."""
+    fecha = datetime(anio, mes, 1)
+    dias = []
+    while fecha.month == mes:
+        if fecha.weekday() < 5 and (desde is None or fecha >= desde) and (hasta is None or fecha <= hasta):
+            dias.append(fecha)
+        fecha += timedelta(days=1)
+    return dias
+
+
+def repartir_meses(meses, n_workers):
+    """Reparte los meses en `n_workers` conjuntos disjuntos, intercalados para balancear años viejos y nuevos."""
+    return [meses[i::n_workers] for i in range(n_workers) if meses[i::n_workers]]
+
+
+class ScraperIAMC:
+    """
+    Recorre el calendario del IAMC con un driver propio y resuelve la URL del informe de cada fecha.
+
+    Los resultados se registran en el manifiesto y en tres listados (no encontrados, fecha
+    incorrecta, errores), que `ejecutar_pool` combina en un único reporte.
+    """
+
+    def __init__(self, carpeta_base=".", url_base=BASE_IAMC_URL, headless=True,
+                 ruta_manifiesto=RUTA_MANIFIESTO, nombre="worker-0", descarga_paralela=True):
+        self.carpeta_base = carpeta_base
+        self.url_base = url_base
+        self.headless = headless
+        self.nombre = nombre
+        self.descarga_paralela = descarga_paralela
+        # Carpeta de descargas propia de este driver, para que dos workers no se pisen los archivos
+        self.carpeta_descarga_chrome = os.path.abspath(os.path.join(carpeta_base, f".descargas_chrome_{nombre}"))
+
+        self.driver = None
+        self.handle_calendario = None
+        self.manifiesto = Manifiesto(ruta_manifiesto)
+
+        self.informes_no_encontrados = []  # Fechas donde no se encontró el enlace o se indicó "sin informes"
+        self.errores_descarga = []         # Fechas donde hubo un error técnico en la descarga (requests, selenium)
+        self.informes_fecha_incorrecta = [] # Informes que abren una fecha diferente
+        self.descargas_pendientes = []     # (fecha, url, ruta_destino) para descargar en paralelo al final
+
+    # === Driver ===
+
+    def _opciones_chrome(self):
+        options = Options()
+        if self.headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1920,1080")
+        else:
+            options.add_argument("--start-maximized")
+        options.add_experimental_option("excludeSwitches", ["enable-popup-blocking", "enable-logging"])
+        options.add_argument("--disable-popup-blocking")
+        options.add_experimental_option("prefs", {
+            "download.default_directory": self.carpeta_descarga_chrome,
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+            "plugins.always_open_pdf_externally": False # Dejamos en False si queremos que abra el visor interno
+        })
+        return options
+
+    def inicializar_driver(self):
+        self.cerrar_driver()
+        os.makedirs(self.carpeta_descarga_chrome, exist_ok=True)
+        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=self._opciones_chrome())
+        print(f"[{self.nombre}] Navegador Chrome iniciado.")
+        self.driver.get(self.url_base)
+        self.handle_calendario = self.driver.current_window_handle
+
+    def cerrar_driver(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def cerrar(self):
+        self.cerrar_driver()
+        self.manifiesto.close()
+
+    # === Calendario ===
+
+    # Función para verificar el mes y año actual en el calendario
+    def mes_visible_actual(self):
+        """
+        Primer día del mes visible en el datepicker, o datetime(1, 1, 1) si no se pudo leer.
+
+        Se leen los atributos data-month (base 0) / data-year que jQuery UI pone en cada día;
+        si no están, se interpreta el título con MESES_ES, sin depender del locale del sistema.
+        """
+        driver = self.driver
+        try:
+            WebDriverWait(driver, 10).until(
+                EC.visibility_of_element_located((By.CLASS_NAME, "ui-datepicker-calendar"))
+            )
+            celdas = driver.find_elements(By.CSS_SELECTOR, ".ui-datepicker-calendar td[data-month][data-year]")
+            if celdas:
+                return datetime(int(celdas[0].get_attribute("data-year")), int(celdas[0].get_attribute("data-month")) + 1, 1)
+            mes_texto = driver.find_element(By.CLASS_NAME, "ui-datepicker-month").text.strip().lower()
+            anio_texto = driver.find_element(By.CLASS_NAME, "ui-datepicker-year").text.strip()
+            return datetime(int(anio_texto), MESES_ES[mes_texto], 1)
+        except Exception as e:
+            print(f"[{self.nombre}] ERROR: No se pudo encontrar el mes y/o año visible del calendario: {e}.")
+            return datetime(1, 1, 1)
+
+    def _volver_al_calendario(self):
+        """Se asegura de estar en la ventana del calendario con el calendario visible; reinicia el driver si se perdió."""
+        if self.driver.current_window_handle != self.handle_calendario:
+            try:
+                self.driver.switch_to.window(self.handle_calendario)
+            except (NoSuchWindowException, WebDriverException) as e:
+                print(f"[{self.nombre}] CRÍTICO: No se pudo volver a la ventana del calendario ({type(e).__name__}). Reinicializando.")
+                self.inicializar_driver()
+
+        if self.driver.current_url != self.url_base:
+            self.driver.get(self.url_base)
+
+        try:
+            WebDriverWait(self.driver, 15).until(
+                EC.visibility_of_element_located((By.CLASS_NAME, "ui-datepicker-calendar"))
+            )
+        except TimeoutException:
+            print(f"[{self.nombre}] ADVERTENCIA: Calendario no visible. Recargando {self.url_base}.")
+            self.driver.get(self.url_base)
+            WebDriverWait(self.driver, 15).until(
+                EC.visibility_of_element_located((By.CLASS_NAME, "ui-datepicker-calendar"))
+            )
+
+    def _saltar_con_api_datepicker(self, fecha_objetivo):
+        """
+        Salta al mes en un solo paso con la API de jQuery UI (`datepicker('setDate', ...)`).
+        `setDate` redibuja el calendario sin disparar onSelect, así que no carga ningún informe.
+        Devuelve False si la página no expone jQuery UI.
+        """
+        return bool(self.driver.execute_script(
+            """
+            var $ = window.jQuery;
+            if (!$ || !$.fn || !$.fn.datepicker) { return false; }
+            var picker = $('.hasDatepicker');
+            if (!picker.length) { return false; }
+            picker.datepicker('setDate', new Date(arguments[0], arguments[1] - 1, 1));
+            return true;
+            """,
+            fecha_objetivo.year, fecha_objetivo.month,
+        ))
+
+    def _saltar_con_clics(self, mes_actual, fecha_objetivo):
+        """Respaldo: calcula una sola vez la diferencia de meses y hace esa cantidad de clics en prev/next."""
+        if mes_actual.year == 1:
+            raise TimeoutException("No se pudo leer el mes visible del calendario: no se calcula el salto con clics")
+        delta = (fecha_objetivo.year - mes_actual.year) * 12 + (fecha_objetivo.month - mes_actual.month)
+        clase = "ui-datepicker-next" if delta > 0 else "ui-datepicker-prev"
+        titulo_mes = (By.CLASS_NAME, "ui-datepicker-month")
+        for _ in range(abs(delta)):
+            texto_anterior = self.driver.find_element(*titulo_mes).text
+            WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable((By.CLASS_NAME, clase))).click()
+            # En lugar de dormir 1s, se espera a que el datepicker redibuje el título del mes
+            WebDriverWait(self.driver, 10).until(texto_distinto_de(titulo_mes, texto_anterior))
+
+    # Función para navegar al mes deseado en el calendario
+    def ir_a_mes(self, fecha_objetivo, intentos=3):
+        """
+        Lleva el datepicker al mes de `fecha_objetivo` con O(1) interacciones: salto directo por la API
+        de jQuery UI y, si no está disponible o no funcionó, clics calculados a partir de un único delta.
+        """
+        objetivo = (fecha_objetivo.year, fecha_objetivo.month)
+        self._volver_al_calendario()
+        for _ in range(intentos):
+            mes_actual = self.mes_visible_actual()
+            if mes_actual.year == 1:
+                print(f"[{self.nombre}] ADVERTENCIA: mes_visible_actual falló. Recargando el calendario.")
+                self.driver.get(self.url_base)
+                self._volver_al_calendario()
+                continue
+            if (mes_actual.year, mes_actual.month) == objetivo:
+                return
+
+            if self._saltar_con_api_datepicker(fecha_objetivo):
+                mes_actual = self.mes_visible_actual()
+                if (mes_actual.year, mes_actual.month) == objetivo:
+                    return
+                if mes_actual.year == 1:
+                    # Sin mes legible no hay delta de clics: se reintenta desde el principio del bucle
+                    continue
+            self._saltar_con_clics(mes_actual, fecha_objetivo)
+
+        mes_actual = self.mes_visible_actual()
+        if (mes_actual.year, mes_actual.month) != objetivo:
+            raise TimeoutException(f"No se pudo llevar el calendario a {fecha_objetivo.strftime('%m-%Y')}")
+
+    # === Resultados ===
+
+    def _registrar_fallo(self, categoria, fecha, detalle, definitivo=False, url=None, estado_http=None):
+        """Agrega la fecha al listado del reporte que corresponde a `categoria` y la registra en el manifiesto."""
+        listado = {
+            CATEGORIA_NO_ENCONTRADO: self.informes_no_encontrados,
+            CATEGORIA_FECHA_INCORRECTA: self.informes_fecha_incorrecta,
+            CATEGORIA_ERROR: self.errores_descarga,
+        }[categoria]
+        listado.append(f"{fecha.strftime('%d-%m-%Y')} ({detalle})")
+        print(f"[{self.nombre}] {categoria.upper()}: {fecha.strftime('%d-%m-%Y')} - {detalle}")
+        self.manifiesto.registrar(fecha, categoria, url=url, estado_http=estado_http, detalle=detalle, definitivo=definitivo)
+
+    def resultado(self):
+        """Listados y descargas pendientes de este scraper, en un dict serializable entre procesos."""
+        return {
+            "informes_no_encontrados": self.informes_no_encontrados,
+            "informes_fecha_incorrecta": self.informes_fecha_incorrecta,
+            "errores_descarga": self.errores_descarga,
+            "descargas_pendientes": self.descargas_pendientes,
+        }
+
+    # === Flujo por fecha ===
+
+    def _url_pdf_desde_pagina_intermedia(self, url_pagina, fecha):
+        """Abre la página intermedia en otra pestaña y devuelve la URL del PDF (o None)."""
+        driver = self.driver
+        driver.execute_script("window.open(arguments[0], '_blank');", url_pagina)
+        WebDriverWait(driver, 10).until(EC.number_of_windows_to_be(2))
+        nueva = next((h for h in driver.window_handles if h != self.handle_calendario), None)
+        if nueva is None:
+            self._registrar_fallo(CATEGORIA_ERROR, fecha, "No se pudo cambiar a la nueva pestaña abierta")
+            return None
+
+        driver.switch_to.window(nueva)
+        try:
+            # Una sola espera por cualquiera de los dos formatos de página intermedia
+            xpath_objeto = "//object[@type='application/pdf']"
+            xpath_enlace = "//a[contains(@class, 'pdfDownload') and contains(@href, 'BaseStreamer.ashx')]"
+            try:
+                elemento = WebDriverWait(driver, 10).until(EC.any_of(
+                    EC.presence_of_element_located((By.XPATH, xpath_objeto)),
+                    EC.presence_of_element_located((By.XPATH, xpath_enlace)),
+                ))
+            except TimeoutException:
+                self._registrar_fallo(CATEGORIA_NO_ENCONTRADO, fecha, "No se encontró <object> ni enlace de descarga en página intermedia")
+                return None
+            return elemento.get_attribute("data") if elemento.tag_name.lower() == "object" else elemento.get_attribute("href")
+        finally:
+            try:
+                driver.close()
+            finally:
+                driver.switch_to.window(self.handle_calendario)
+
+    def _descargar_ahora(self, fecha, url, ruta_destino):
+        try:
+            response = requests.get(url, stream=True, headers=HEADERS, timeout=30, verify=False)
+            response.raise_for_status()
+            with open(ruta_destino, 'wb') as pdf_file:
+                for chunk in response.iter_content(chunk_size=8192):
+                    pdf_file.write(chunk)
+            self.manifiesto.registrar_descarga(fecha, ruta_destino, url=url, estado_http=response.status_code)
+            print(f"[{self.nombre}] ÉXITO: PDF descargado y guardado como: {os.path.basename(ruta_destino)}")
+        except requests.exceptions.RequestException as e:
+            self._registrar_fallo(CATEGORIA_ERROR, fecha, f"Error de descarga con requests desde URL final: {e}", url=url)
+
+    def _clic_en_dia(self, fecha, intentos=2):
+        """
+        Hace clic en el día y espera el resultado: el aviso "sin informes" o el enlace al informe.
+        Devuelve el elemento que apareció.
+
+        Si el resultado del día anterior no se reemplaza, sólo se acepta cuando es el enlace de
+        `fecha`; si no, se vuelve a hacer clic y, agotados los `intentos`, se lanza TimeoutException
+        (nunca se devuelve el resultado viejo, que se registraría como fecha incorrecta).
+        """
+        driver = self.driver
+        resultado_xpath = f"{XPATH_SIN_INFORMES} | {XPATH_ENLACE_INFORME}"
+        for _ in range(intentos):
+            # El resultado del día anterior sigue en la página hasta que el sitio lo reemplaza
+            previos = driver.find_elements(By.XPATH, resultado_xpath)
+            WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.XPATH, f"//a[contains(@class, 'ui-state-default') and text()='{fecha.day}']"))
+            ).click()
+            if previos:
+                try:
+                    WebDriverWait(driver, 5).until(EC.staleness_of(previos[0]))
+                except TimeoutException:
+                    if self._es_enlace_de(previos[0], fecha):
+                        return previos[0]
+                    print(f"[{self.nombre}] ADVERTENCIA: el resultado no se redibujó tras el clic en "
+                          f"{fecha.strftime('%d-%m-%Y')}. Reintentando.")
+                    continue
+            return WebDriverWait(driver, 20).until(EC.any_of(
+                EC.visibility_of_element_located((By.XPATH, XPATH_SIN_INFORMES)),
+                EC.visibility_of_element_located((By.XPATH, XPATH_ENLACE_INFORME)),
+            ))
+        raise TimeoutException(f"El resultado del día anterior no se reemplazó tras {intentos} clics")
+
+    @staticmethod
+    def _es_enlace_de(elemento, fecha):
+        """True si `elemento` es el enlace al informe de `fecha`."""
+        try:
+            if elemento.tag_name.lower() != "a":
+                return False
+            fecha_en_link = parsear_fecha_de_texto_informe(elemento.find_element(By.CLASS_NAME, "descripcion").text)
+        except WebDriverException:
+            return False
+        return fecha_en_link is not None and fecha_en_link.date() == fecha.date()
+
+    # Función principal para intentar descargar el informe de una fecha
+    def intentar_descargar(self, fecha):
+        ruta_destino = ruta_informe(fecha, os.path.join(self.carpeta_base, f"IAMC_Informes_{fecha.year}"))
+
+        # Primero se consulta el manifiesto: sólo las fechas no resueltas pasan por el calendario
+        if os.path.exists(ruta_destino):
+            if not self.manifiesto.esta_resuelta(fecha, ruta_destino):
+                self.manifiesto.registrar_descarga(fecha, ruta_destino)
+            return
+        if self.manifiesto.esta_resuelta(fecha, ruta_destino):
+            return
+        url_conocida = self.manifiesto.url_conocida(fecha)
+        if url_conocida:
+            self.descargas_pendientes.append((fecha, url_conocida, ruta_destino))
+            return
+
+        print(f"\n[{self.nombre}] --- Procesando fecha: {fecha.strftime('%d-%m-%Y')} ---")
+        crono = Cronometro()
+        try:
+            self._resolver_fecha(fecha, ruta_destino, crono)
+        finally:
+            tiempos = crono.total()
+            self.manifiesto.registrar_tiempos(fecha, tiempos)
+            print(f"[{self.nombre}] Tiempos {fecha.strftime('%d-%m-%Y')}: " +
+                  ", ".join(f"{etapa}={seg:.2f}s" for etapa, seg in tiempos.items()))
+
+    def _resolver_fecha(self, fecha, ruta_destino, crono):
+        """Recorre el calendario para `fecha`, midiendo cada etapa en `crono`."""
+        if self.driver is None:
+            with crono.etapa("inicio_driver"):
+                self.inicializar_driver()
+
+        try:
+            with crono.etapa("navegacion"):
+                self.ir_a_mes(fecha)
+            with crono.etapa("clic_dia"):
+                elemento = self._clic_en_dia(fecha)
+
+            if elemento.tag_name.lower() == "span":
+                self._registrar_fallo(CATEGORIA_NO_ENCONTRADO, fecha, "No se encontraron informes en la página", definitivo=True)
+                return
+
+            enlace = elemento
+            texto_link = enlace.find_element(By.CLASS_NAME, "descripcion").text
+            fecha_en_link = parsear_fecha_de_texto_informe(texto_link)
+
+            if not fecha_en_link or fecha_en_link.date() != fecha.date():
+                fecha_real = fecha_en_link.strftime('%d-%m-%Y') if fecha_en_link else 'N/A'
+                self._registrar_fallo(CATEGORIA_FECHA_INCORRECTA, fecha, f"Encontrado: '{texto_link}' - Fecha real: {fecha_real}")
+                return
+
+            href = enlace.get_attribute("href")
+            if not href.startswith("http"):
+                href = f"{self.url_base.split('/informediario')[0]}{href}"
+
+            if es_url_pdf_directa(href, fecha):
+                url_pdf = href
+            else:
+                with crono.etapa("pagina_intermedia"):
+                    url_pdf = self._url_pdf_desde_pagina_intermedia(href, fecha)
+                if url_pdf is None:
+                    return
+
+            self.manifiesto.registrar(fecha, CATEGORIA_URL_RESUELTA, url=url_pdf)
+            os.makedirs(os.path.dirname(ruta_destino), exist_ok=True)
+            if self.descarga_paralela:
+                self.descargas_pendientes.append((fecha, url_pdf, ruta_destino))
+            else:
+                with crono.etapa("descarga"):
+                    self._descargar_ahora(fecha, url_pdf, ruta_destino)
+
+        except (NoSuchElementException, TimeoutException) as e:
+            self._registrar_fallo(CATEGORIA_NO_ENCONTRADO, fecha, f"Elemento no encontrado/Timeout en navegación inicial: {type(e).__name__}")
+        except WebDriverException as e:
+            self._registrar_fallo(CATEGORIA_ERROR, fecha, f"WebDriverException: {type(e).__name__} - {e}")
+            self.inicializar_driver()
+        except Exception as e:
+            self._registrar_fallo(CATEGORIA_ERROR, fecha, f"Error inesperado en flujo general: {type(e).__name__} - {e}")
+            self.inicializar_driver()
+
+    def procesar_meses(self, meses, desde=None, hasta=None):
+        """Procesa los días hábiles de cada (anio, mes), recortados a [desde, hasta]."""
+        for anio, mes in meses:
+            for fecha in dias_habiles(anio, mes, desde, hasta):
+                self.intentar_descargar(fecha)
+        return self.resultado()
+
+
+# === Pool de workers ===
+
+def _procesar_en_worker(indice, meses, desde, hasta, opciones):
+    """Punto de entrada de cada proceso del pool: un scraper (y un driver) por worker."""
+    scraper = ScraperIAMC(nombre=f"worker-{indice}", **opciones)
+    try:
+        return scraper.procesar_meses(meses, desde, hasta)
+    finally:
+        scraper.cerrar()
+
+
+def escribir_reporte(ruta, titulo, informes_no_encontrados, informes_fecha_incorrecta, errores_descarga):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(f"--- Reporte de Descargas {titulo} ---\n")
+        f.write(f"Fecha de generación: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+        if informes_no_encontrados:
+            f.write("--- Días donde NO se encontró el informe (No hay enlace o 'Sin informes') ---\n")
+            for fecha_info in informes_no_encontrados:
+                f.write(f"- {fecha_info}\n")
+            f.write("\n")
+        else:
+            f.write("--- Todos los informes se encontraron (sin 'sin informes') ---\n\n")
+
+        if informes_fecha_incorrecta:
+            f.write("--- Días donde el informe encontrado CORRESPONDE a una FECHA DISTINTA a la buscada ---\n")
+            f.write("(Esto indica un comportamiento inusual del calendario o redirección del sitio)\n")
+            for fecha_info in informes_fecha_incorrecta:
+                f.write(f"- {fecha_info}\n")
+            f.write("\n")
+        else:
+            f.write("--- No se registraron informes con fecha incorrecta ---\n\n")
+
+        if errores_descarga:
+            f.write("--- Días con ERRORES TÉCNICOS durante la descarga ---\n")
+            f.write("(Esto puede incluir problemas de red, errores de Selenium, o URL no válidas)\n")
+            for error_info in errores_descarga:
+                f.write(f"- {error_info}\n")
+            f.write("\n")
+        else:
+            f.write("--- No se registraron errores técnicos de descarga ---\n\n")
+
+        if not informes_no_encontrados and not errores_descarga and not informes_fecha_incorrecta:
+            f.write("¡Felicitaciones! Todos los informes se procesaron correctamente sin errores o informes faltantes conocidos.\n")
+
+
+def ejecutar_pool(desde, hasta, n_workers=1, carpeta_base=".", url_base=BASE_IAMC_URL, headless=True,
+                  ruta_manifiesto=RUTA_MANIFIESTO, max_descargas=MAX_DESCARGAS_SIMULTANEAS):
+    """
+    Reparte los meses de [desde, hasta] entre `n_workers` procesos, cada uno con su driver,
+    descarga en paralelo las URLs resueltas y escribe un único reporte combinado.
+    Devuelve la ruta del reporte.
+    """
+    meses = meses_en_rango(desde, hasta)
+    grupos = repartir_meses(meses, n_workers)
+    opciones = dict(carpeta_base=carpeta_base, url_base=url_base, headless=headless, ruta_manifiesto=ruta_manifiesto)
+    print(f"--- {len(meses)} meses entre {desde:%d-%m-%Y} y {hasta:%d-%m-%Y}, repartidos en {len(grupos)} workers ---")
+
+    combinado = {"informes_no_encontrados": [], "informes_fecha_incorrecta": [], "errores_descarga": [], "descargas_pendientes": []}
+    resultados = []
+
+    def fallo_worker(indice, e):
+        # Un worker caído no frena a los demás: sus meses quedan en el reporte como errores
+        meses_worker = grupos[indice]
+        print(f"ERROR: worker-{indice} falló ({type(e).__name__}: {e}); meses sin completar: "
+              + ", ".join(f"{mes:02d}-{anio}" for anio, mes in meses_worker))
+        combinado["errores_descarga"].extend(
+            f"01-{mes:02d}-{anio} (worker-{indice} falló, mes sin completar: {type(e).__name__}: {e})"
+            for anio, mes in meses_worker)
+
+    if len(grupos) == 1:
+        try:
+            resultados.append(_procesar_en_worker(0, grupos[0], desde, hasta, opciones))
+        except Exception as e:
+            fallo_worker(0, e)
+    else:
+        with ProcessPoolExecutor(max_workers=len(grupos)) as pool:
+            futuros = {pool.submit(_procesar_en_worker, i, g, desde, hasta, opciones): i for i, g in enumerate(grupos)}
+            for futuro in as_completed(futuros):
+                try:
+                    resultados.append(futuro.result())
+                except Exception as e:
+                    fallo_worker(futuros[futuro], e)
+    for resultado in resultados:
+        for clave, valores in resultado.items():
+            combinado[clave].extend(valores)
+
+    with Manifiesto(ruta_manifiesto) as manifiesto:
+        pendientes = combinado["descargas_pendientes"]
+        if pendientes:
+            print(f"\n--- Descargando {len(pendientes)} informes en paralelo ({max_descargas} simultáneos) ---")
+        for r in descargar_en_paralelo(pendientes, max_workers=max_descargas):
+            if r["error"]:
+                detalle = f"Error de descarga con requests desde URL final: {r['error']}"
+                combinado["errores_descarga"].append(f"{r['fecha'].strftime('%d-%m-%Y')} ({detalle})")
+                manifiesto.registrar(r["fecha"], CATEGORIA_ERROR, url=r["url"], estado_http=r["estado_http"], detalle=detalle)
+            else:
+                manifiesto.registrar_descarga(r["fecha"], r["ruta"], url=r["url"], estado_http=r["estado_http"])
+        print(f"Manifiesto actualizado: {manifiesto.resumen()}")
+
+        tiempos = manifiesto.resumen_tiempos(desde, hasta)
+        if tiempos:
+            print("Tiempos por etapa (promedio / máximo, en segundos):")
+            for etapa, t in tiempos.items():
+                print(f"  {etapa:<18} {t['promedio']:6.2f} / {t['maximo']:6.2f}  (n={t['n']})")
+
+    # Los listados se ordenan por fecha ('DD-MM-AAAA (...)') para que el reporte no dependa del orden de los workers
+    orden = lambda linea: datetime.strptime(linea[:10], '%d-%m-%Y')
+    reporte_path = os.path.join(carpeta_base, f"reporte_descargas_{desde:%Y%m%d}_{hasta:%Y%m%d}.txt")
+    escribir_reporte(
+        reporte_path,
+        f"del {desde:%d-%m-%Y} al {hasta:%d-%m-%Y}",
+        sorted(combinado["informes_no_encontrados"], key=orden),
+        sorted(combinado["informes_fecha_incorrecta"], key=orden),
+        sorted(combinado["errores_descarga"], key=orden),
+    )
+    print(f"\n--- Informe final de descargas guardado en: {reporte_path} ---")
+    return reporte_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scraper de informes diarios del IAMC")
+    parser.add_argument("--desde", type=lambda s: datetime.strptime(s, "%Y-%m-%d"), help="Fecha inicial AAAA-MM-DD")
+    parser.add_argument("--hasta", type=lambda s: datetime.strptime(s, "%Y-%m-%d"), help="Fecha final AAAA-MM-DD")
+    parser.add_argument("--anio", type=int, help="Atajo para --desde AAAA-01-01 --hasta AAAA-12-31")
+    parser.add_argument("--workers", type=int, default=1, help="Cantidad de drivers en paralelo")
+    parser.add_argument("--carpeta", help="Carpeta donde se crean las carpetas IAMC_Informes_AAAA (por defecto '.')")
+    parser.add_argument("--manifiesto", help=f"Manifiesto SQLite (por defecto {RUTA_MANIFIESTO})")
+    parser.add_argument("--visible", action="store_true", help="Abrir Chrome con ventana (por defecto headless)")
+    parser.add_argument("--calendario-falso", action="store_true", help="Usar el calendario local de calendario_falso.py")
+    args = parser.parse_args(argv)
+
+    if args.anio:
+        args.desde = args.desde or datetime(args.anio, 1, 1)
+        args.hasta = args.hasta or datetime(args.anio, 12, 31)
+    if not args.desde or not args.hasta:
+        parser.error("Indicar --anio o --desde/--hasta")
+
+    if args.calendario_falso:
+        # Los PDFs falsos y su manifiesto van aparte (por defecto a una carpeta temporal): no se mezclan con los reales
+        args.carpeta = args.carpeta or tempfile.mkdtemp(prefix="iamc_calendario_falso_")
+        args.manifiesto = args.manifiesto or os.path.join(args.carpeta, os.path.basename(RUTA_MANIFIESTO))
+        print(f"INFO: calendario falso, informes en {args.carpeta} y manifiesto en {args.manifiesto}")
+    kwargs = dict(n_workers=args.workers, carpeta_base=args.carpeta or ".", headless=not args.visible,
+                  ruta_manifiesto=args.manifiesto or RUTA_MANIFIESTO)
+    if args.calendario_falso:
+        from calendario_falso import ServidorCalendario
+        with ServidorCalendario() as servidor:
+            return ejecutar_pool(args.desde, args.hasta, url_base=servidor.url_base, **kwargs)
+    return ejecutar_pool(args.desde, args.hasta, **kwargs)
+
+
+if __name__ == "__main__":
+    main()
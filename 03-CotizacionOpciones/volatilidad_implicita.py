@@ -0,0 +1,305 @@
+"""
+Volatilidad implícita y griegas (Black-Scholes) de df_opciones, vectorizado con NumPy.
+
+Cada cotización se une con:
+    - la tasa de su vencimiento en df_vtos_tasa.parquet (por Fecha y Mes_Vto), pasada de
+      tasa nominal anual a tasa continua para el plazo Dias_Vto,
+    - el cierre de GGAL de 00-Cotizacion/GGAL.csv. Ese cierre viene de yfinance ajustado por
+      dividendos; se deshace el ajuste con la columna Dividends para que sea comparable con
+      los strikes. Si falta la rueda se toma el último cierre anterior (hasta DIAS_TOLERANCIA_SPOT).
+
+La volatilidad implícita de toda la tabla se resuelve junta: Newton-Raphson con un intervalo
+[VOL_MIN, VOL_MAX] que se achica en cada iteración; si el paso de Newton sale del intervalo
+(o la vega es casi nula) se usa bisección. Las cotizaciones fuera de los límites de no
+arbitraje quedan con iv NaN.
+
+`superficie_diaria` resume la superficie por rueda (volatilidad ATM, skew y pendiente de
+plazos) para usar como variables del modelo.
+
+Uso:
+    python volatilidad_implicita.py [df_opciones.parquet] [--spot ../00-Cotizacion/GGAL.csv]
+    python volatilidad_implicita.py --benchmark [--muestra 2000]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+RUTA_OPCIONES = "df_opciones.parquet"
+RUTA_VTOS_TASA = "df_vtos_tasa.parquet"
+RUTA_SPOT = os.path.join("..", "00-Cotizacion", "GGAL.csv")
+RUTA_VOLATILIDADES = "df_opciones_iv.parquet"
+RUTA_SUPERFICIE = "df_superficie_vol.parquet"
+
+DIAS_ANIO = 365.0
+DIAS_TOLERANCIA_SPOT = 5
+VOL_MIN = 1e-4
+VOL_MAX = 5.0
+TOLERANCIA = 1e-8
+MAX_ITERACIONES = 100
+
+# Superficie: primer vencimiento con al menos DIAS_MINIMOS_VTO días y strikes con
+# |log(K/F)| <= BANDA_SKEW para estimar la pendiente de la sonrisa
+DIAS_MINIMOS_VTO = 7
+BANDA_SKEW = 0.2
+
+COMPRA, VENTA = 1, 2
+
+
+# --- Black-Scholes ---
+
+def _d1_d2(spot, strike, plazo, tasa, vol):
+    raiz = vol * np.sqrt(plazo)
+    d1 = (np.log(spot / strike) + (tasa + 0.5 * vol * vol) * plazo) / raiz
+    return d1, d1 - raiz
+
+
+def precio_bs(spot, strike, plazo, tasa, vol, es_compra):
+    """Prima Black-Scholes (sin dividendos). `es_compra` es un array booleano."""
+    d1, d2 = _d1_d2(spot, strike, plazo, tasa, vol)
+    descuento = strike * np.exp(-tasa * plazo)
+    compra = spot * ndtr(d1) - descuento * ndtr(d2)
+    return np.where(es_compra, compra, compra - spot + descuento)
+
+
+def vega_bs(spot, strike, plazo, tasa, vol):
+    d1, _ = _d1_d2(spot, strike, plazo, tasa, vol)
+    return spot * np.sqrt(plazo) * np.exp(-0.5 * d1 * d1) / np.sqrt(2 * np.pi)
+
+
+def delta_bs(spot, strike, plazo, tasa, vol, es_compra):
+    d1, _ = _d1_d2(spot, strike, plazo, tasa, vol)
+    return np.where(es_compra, ndtr(d1), ndtr(d1) - 1.0)
+
+
+def volatilidad_implicita(precio, spot, strike, plazo, tasa, es_compra,
+                          tolerancia=TOLERANCIA, max_iteraciones=MAX_ITERACIONES):
+    """
+    Volatilidad implícita de arrays de cotizaciones (Newton con intervalo y bisección).
+    Devuelve (iv, iteraciones). iv es NaN si el precio está fuera de los límites de no
+    arbitraje, si no se alcanza con una volatilidad en [VOL_MIN, VOL_MAX] o si faltan datos.
+    """
+    precio, spot, strike, plazo, tasa = (np.asarray(x, dtype=float) for x in (precio, spot, strike, plazo, tasa))
+    es_compra = np.asarray(es_compra, dtype=bool)
+
+    descuento = strike * np.exp(-tasa * plazo)
+    minimo = np.where(es_compra, np.maximum(spot - descuento, 0.0), np.maximum(descuento - spot, 0.0))
+    maximo = np.where(es_compra, spot, descuento)
+    with np.errstate(invalid="ignore"):
+        validas = (plazo > 0) & (spot > 0) & (strike > 0) & (precio > minimo) & (precio < maximo)
+    iv = np.full(precio.shape, np.nan)
+    indices = np.flatnonzero(validas)
+    if len(indices) == 0:
+        return iv, 0
+
+    p, s, k, t, r, c = (x[indices] for x in (precio, spot, strike, plazo, tasa, es_compra))
+    bajo = np.full(len(indices), VOL_MIN)
+    alto = np.full(len(indices), VOL_MAX)
+    # Punto de partida de Brenner-Subrahmanyam, dentro del intervalo
+    vol = np.clip(np.sqrt(2 * np.pi / t) * p / s, 0.05, 2.0)
+
+    activas = np.arange(len(indices))
+    iteraciones = 0
+    while len(activas) and iteraciones < max_iteraciones:
+        iteraciones += 1
+        v, ps, pk, pt, pr, pc = vol[activas], s[activas], k[activas], t[activas], r[activas], c[activas]
+        diferencia = precio_bs(ps, pk, pt, pr, v, pc) - p[activas]
+
+        # El precio crece con la volatilidad: el signo de la diferencia achica el intervalo
+        arriba = diferencia > 0
+        alto[activas] = np.where(arriba, v, alto[activas])
+        bajo[activas] = np.where(arriba, bajo[activas], v)
+
+        convergidas = np.abs(diferencia) < tolerancia
+        vega = vega_bs(ps, pk, pt, pr, v)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = v - diferencia / vega
+        b, a = bajo[activas], alto[activas]
+        usar_newton = (vega > 1e-12) & (newton > b) & (newton < a)
+        vol[activas] = np.where(convergidas, v, np.where(usar_newton, newton, 0.5 * (b + a)))
+        activas = activas[~convergidas & (alto[activas] - bajo[activas] > tolerancia)]
+
+    # Si la solución quedó pegada a un extremo, el precio no se alcanza dentro de [VOL_MIN, VOL_MAX]
+    vol[(vol <= VOL_MIN + tolerancia) | (vol >= VOL_MAX - tolerancia)] = np.nan
+    iv[indices] = vol
+    return iv, iteraciones
+
+
+# --- Insumos ---
+
+def cierre_sin_ajuste(df):
+    """
+    Close de un CSV de yfinance (Close, Dividends) sin el ajuste por dividendos: los cierres
+    anteriores a cada fecha ex se dividen por el factor (1 - dividendo / cierre anterior).
+    """
+    factor = (1 - df["Dividends"] / df["Close"].shift(1)).where(df["Dividends"] > 0, 1.0)
+    # Producto de los factores de las fechas ex posteriores a cada rueda
+    posteriores = factor[::-1].cumprod()[::-1].shift(-1, fill_value=1.0)
+    return df["Close"] / posteriores
+
+
+def cargar_spot(ruta_csv=RUTA_SPOT):
+    """Cierre de GGAL por rueda (Fecha, spot) sin el ajuste por dividendos de yfinance."""
+    df = pd.read_csv(ruta_csv, usecols=["Date", "Close", "Dividends"])
+    df["Fecha"] = pd.to_datetime(df["Date"].str[:10]).astype("datetime64[ns]")
+    df["spot"] = cierre_sin_ajuste(df)
+    return df[["Fecha", "spot"]].sort_values("Fecha")
+
+
+def unir_insumos(df_opciones, df_vtos, df_spot):
+    """df_opciones con spot, plazo (años) y tasa continua de su vencimiento."""
+    vtos = df_vtos.drop_duplicates(["Fecha", "Mes_Vto"])[["Fecha", "Mes_Vto", "Fecha_Vto", "Dias_Vto", "Tasa"]]
+    df = df_opciones.astype({"Mes_Vto": "int32"}).merge(vtos, on=["Fecha", "Mes_Vto"], how="left")
+    df = pd.merge_asof(df.sort_values("Fecha"), df_spot, on="Fecha", direction="backward",
+                       tolerance=pd.Timedelta(days=DIAS_TOLERANCIA_SPOT))
+
+    df["plazo"] = df["Dias_Vto"] / DIAS_ANIO
+    # Tasa nominal anual (%) a tasa continua equivalente para el plazo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["tasa"] = np.log1p(df["Tasa"] / 100 * df["Dias_Vto"] / DIAS_ANIO) / df["plazo"]
+    return df
+
+
+def calcular_volatilidades(df_opciones, df_vtos, df_spot, verbose=True):
+    """df_opciones con spot, plazo, tasa, iv, delta_bs y vega (por 1 punto de volatilidad)."""
+    inicio = time.perf_counter()
+    df = unir_insumos(df_opciones, df_vtos, df_spot)
+    es_compra = (df["opcion"] == COMPRA).to_numpy()
+    argumentos = [df[c].to_numpy(float) for c in ("spot", "strike", "plazo", "tasa")]
+
+    iv, iteraciones = volatilidad_implicita(df["Ultimo_Precio"].to_numpy(float), *argumentos, es_compra)
+    df["iv"] = iv
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["delta_bs"] = delta_bs(*argumentos, iv, es_compra)
+        df["vega"] = vega_bs(*argumentos, iv) / 100
+    if verbose:
+        print(f"INFO: iv de {df['iv'].notna().sum()} de {len(df)} cotizaciones en "
+              f"{time.perf_counter() - inicio:.2f}s ({iteraciones} iteraciones)")
+    return df
+
+
+# --- Superficie ---
+
+def _por_vencimiento(df):
+    """Por (Fecha, Mes_Vto): plazo, volatilidad ATM y skew (pendiente de iv contra log(K/F))."""
+    df = df.assign(k=np.log(df["strike"] / (df["spot"] * np.exp(df["tasa"] * df["plazo"]))))
+    grupos = ["Fecha", "Mes_Vto"]
+
+    # ATM: promedio de compra y venta en el strike más cercano al forward
+    df["distancia"] = df["k"].abs()
+    cercania = df.groupby(grupos)["distancia"].transform("min")
+    atm = df[df["distancia"] == cercania].groupby(grupos).agg(iv_atm=("iv", "mean"), plazo=("plazo", "first"))
+
+    # Skew: cov(k, iv) / var(k) dentro de la banda, en una sola pasada de groupby
+    banda = df[df["distancia"] <= BANDA_SKEW].assign(k_iv=lambda d: d["k"] * d["iv"], k2=lambda d: d["k"] ** 2)
+    sumas = banda.groupby(grupos).agg(n=("k", "size"), k=("k", "sum"), iv=("iv", "sum"),
+                                      k_iv=("k_iv", "sum"), k2=("k2", "sum"))
+    varianza = sumas["k2"] - sumas["k"] ** 2 / sumas["n"]
+    skew = (sumas["k_iv"] - sumas["k"] * sumas["iv"] / sumas["n"]) / varianza
+    atm["skew"] = skew.where((sumas["n"] >= 3) & (varianza > 1e-12))
+    return atm.reset_index()
+
+
+def superficie_diaria(df_iv, solo_operadas=True):
+    """
+    Resumen por rueda de la superficie de volatilidad:
+        iv_atm, skew          del primer vencimiento con al menos DIAS_MINIMOS_VTO días
+        iv_atm_2              del vencimiento siguiente
+        pendiente_plazos      (iv_atm_2 - iv_atm) / (plazo_2 - plazo), por año
+        cotizaciones          cotizaciones con iv usadas
+    `solo_operadas` descarta las series sin lotes operados (último precio de otra rueda).
+    """
+    df = df_iv[df_iv["iv"].notna()]
+    if solo_operadas:
+        df = df[df["Lotes"] > 0]
+    cotizaciones = df.groupby("Fecha").size().rename("cotizaciones")
+
+    vtos = _por_vencimiento(df)
+    vtos = vtos[vtos["plazo"] >= DIAS_MINIMOS_VTO / DIAS_ANIO].sort_values(["Fecha", "plazo"])
+    vtos["orden"] = vtos.groupby("Fecha").cumcount()
+    primero = vtos[vtos["orden"] == 0].set_index("Fecha")
+    segundo = vtos[vtos["orden"] == 1].set_index("Fecha")
+
+    resumen = pd.DataFrame({"iv_atm": primero["iv_atm"], "skew": primero["skew"], "plazo": primero["plazo"]})
+    resumen["iv_atm_2"] = segundo["iv_atm"]
+    resumen["pendiente_plazos"] = (segundo["iv_atm"] - primero["iv_atm"]) / (segundo["plazo"] - primero["plazo"])
+    return resumen.join(cotizaciones).reset_index()
+
+
+def procesar(ruta_opciones=RUTA_OPCIONES, ruta_vtos=RUTA_VTOS_TASA, ruta_spot=RUTA_SPOT):
+    """Calcula iv y superficie y guarda RUTA_VOLATILIDADES y RUTA_SUPERFICIE junto a df_opciones."""
+    df_iv = calcular_volatilidades(pd.read_parquet(ruta_opciones), pd.read_parquet(ruta_vtos), cargar_spot(ruta_spot))
+    superficie = superficie_diaria(df_iv)
+    carpeta = os.path.dirname(os.path.abspath(ruta_opciones))
+    df_iv.to_parquet(os.path.join(carpeta, RUTA_VOLATILIDADES), index=False)
+    superficie.to_parquet(os.path.join(carpeta, RUTA_SUPERFICIE), index=False)
+    print(f"✅ {len(df_iv)} cotizaciones en {RUTA_VOLATILIDADES}, {len(superficie)} ruedas en {RUTA_SUPERFICIE}")
+    return df_iv, superficie
+
+
+# --- Benchmark ---
+
+def _iv_escalar(precio, spot, strike, plazo, tasa, es_compra):
+    """Una cotización por vez con scipy (norm.cdf + brentq), como se haría con un apply."""
+    from scipy.optimize import brentq
+    from scipy.stats import norm
+
+    def precio_escalar(vol):
+        raiz = vol * np.sqrt(plazo)
+        d1 = (np.log(spot / strike) + (tasa + 0.5 * vol * vol) * plazo) / raiz
+        compra = spot * norm.cdf(d1) - strike * np.exp(-tasa * plazo) * norm.cdf(d1 - raiz)
+        return (compra if es_compra else compra - spot + strike * np.exp(-tasa * plazo)) - precio
+
+    try:
+        return brentq(precio_escalar, VOL_MIN, VOL_MAX, xtol=1e-10)
+    except ValueError:
+        return np.nan
+
+
+def benchmark(ruta_opciones=RUTA_OPCIONES, ruta_vtos=RUTA_VTOS_TASA, ruta_spot=RUTA_SPOT, muestra=2000):
+    """Historia completa vectorizada contra scipy escalar (sobre `muestra` filas, extrapolado)."""
+    df_opciones, df_vtos, df_spot = pd.read_parquet(ruta_opciones), pd.read_parquet(ruta_vtos), cargar_spot(ruta_spot)
+
+    inicio = time.perf_counter()
+    df_iv = calcular_volatilidades(df_opciones, df_vtos, df_spot, verbose=False)
+    superficie = superficie_diaria(df_iv)
+    t_vectorizado = time.perf_counter() - inicio
+
+    filas = df_iv.sample(min(muestra, len(df_iv)), random_state=0)
+    columnas = ["Ultimo_Precio", "spot", "strike", "plazo", "tasa"]
+    inicio = time.perf_counter()
+    escalar = np.array([_iv_escalar(*fila[columnas], fila["opcion"] == COMPRA) for _, fila in filas.iterrows()])
+    t_escalar = (time.perf_counter() - inicio) * len(df_iv) / len(filas)
+
+    ambas = ~np.isnan(escalar) & filas["iv"].notna().to_numpy()
+    solo_una = np.isnan(escalar) != filas["iv"].isna().to_numpy()
+    diferencia = np.abs(escalar[ambas] - filas["iv"].to_numpy()[ambas]).max()
+    n = len(df_iv)
+    print(f"Historia completa: {n} cotizaciones, {len(superficie)} ruedas en la superficie")
+    print(f"  scipy escalar (extrapolado de {len(filas)}): {t_escalar:8.1f}s ({n / t_escalar:9.0f} filas/s)")
+    print(f"  vectorizado (iv + griegas + superficie): {t_vectorizado:8.2f}s ({n / t_vectorizado:9.0f} filas/s) "
+          f"| x{t_escalar / t_vectorizado:.0f}")
+    print(f"  diferencia máxima con scipy: {diferencia:.1e} | iv en sólo una de las dos: {solo_una.sum()}")
+
+    iamc = df_iv["Volat_Implicita_%"] / 100
+    operadas = df_iv["iv"].notna() & (df_iv["Lotes"] > 0) & (iamc > 0)
+    print(f"  mediana |iv - Volat_Implicita_% IAMC| en series operadas: "
+          f"{(df_iv.loc[operadas, 'iv'] - iamc[operadas]).abs().median() * 100:.2f} puntos")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Volatilidad implícita y superficie de las opciones GFG")
+    parser.add_argument("opciones", nargs="?", default=RUTA_OPCIONES)
+    parser.add_argument("--vtos", default=RUTA_VTOS_TASA)
+    parser.add_argument("--spot", default=RUTA_SPOT)
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--muestra", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.opciones, args.vtos, args.spot, args.muestra)
+    else:
+        procesar(args.opciones, args.vtos, args.spot)
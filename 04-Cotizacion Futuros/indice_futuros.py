@@ -0,0 +1,313 @@
+"""
+Índice derivado de df_futuro_*.parquet: serie continua (1ra y 2da posición) y curva de futuros.
+
+Se guardan dos parquets junto al de futuros:
+    <nombre>_continuo.parquet   una fila por fecha: contrato 1ra y 2da posición, sus ajustes y
+                                días al vencimiento, si hubo roll, tasa implícita entre ambos y
+                                un índice continuo encadenado (base 100)
+    <nombre>_curva.parquet      una fila por fecha: ajuste y días al vencimiento por meses al
+                                vencimiento (ajuste_m0 = contrato del mes, ajuste_m1 = el siguiente, ...)
+
+Reglas de roll (REGLAS):
+    "vencimiento"  la 1ra posición es el contrato más cercano con más de `dias_antes` días
+                   hábiles al vencimiento
+    "volumen"      se pasa del contrato más cercano al siguiente cuando el volumen del siguiente
+                   lo supera (o cuando la 1ra posición vence o deja de cotizar); nunca se vuelve atrás
+
+El vencimiento se toma como el último día hábil del mes (sin feriados locales).
+
+`actualizar()` sólo procesa las fechas posteriores a la última indexada; el estado del día
+anterior (contrato en la 1ra posición, su ajuste y el valor del índice) sale de la última fila
+guardada. Si cambian la regla o sus parámetros se reconstruye todo. Después de `cargar()`
+las consultas por fecha (`posicion`, `curva`, `tasa_implicita`, `base`) son búsquedas en
+un índice por fecha, sin recorrer la tabla de contratos.
+
+Uso:
+    python indice_futuros.py df_futuro_dolar.parquet [--regla volumen] [--reconstruir]
+    python indice_futuros.py df_futuro_dolar.parquet --benchmark
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+REGLAS = ("vencimiento", "volumen")
+DIAS_ANTES_ROLL = 3
+MAX_MESES = 12
+BASE_INDICE = 100.0
+COLUMNA_PRECIO = "Ajuste / VT"
+
+COLUMNAS_CONTINUO = ["fecha", "anio_vto_1", "mes_vto_1", "ajuste_1", "dias_vto_1",
+                     "anio_vto_2", "mes_vto_2", "ajuste_2", "dias_vto_2",
+                     "rolado", "tasa_implicita_1_2", "indice_continuo"]
+
+
+def vencimiento_contrato(anio_vto, mes_vto):
+    """Último día hábil del mes de vencimiento (Series o escalares)."""
+    inicio_mes = pd.to_datetime(pd.DataFrame({"year": anio_vto, "month": mes_vto, "day": 1}))
+    return inicio_mes + pd.offsets.BMonthEnd(0)
+
+
+def _tasa_implicita(precio_corto, dias_corto, precio_largo, dias_largo):
+    """Tasa anual efectiva implícita entre dos ajustes: (F_largo / F_corto) ^ (365 / días) - 1."""
+    dias = dias_largo - dias_corto
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tasa = (precio_largo / precio_corto) ** (365.0 / dias) - 1
+    return np.where(dias > 0, tasa, np.nan)
+
+
+class IndiceFuturos:
+    """Serie continua y curva de un archivo df_futuro_*.parquet."""
+
+    def __init__(self, ruta_futuros, regla="vencimiento", dias_antes=DIAS_ANTES_ROLL, max_meses=MAX_MESES):
+        if regla not in REGLAS:
+            raise ValueError(f"Regla de roll desconocida: {regla} (opciones: {REGLAS})")
+        self.ruta_futuros = ruta_futuros
+        self.regla = regla
+        self.dias_antes = dias_antes
+        self.max_meses = max_meses
+        base = os.path.splitext(ruta_futuros)[0]
+        self.ruta_continuo = f"{base}_continuo.parquet"
+        self.ruta_curva = f"{base}_curva.parquet"
+        self.continuo = None
+        self.curva_fechas = None
+
+    @property
+    def parametros(self):
+        return {"regla": self.regla, "dias_antes": self.dias_antes, "max_meses": self.max_meses}
+
+    # --- Construcción ---
+
+    def _contratos(self, desde=None):
+        """Contratos de df_futuro con fecha > `desde`, con días hábiles y meses al vencimiento."""
+        filtro = ds.field("fecha") > pd.Timestamp(desde) if desde is not None else None
+        df = ds.dataset(self.ruta_futuros).to_table(filter=filtro).to_pandas()
+        df = df.dropna(subset=["fecha", COLUMNA_PRECIO])
+        vencimiento = vencimiento_contrato(df["anio_vto"], df["mes_vto"])
+        df["dias_vto"] = (vencimiento.dt.normalize() - df["fecha"]).dt.days
+        df["dias_habiles_vto"] = np.busday_count(df["fecha"].to_numpy(dtype="datetime64[D]"),
+                                                 vencimiento.to_numpy(dtype="datetime64[D]"))
+        df["meses_vto"] = (df["anio_vto"] * 12 + df["mes_vto"]) - (df["fecha"].dt.year * 12 + df["fecha"].dt.month)
+        df["codigo_vto"] = df["anio_vto"] * 100 + df["mes_vto"]
+        return df[df["dias_vto"] >= 0].sort_values(["fecha", "codigo_vto"], kind="stable")
+
+    def _estado_guardado(self):
+        """(continuo, curva) ya guardados si fueron construidos con los mismos parámetros."""
+        if not (os.path.exists(self.ruta_continuo) and os.path.exists(self.ruta_curva)):
+            return None, None
+        metadatos = pq.read_schema(self.ruta_continuo).metadata or {}
+        if json.loads(metadatos.get(b"indice_futuros", b"{}")) != self.parametros:
+            print("ADVERTENCIA: cambiaron los parámetros del índice, se reconstruye completo")
+            return None, None
+        return pd.read_parquet(self.ruta_continuo), pd.read_parquet(self.ruta_curva)
+
+    def _serie_continua(self, contratos, anterior):
+        """Recorre las fechas nuevas aplicando la regla de roll a partir del estado `anterior` (fila o None)."""
+        codigo = int(anterior["anio_vto_1"] * 100 + anterior["mes_vto_1"]) if anterior is not None else None
+        ajuste_previo = anterior["ajuste_1"] if anterior is not None else np.nan
+        indice = anterior["indice_continuo"] if anterior is not None else BASE_INDICE
+
+        filas = []
+        for fecha, dia in contratos.groupby("fecha", sort=True):
+            codigos = dia["codigo_vto"].to_numpy()
+            ajustes = dia[COLUMNA_PRECIO].to_numpy()
+
+            # Rendimiento del día con el contrato que se tenía al cierre anterior
+            if codigo is not None and codigo in codigos and ajuste_previo > 0:
+                indice *= ajustes[codigos == codigo][0] / ajuste_previo
+
+            if self.regla == "vencimiento":
+                candidatos = np.flatnonzero(dia["dias_habiles_vto"].to_numpy() > self.dias_antes)
+                i_1 = candidatos[0] if len(candidatos) else len(codigos) - 1
+            else:
+                volumenes = dia["Volumen"].to_numpy()
+                posibles = np.flatnonzero(codigos >= codigo) if codigo is not None else np.arange(len(codigos))
+                i_1 = posibles[0] if len(posibles) else len(codigos) - 1
+                # Sólo se rola desde el contrato más cercano al siguiente, nunca más lejos
+                if i_1 == 0 and codigos[i_1] == codigo and len(codigos) > 1 and volumenes[1] > volumenes[0]:
+                    i_1 += 1
+            rolado = codigo is not None and codigos[i_1] != codigo
+            codigo = int(codigos[i_1])
+            ajuste_previo = ajustes[i_1]
+
+            fila_1 = dia.iloc[i_1]
+            fila_2 = dia.iloc[i_1 + 1] if i_1 + 1 < len(codigos) else None
+            filas.append({
+                "fecha": fecha,
+                "anio_vto_1": fila_1["anio_vto"], "mes_vto_1": fila_1["mes_vto"],
+                "ajuste_1": fila_1[COLUMNA_PRECIO], "dias_vto_1": fila_1["dias_vto"],
+                "anio_vto_2": fila_2["anio_vto"] if fila_2 is not None else np.nan,
+                "mes_vto_2": fila_2["mes_vto"] if fila_2 is not None else np.nan,
+                "ajuste_2": fila_2[COLUMNA_PRECIO] if fila_2 is not None else np.nan,
+                "dias_vto_2": fila_2["dias_vto"] if fila_2 is not None else np.nan,
+                "rolado": rolado,
+                "indice_continuo": indice,
+            })
+
+        continuo = pd.DataFrame(filas, columns=[c for c in COLUMNAS_CONTINUO if c != "tasa_implicita_1_2"])
+        continuo["tasa_implicita_1_2"] = _tasa_implicita(
+            continuo["ajuste_1"].to_numpy(float), continuo["dias_vto_1"].to_numpy(float),
+            continuo["ajuste_2"].to_numpy(float), continuo["dias_vto_2"].to_numpy(float))
+        for col in ("anio_vto_1", "mes_vto_1", "dias_vto_1"):
+            continuo[col] = continuo[col].astype("int32")
+        for col in ("anio_vto_2", "mes_vto_2", "dias_vto_2"):
+            continuo[col] = continuo[col].astype("Int32")
+        return continuo[COLUMNAS_CONTINUO]
+
+    def _curva(self, contratos):
+        """Matriz fecha x meses al vencimiento con ajustes y días al vencimiento."""
+        dentro = contratos[contratos["meses_vto"].between(0, self.max_meses)]
+        ajustes = dentro.pivot(index="fecha", columns="meses_vto", values=COLUMNA_PRECIO)
+        dias = dentro.pivot(index="fecha", columns="meses_vto", values="dias_vto")
+        meses = range(self.max_meses + 1)
+        ajustes = ajustes.reindex(columns=meses).add_prefix("ajuste_m")
+        dias = dias.reindex(columns=meses).astype("float64").add_prefix("dias_m")
+        return pd.concat([ajustes, dias], axis=1).reset_index()
+
+    def actualizar(self, reconstruir=False):
+        """Agrega al índice las fechas nuevas de df_futuro. Devuelve la cantidad de fechas agregadas."""
+        continuo, curva = (None, None) if reconstruir else self._estado_guardado()
+        desde = continuo["fecha"].max() if continuo is not None and len(continuo) else None
+        contratos = self._contratos(desde)
+        if contratos.empty:
+            print(f"INFO: índice al día ({desde:%Y-%m-%d})" if desde is not None else "INFO: no hay contratos")
+            return 0
+
+        anterior = continuo.iloc[-1] if desde is not None else None
+        continuo_nuevo = self._serie_continua(contratos, anterior)
+        curva_nueva = self._curva(contratos)
+        if desde is not None:
+            continuo_nuevo = pd.concat([continuo, continuo_nuevo], ignore_index=True)
+            curva_nueva = pd.concat([curva, curva_nueva], ignore_index=True)
+
+        metadatos = {"indice_futuros": json.dumps(self.parametros)}
+        self._guardar(continuo_nuevo, self.ruta_continuo, metadatos)
+        self._guardar(curva_nueva, self.ruta_curva, metadatos)
+        nuevas = contratos["fecha"].nunique()
+        print(f"✅ {nuevas} fechas nuevas indexadas en {self.ruta_continuo} y {self.ruta_curva}")
+        self.continuo = self.curva_fechas = None
+        return nuevas
+
+    @staticmethod
+    def _guardar(df, ruta, metadatos):
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}), **metadatos})
+        pq.write_table(tabla, ruta + ".tmp")
+        os.replace(ruta + ".tmp", ruta)
+
+    # --- Consultas ---
+
+    def cargar(self):
+        """Carga los dos parquets indexados por fecha (hace falta haber llamado a `actualizar`)."""
+        self.continuo = pd.read_parquet(self.ruta_continuo).set_index("fecha")
+        self.curva_fechas = pd.read_parquet(self.ruta_curva).set_index("fecha")
+        return self
+
+    def _asegurar_cargado(self):
+        if self.continuo is None:
+            self.cargar()
+
+    def posicion(self, fecha):
+        """Fila de la serie continua para `fecha` (contratos 1ra/2da posición, ajustes, tasa, índice)."""
+        self._asegurar_cargado()
+        return self.continuo.loc[pd.Timestamp(fecha)]
+
+    def curva(self, fecha):
+        """DataFrame meses_vto -> (ajuste, dias_vto) de la curva de `fecha`."""
+        self._asegurar_cargado()
+        fila = self.curva_fechas.loc[pd.Timestamp(fecha)]
+        meses = range(self.max_meses + 1)
+        return pd.DataFrame({"ajuste": [fila[f"ajuste_m{m}"] for m in meses],
+                             "dias_vto": [fila[f"dias_m{m}"] for m in meses]},
+                            index=pd.Index(meses, name="meses_vto")).dropna()
+
+    def tasa_implicita(self, fecha, meses_corto=None, meses_largo=None):
+        """
+        Tasa anual implícita (carry) entre dos puntos de la curva de `fecha`. Sin argumentos,
+        entre la 1ra y la 2da posición de la serie continua.
+        """
+        if meses_corto is None and meses_largo is None:
+            return self.posicion(fecha)["tasa_implicita_1_2"]
+        self._asegurar_cargado()
+        fila = self.curva_fechas.loc[pd.Timestamp(fecha)]
+        return float(_tasa_implicita(fila[f"ajuste_m{meses_corto}"], fila[f"dias_m{meses_corto}"],
+                                     fila[f"ajuste_m{meses_largo}"], fila[f"dias_m{meses_largo}"]))
+
+    def base(self, fecha, spot):
+        """(base, tasa implícita anual) de la 1ra posición contra el precio `spot` de `fecha`."""
+        fila = self.posicion(fecha)
+        base = fila["ajuste_1"] - spot
+        tasa = float(_tasa_implicita(spot, 0.0, fila["ajuste_1"], float(fila["dias_vto_1"])))
+        return base, tasa
+
+
+def _tasa_recorriendo(df, fecha):
+    """Como se calcula hoy: filtrar df_futuro por fecha, ordenar y tomar los dos primeros contratos."""
+    dia = df[df["fecha"] == fecha].sort_values(["anio_vto", "mes_vto"])
+    vencimiento = vencimiento_contrato(dia["anio_vto"], dia["mes_vto"])
+    dias = (vencimiento - fecha).dt.days.to_numpy(float)
+    vigentes = dias >= 0
+    ajustes, dias = dia["Ajuste / VT"].to_numpy()[vigentes], dias[vigentes]
+    return float(_tasa_implicita(ajustes[0], dias[0], ajustes[1], dias[1])) if len(ajustes) > 1 else np.nan
+
+
+def benchmark(ruta_futuros="df_futuro_dolar.parquet", consultas=2000, fechas_nuevas=20):
+    """
+    Tiempo de construcción completa contra actualización incremental (últimas `fechas_nuevas`
+    fechas) y consultas de tasa implícita por fecha: índice cargado contra recorrer df_futuro.
+    """
+    temporal = tempfile.mkdtemp(prefix="bench_indice_")
+    try:
+        df = pd.read_parquet(ruta_futuros)
+        fechas = np.sort(df["fecha"].unique())
+        copia = os.path.join(temporal, os.path.basename(ruta_futuros))
+        df[df["fecha"] < fechas[-fechas_nuevas]].to_parquet(copia, index=False)
+        indice = IndiceFuturos(copia, regla="volumen")
+
+        inicio = time.perf_counter()
+        indice.actualizar(reconstruir=True)
+        t_completo = time.perf_counter() - inicio
+        df.to_parquet(copia, index=False)
+        inicio = time.perf_counter()
+        indice.actualizar()
+        t_incremental = time.perf_counter() - inicio
+        print(f"Construcción: completa {t_completo:.2f}s ({len(fechas) - fechas_nuevas} fechas) | "
+              f"incremental {t_incremental:.2f}s ({fechas_nuevas} fechas nuevas)")
+
+        azar = pd.to_datetime(np.random.default_rng(0).choice(fechas, consultas))
+        inicio = time.perf_counter()
+        antes = [_tasa_recorriendo(df, f) for f in azar[:consultas // 10]]
+        t_antes = (time.perf_counter() - inicio) / len(antes)
+
+        indice.cargar()
+        inicio = time.perf_counter()
+        despues = [indice.tasa_implicita(f, 0, 1) for f in azar]
+        t_despues = (time.perf_counter() - inicio) / len(despues)
+        print(f"Tasa implícita por fecha: recorriendo df_futuro {t_antes * 1e6:8.0f} µs/consulta | "
+              f"índice {t_despues * 1e6:6.0f} µs/consulta (x{t_antes / t_despues:.0f})")
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serie continua y curva de futuros")
+    parser.add_argument("futuros", nargs="?", default="df_futuro_dolar.parquet")
+    parser.add_argument("--regla", choices=REGLAS, default="vencimiento")
+    parser.add_argument("--dias-antes", type=int, default=DIAS_ANTES_ROLL)
+    parser.add_argument("--max-meses", type=int, default=MAX_MESES)
+    parser.add_argument("--reconstruir", action="store_true")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.futuros)
+    else:
+        IndiceFuturos(args.futuros, args.regla, args.dias_antes, args.max_meses).actualizar(args.reconstruir)
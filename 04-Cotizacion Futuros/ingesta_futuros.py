@@ -0,0 +1,240 @@
+"""
+Ingesta de los CSV de futuros (BYMA / MATba-Rofex) a parquet, para cualquier subyacente.
+
+Reemplaza a ETL_Futuros.ipynb y ETL_Futuros_GGAL.ipynb. Los dos formatos de CSV que
+publica el mercado se describen en FORMATOS (qué columnas leer por nombre, separador
+decimal, formato de fecha y de dónde sale el vencimiento); los subyacentes en SUBYACENTES.
+Para agregar un ticker alcanza con una entrada nueva en SUBYACENTES.
+
+Los CSV se leen por bloques (`chunksize`) con sólo las columnas necesarias y tipos
+explícitos. Cada bloque se reparte en un archivo temporal por año de `fecha`; al final
+cada año se ordena y se agrega al parquet de salida. La memoria queda acotada por el
+bloque y por el año más grande, no por el tamaño total del histórico.
+
+Uso:
+    python ingesta_futuros.py                      # todos los subyacentes de SUBYACENTES
+    python ingesta_futuros.py dolar --carpeta .
+    python ingesta_futuros.py --benchmark [--copias 50]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+FILAS_POR_BLOQUE = 200_000
+ENCODING = "latin1"
+SEPARADOR = ";"
+
+COLUMNAS_PRECIO = ["Primero", "Minimo", "Maximo", "Ultimo"]
+
+# Esquema de df_futuro_dolar.parquet / df_futuro_GGAL.parquet
+ESQUEMA = pa.schema([
+    ("fecha", pa.timestamp("ns")),
+    ("Primero", pa.float64()),
+    ("Minimo", pa.float64()),
+    ("Maximo", pa.float64()),
+    ("Ultimo", pa.float64()),
+    ("Volumen", pa.int64()),
+    ("Ajuste / VT", pa.float64()),
+    ("anio_vto", pa.int32()),
+    ("mes_vto", pa.int32()),
+])
+
+# columnas: nombre en el CSV -> nombre en el parquet. 'vencimiento' es la columna de la que
+# salen anio_vto / mes_vto: AAAAMM (numérico) en el formato anterior y el código del
+# contrato terminado en MMAAAA ('DLR012020', 'GGAL022020') en el actual.
+FORMATOS = {
+    "anterior": {  # hasta 2019: 'año;fecha;posicion;...;Mes Entrega (numeros);...'
+        "columnas": {"fecha": "fecha", "Primero": "Primero", "Minimo": "Minimo", "Maximo": "Maximo",
+                     "Ultimo": "Ultimo", "Volumen": "Volumen", "Ajuste / VT": "Ajuste / VT",
+                     "Mes Entrega (numeros)": "vencimiento"},
+        "decimal": ".",
+        "formato_fecha": "%d/%m/%Y",
+    },
+    "actual": {  # desde 2020: 'FECHA;PRODUCTO;TIPO CONTRATO;...'
+        "columnas": {"FECHA": "fecha", "PRIMERO": "Primero", "MINIMO": "Minimo", "MAXIMO": "Maximo",
+                     "ULTIMO": "Ultimo", "CONTRATOS": "Volumen", "AJUSTE / PRIMA REF.": "Ajuste / VT",
+                     "TIPO CONTRATO": "vencimiento"},
+        "decimal": ",",
+        "formato_fecha": "%d-%m-%Y",
+    },
+}
+
+SUBYACENTES = {
+    "dolar": {"archivos": ["FuturosDolar2017-2014.csv", "FuturosDolar2020-2025.csv"],
+              "salida": "df_futuro_dolar.parquet"},
+    "GGAL": {"archivos": ["FuturosGGAL2019-2017.csv", "FuturosGGAL2020-2025.csv"],
+             "salida": "df_futuro_GGAL.parquet"},
+}
+
+
+def detectar_formato(ruta_csv):
+    """'actual' si el encabezado empieza con FECHA, 'anterior' si no."""
+    with open(ruta_csv, encoding=ENCODING) as f:
+        primera = f.readline()
+    return "actual" if primera.split(SEPARADOR)[0].strip().upper() == "FECHA" else "anterior"
+
+
+def _tipos(formato):
+    """dtype de read_csv para cada columna del CSV."""
+    tipos = {}
+    for origen, destino in FORMATOS[formato]["columnas"].items():
+        if destino in COLUMNAS_PRECIO or destino == "Ajuste / VT":
+            tipos[origen] = "float64"
+        elif destino == "Volumen":
+            tipos[origen] = "Int64"
+        else:
+            tipos[origen] = "str"
+    return tipos
+
+
+def _normalizar(bloque, formato):
+    """Bloque leído del CSV -> DataFrame con las columnas y tipos de ESQUEMA."""
+    config = FORMATOS[formato]
+    bloque = bloque.rename(columns=config["columnas"])
+    bloque["fecha"] = pd.to_datetime(bloque["fecha"], format=config["formato_fecha"], errors="coerce")
+
+    vencimiento = bloque.pop("vencimiento").str.strip()
+    if formato == "anterior":
+        bloque["anio_vto"] = vencimiento.str[:4].astype("int32")
+        bloque["mes_vto"] = vencimiento.str[4:6].astype("int32")
+    else:
+        bloque["anio_vto"] = vencimiento.str[-4:].astype("int32")
+        bloque["mes_vto"] = vencimiento.str[-6:-4].astype("int32")
+    bloque["Volumen"] = bloque["Volumen"].astype("int64")
+    return bloque[ESQUEMA.names]
+
+
+def leer_csv_en_bloques(ruta_csv, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Genera DataFrames de hasta `filas_por_bloque` filas con el esquema de salida."""
+    formato = detectar_formato(ruta_csv)
+    config = FORMATOS[formato]
+    lector = pd.read_csv(
+        ruta_csv, encoding=ENCODING, sep=SEPARADOR, decimal=config["decimal"],
+        usecols=list(config["columnas"]), dtype=_tipos(formato), chunksize=filas_por_bloque,
+    )
+    with lector:
+        for bloque in lector:
+            yield _normalizar(bloque, formato)
+
+
+def ingestar(archivos, ruta_salida, filas_por_bloque=FILAS_POR_BLOQUE, verbose=True):
+    """
+    Lee los CSV de `archivos` (en cualquiera de los dos formatos) y escribe `ruta_salida`
+    ordenado por fecha y vencimiento. Devuelve la cantidad de filas escritas.
+    """
+    temporal = tempfile.mkdtemp(prefix="ingesta_futuros_", dir=os.path.dirname(os.path.abspath(ruta_salida)))
+    escritores = {}
+    try:
+        # 1) Repartir los bloques por año de fecha
+        for ruta_csv in archivos:
+            for bloque in leer_csv_en_bloques(ruta_csv, filas_por_bloque):
+                for anio, parte in bloque.groupby(bloque["fecha"].dt.year.fillna(0).astype(int), sort=False):
+                    if anio not in escritores:
+                        escritores[anio] = pq.ParquetWriter(os.path.join(temporal, f"{anio}.parquet"), ESQUEMA)
+                    escritores[anio].write_table(pa.Table.from_pandas(parte, schema=ESQUEMA, preserve_index=False))
+            if verbose:
+                print(f"INFO: leído {ruta_csv} ({detectar_formato(ruta_csv)})")
+        for escritor in escritores.values():
+            escritor.close()
+        escritores = {}
+
+        # 2) Ordenar año por año y escribir la salida
+        filas = 0
+        ruta_temporal = ruta_salida + ".tmp"
+        with pq.ParquetWriter(ruta_temporal, ESQUEMA) as salida:
+            for archivo in sorted(os.listdir(temporal), key=lambda f: int(f.split(".")[0])):
+                anio = pq.read_table(os.path.join(temporal, archivo)).to_pandas()
+                anio = anio.sort_values(["fecha", "anio_vto", "mes_vto"], kind="stable")
+                salida.write_table(pa.Table.from_pandas(anio, schema=ESQUEMA, preserve_index=False))
+                filas += len(anio)
+        os.replace(ruta_temporal, ruta_salida)
+    finally:
+        for escritor in escritores.values():
+            escritor.close()
+        shutil.rmtree(temporal, ignore_errors=True)
+
+    if verbose:
+        print(f"✅ {filas} filas guardadas en {ruta_salida}")
+    return filas
+
+
+def ingestar_subyacente(nombre, carpeta=".", filas_por_bloque=FILAS_POR_BLOQUE):
+    """Ingesta de un subyacente de SUBYACENTES con sus CSV en `carpeta`."""
+    config = SUBYACENTES[nombre]
+    archivos = [os.path.join(carpeta, a) for a in config["archivos"]]
+    return ingestar(archivos, os.path.join(carpeta, config["salida"]), filas_por_bloque)
+
+
+def benchmark(carpeta=".", copias=50, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Filas/s y pico de memoria (tracemalloc) sobre un CSV sintético de `copias` veces los
+    CSV del dólar, leyendo todo de una vez (como los notebooks) contra la lectura por bloques.
+    """
+    temporal = tempfile.mkdtemp(prefix="bench_futuros_")
+    try:
+        grandes = []
+        for archivo in SUBYACENTES["dolar"]["archivos"]:
+            with open(os.path.join(carpeta, archivo), encoding=ENCODING) as f:
+                encabezado = ""
+                # El encabezado del formato anterior tiene saltos de línea entre comillas
+                while encabezado.count('"') % 2 == 1 or not encabezado:
+                    encabezado += f.readline()
+                cuerpo = f.read()
+            grande = os.path.join(temporal, archivo)
+            with open(grande, "w", encoding=ENCODING) as f:
+                f.write(encabezado)
+                for _ in range(copias):
+                    f.write(cuerpo)
+            grandes.append(grande)
+        megas = sum(os.path.getsize(g) for g in grandes) / 1e6
+        print(f"Benchmark: {len(grandes)} CSV sintéticos, {megas:.0f} MB ({copias} copias)")
+
+        def todo_junto():
+            partes = []
+            for grande in grandes:
+                formato = detectar_formato(grande)
+                config = FORMATOS[formato]
+                df = pd.read_csv(grande, encoding=ENCODING, sep=SEPARADOR, decimal=config["decimal"],
+                                 usecols=list(config["columnas"]), dtype=_tipos(formato))
+                partes.append(_normalizar(df, formato))
+            df = pd.concat(partes, ignore_index=True).sort_values(["fecha", "anio_vto", "mes_vto"], kind="stable")
+            df.to_parquet(os.path.join(temporal, "todo.parquet"), index=False)
+            return len(df)
+
+        def por_bloques():
+            return ingestar(grandes, os.path.join(temporal, "bloques.parquet"), filas_por_bloque, verbose=False)
+
+        for nombre, funcion in (("todo junto", todo_junto), ("por bloques", por_bloques)):
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            filas = funcion()
+            duracion = time.perf_counter() - inicio
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{nombre:>12}: {filas} filas en {duracion:6.2f}s ({filas / duracion:9.0f} filas/s), "
+                  f"pico {pico / 1e6:7.1f} MB")
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingesta de CSV de futuros a parquet")
+    parser.add_argument("subyacentes", nargs="*", default=list(SUBYACENTES), help=f"de {list(SUBYACENTES)}")
+    parser.add_argument("--carpeta", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--filas-por-bloque", type=int, default=FILAS_POR_BLOQUE)
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--copias", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.carpeta, args.copias, args.filas_por_bloque)
+    else:
+        for subyacente in args.subyacentes:
+            ingestar_subyacente(subyacente, args.carpeta, args.filas_por_bloque)
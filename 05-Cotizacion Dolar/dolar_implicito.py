@@ -0,0 +1,372 @@
+"""
+Dólar implícito diario (CCL y MEP) reconstruido desde precios de mercado y conciliado contra
+las series publicadas (DOLAR CCL / DOLAR MEP - Cotizaciones historicas.csv).
+
+    - CCL por GGAL: cierre en BYMA (GGAL.BA) * RATIO_ADR / cierre del ADR en Nueva York.
+      Los dos cierres se llevan a UTC (las fechas de yfinance traen la zona de su plaza:
+      -03:00 / -02:00 en Buenos Aires, -04:00 / -05:00 en Nueva York) y cada rueda de BYMA
+      toma el cierre del ADR más cercano dentro de HORAS_TOLERANCIA: el de la misma sesión.
+      Si Nueva York no operó ese día, el CCL queda vacío y se marca el hueco (un cierre de
+      otro día no es un tipo de cambio). Los precios son sin el ajuste por dividendos de
+      yfinance (cierre_sin_ajuste de volatilidad_implicita.py), que es distinto en cada plaza.
+    - MEP por bonos: cierre en pesos / cierre en dólares de cada par de PARES_BONOS (AA17 /
+      AA17D, ...) en las ruedas en que las dos especies operaron (volumen nominal > 0).
+      `mep_bonos` es la mediana de los pares disponibles.
+    - Conciliación: `desvio_ccl` / `desvio_mep` (implícito / publicado - 1), `alerta_*` si el
+      desvío supera UMBRAL_DESVIO y `hueco_*` en las ruedas sin dato implícito o publicado.
+
+Se guarda en RUTA_SALIDA una fila por rueda de BYMA. `actualizar()` sólo recalcula las ruedas
+posteriores a la última guardada (y las últimas DIAS_REPASO, por si la serie publicada corrigió
+el cierre): los CSV se verifican como agregados al final (SHA-256 de los bytes ya procesados);
+si cambió algo anterior, un parámetro o las planillas de bonos, se reconstruye completo. También
+si las filas agregadas de GGAL.csv / GGAL_NY.csv traen un dividendo: el cierre sin ajuste de las
+ruedas anteriores depende de los dividendos posteriores.
+
+Uso:
+    python dolar_implicito.py [--reconstruir]
+    python dolar_implicito.py --benchmark
+"""
+import argparse
+import functools
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(CARPETA)
+RUTA_GGAL = os.path.join(RAIZ, "00-Cotizacion", "GGAL.csv")
+RUTA_ADR = os.path.join(RAIZ, "00-Cotizacion", "GGAL_NY.csv")
+RUTA_CCL = os.path.join(CARPETA, "DOLAR CCL - Cotizaciones historicas.csv")
+RUTA_MEP = os.path.join(CARPETA, "DOLAR MEP - Cotizaciones historicas.csv")
+RUTA_SALIDA = os.path.join(CARPETA, "dolar_implicito.parquet")
+
+RATIO_ADR = 10                      # 1 ADR de GGAL = 10 acciones locales
+CIERRE_BYMA = pd.Timedelta(hours=17)
+CIERRE_NYSE = pd.Timedelta(hours=16)
+HORAS_TOLERANCIA = 6
+UMBRAL_DESVIO = 0.05
+DIAS_REPASO = 5
+# Especie en pesos -> especie en dólares (MEP). No hay planillas de las especies en cable (C).
+PARES_BONOS = {"AA17": "AA17D", "AY24": "AY24D", "RO15": "RO15D"}
+COLUMNA_CIERRE_BONOS, COLUMNA_VOLUMEN_BONOS = 4, 7
+
+
+@functools.lru_cache(maxsize=None)
+def _modulo(carpeta, nombre):
+    """Importa `nombre`.py de otra carpeta del repo (tienen espacios y no son paquetes)."""
+    spec = importlib.util.spec_from_file_location(nombre, os.path.join(RAIZ, carpeta, f"{nombre}.py"))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _sha_prefijo(ruta, largo):
+    """SHA-256 de los primeros `largo` bytes de `ruta`."""
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        sha.update(f.read(largo))
+    return sha.hexdigest()
+
+
+def _dividendo_agregado(ruta, desde_byte):
+    """True si las filas de `ruta` (CSV de yfinance) a partir de `desde_byte` traen un dividendo."""
+    columnas = pd.read_csv(ruta, nrows=0).columns
+    with open(ruta, "rb") as f:
+        f.seek(desde_byte)
+        cola = f.read()
+    if not cola.strip():
+        return False
+    agregadas = pd.read_csv(io.BytesIO(cola), header=None, names=columnas, usecols=["Dividends"])
+    return bool((agregadas["Dividends"] > 0).any())
+
+
+# --- Lectura ---
+
+def cierres_yfinance(ruta, hora_cierre, desde=None):
+    """
+    Cierre sin ajuste por dividendos de un CSV de yfinance: fecha local de la rueda, instante
+    del cierre en UTC y precio. Con `desde` sólo las ruedas desde esa fecha (el ajuste de cada
+    rueda depende sólo de los dividendos posteriores, que están todos en el tramo).
+    """
+    df = pd.read_csv(ruta, usecols=["Date", "Close", "Dividends"])
+    dias = df["Date"].str[:10]
+    if desde is not None:
+        # Una rueda antes: el factor de un dividendo usa el cierre anterior
+        primera = int(np.searchsorted(dias.to_numpy(dtype=str), f"{desde:%Y-%m-%d}"))
+        df, dias = df.iloc[max(primera - 1, 0):], dias.iloc[max(primera - 1, 0):]
+    fecha = pd.to_datetime(dias).astype("datetime64[ns]")
+    # '2020-01-02 00:00:00-03:00' es la medianoche local: en UTC se le resta el huso
+    signo = np.where(df["Date"].str[-6] == "-", 1, -1)
+    huso = pd.to_timedelta(signo * (df["Date"].str[-5:-3].astype(int) * 60 + df["Date"].str[-2:].astype(int)),
+                           unit="min")
+    salida = pd.DataFrame({"fecha": fecha, "cierre_utc": fecha + huso + hora_cierre,
+                           "precio": _modulo("03-CotizacionOpciones", "volatilidad_implicita").cierre_sin_ajuste(df)})
+    if desde is not None:
+        salida = salida[salida["fecha"] >= desde]
+    return salida.dropna().sort_values("cierre_utc", ignore_index=True)
+
+
+def leer_publicado(ruta, nombre):
+    df = pd.read_csv(ruta, usecols=["fecha", "cierre"], parse_dates=["fecha"], date_format="%Y-%m-%d")
+    return pd.DataFrame({"fecha": df["fecha"].astype("datetime64[ns]"), nombre: df["cierre"].astype("float64")})
+
+
+def leer_bono(especie, carpeta=CARPETA):
+    """Cierre y volumen nominal por rueda de <especie>_Cotizaciones_Historicas.xls (planillas.py)."""
+    ruta = os.path.join(carpeta, f"{especie}_Cotizaciones_Historicas.xls")
+    crudo = _modulo("", "planillas").leer_planilla(ruta)
+    if crudo.shape[1] <= COLUMNA_VOLUMEN_BONOS:
+        return pd.DataFrame({"fecha": pd.Series(dtype="datetime64[ns]"), "cierre": [], "volumen": []})
+    # La primera fila es el encabezado y la última el script de la página: no son fechas (mm/dd/aaaa)
+    crudo = crudo[crudo[0].str.fullmatch(r"\d\d/\d\d/\d{4}").fillna(False).astype(bool)]
+    texto = crudo[0]
+    df = pd.DataFrame({"fecha": pd.to_datetime(texto.str[6:10] + "-" + texto.str[:2] + "-" + texto.str[3:5]
+                                               ).astype("datetime64[ns]"),
+                       "cierre": pd.to_numeric(crudo[COLUMNA_CIERRE_BONOS], errors="coerce"),
+                       "volumen": pd.to_numeric(crudo[COLUMNA_VOLUMEN_BONOS], errors="coerce")})
+    return df.sort_values("fecha").drop_duplicates("fecha", keep="last")
+
+
+def mep_bonos(pares=PARES_BONOS, carpeta=CARPETA):
+    """Una columna mep_<par> por par de bonos (ruedas en que operaron las dos especies)."""
+    columnas = []
+    for pesos, dolares in pares.items():
+        par = leer_bono(pesos, carpeta).merge(leer_bono(dolares, carpeta), on="fecha", suffixes=("_ars", "_usd"))
+        operado = (par["volumen_ars"] > 0) & (par["volumen_usd"] > 0) & (par["cierre_usd"] > 0)
+        columnas.append(pd.Series((par["cierre_ars"] / par["cierre_usd"]).where(operado).to_numpy(),
+                                  index=pd.DatetimeIndex(par["fecha"], name="fecha"),
+                                  name=f"mep_{pesos.lower()}").dropna())
+    return pd.concat(columnas, axis=1).sort_index()
+
+
+# --- Cálculo ---
+
+def ccl_ggal(local, adr, ratio=RATIO_ADR, horas_tolerancia=HORAS_TOLERANCIA):
+    """
+    CCL por rueda de BYMA: cada cierre local con el cierre del ADR más cercano en UTC
+    (misma sesión). Devuelve fecha, ggal_local, ggal_adr, desfase_horas y ccl_ggal.
+    """
+    alineado = pd.merge_asof(local.rename(columns={"precio": "ggal_local"}),
+                             adr.rename(columns={"precio": "ggal_adr", "fecha": "fecha_adr"}),
+                             on="cierre_utc", direction="nearest",
+                             tolerance=pd.Timedelta(hours=horas_tolerancia))
+    adr_utc = adr.set_index("fecha")["cierre_utc"]
+    desfase = alineado["fecha_adr"].map(adr_utc) - alineado["cierre_utc"]
+    return pd.DataFrame({"fecha": alineado["fecha"], "ggal_local": alineado["ggal_local"],
+                         "ggal_adr": alineado["ggal_adr"],
+                         "desfase_horas": desfase.dt.total_seconds() / 3600,
+                         "ccl_ggal": alineado["ggal_local"] * ratio / alineado["ggal_adr"]})
+
+
+def conciliar(df, umbral=UMBRAL_DESVIO):
+    """Agrega desvíos, alertas y huecos contra las series publicadas."""
+    df = df.copy()
+    df["desvio_ccl"] = df["ccl_ggal"] / df["ccl_publicado"] - 1
+    df["desvio_mep"] = df["mep_bonos"] / df["mep_publicado"] - 1
+    for serie in ("ccl", "mep"):
+        df[f"alerta_{serie}"] = df[f"desvio_{serie}"].abs() > umbral
+    df["hueco_ccl_ggal"] = df["ccl_ggal"].isna()
+    # Ruedas sin publicado dentro del período que cubre cada serie publicada
+    for serie in ("ccl", "mep"):
+        publicado = df[f"{serie}_publicado"]
+        cubierto = (df["fecha"] >= df.loc[publicado.notna(), "fecha"].min()) & \
+                   (df["fecha"] <= df.loc[publicado.notna(), "fecha"].max())
+        df[f"hueco_{serie}_publicado"] = publicado.isna() & cubierto
+    return df
+
+
+def calcular(rutas, desde=None, pares=PARES_BONOS, umbral=UMBRAL_DESVIO, con_bonos=True):
+    """
+    Tabla completa (o desde `desde`) de dólar implícito y su conciliación, una fila por rueda de
+    BYMA. Sin `con_bonos` las columnas de MEP por bonos quedan vacías (tramo posterior a las planillas).
+    """
+    local = cierres_yfinance(rutas["ggal"], CIERRE_BYMA, desde)
+    # Un día antes para que el ADR de la primera rueda del tramo tenga con qué alinearse
+    adr = cierres_yfinance(rutas["adr"], CIERRE_NYSE, desde - pd.Timedelta(days=1) if desde is not None else None)
+    df = ccl_ggal(local, adr)
+
+    ccl = leer_publicado(rutas["ccl"], "ccl_publicado")
+    mep = leer_publicado(rutas["mep"], "mep_publicado")
+    df = df.merge(ccl, on="fecha", how="left").merge(mep, on="fecha", how="left")
+    columnas_bonos = [f"mep_{pesos.lower()}" for pesos in pares]
+    if con_bonos:
+        df = df.merge(mep_bonos(pares, rutas["bonos"]), left_on="fecha", right_index=True, how="left")
+    else:
+        df = df.assign(**{c: np.nan for c in columnas_bonos})
+    df["mep_bonos"] = df[columnas_bonos].median(axis=1)
+    return conciliar(df, umbral)
+
+
+class DolarImplicito:
+    """Serie diaria de CCL / MEP implícitos guardada en `ruta_salida`, actualizada incrementalmente."""
+
+    def __init__(self, ruta_ggal=RUTA_GGAL, ruta_adr=RUTA_ADR, ruta_ccl=RUTA_CCL, ruta_mep=RUTA_MEP,
+                 carpeta_bonos=CARPETA, ruta_salida=RUTA_SALIDA, pares=PARES_BONOS, umbral=UMBRAL_DESVIO):
+        self.rutas = {"ggal": ruta_ggal, "adr": ruta_adr, "ccl": ruta_ccl, "mep": ruta_mep, "bonos": carpeta_bonos}
+        self.ruta_salida = ruta_salida
+        self.pares = pares
+        self.umbral = umbral
+
+    @property
+    def parametros(self):
+        return {"ratio_adr": RATIO_ADR, "horas_tolerancia": HORAS_TOLERANCIA, "umbral": self.umbral,
+                "pares": self.pares}
+
+    def _huella_bonos(self):
+        planillas = _modulo("", "planillas")
+        especies = [e for par in self.pares.items() for e in par]
+        return [planillas.convertir(os.path.join(self.rutas["bonos"], f"{e}_Cotizaciones_Historicas.xls"),
+                                    verbose=False)["sha256"] for e in especies]
+
+    def _estado(self):
+        """Lo que se guarda en los metadatos: parámetros, bytes procesados de cada CSV y bonos."""
+        archivos = {}
+        for nombre in ("ggal", "adr", "ccl", "mep"):
+            largo = os.path.getsize(self.rutas[nombre])
+            archivos[nombre] = {"bytes": largo, "sha256": _sha_prefijo(self.rutas[nombre], largo)}
+        return {"parametros": self.parametros, "archivos": archivos, "bonos": self._huella_bonos()}
+
+    def _guardado(self, estado):
+        """
+        (tabla, estado) guardados si se pueden extender: mismos parámetros y bonos, CSV sólo
+        agregados al final.
+        """
+        if not os.path.exists(self.ruta_salida):
+            return None, None
+        anterior = json.loads((pq.read_schema(self.ruta_salida).metadata or {}).get(b"dolar_implicito", b"{}"))
+        if anterior.get("parametros") != json.loads(json.dumps(estado["parametros"])) \
+                or anterior.get("bonos") != estado["bonos"]:
+            print("ADVERTENCIA: cambiaron los parámetros o las planillas de bonos, se reconstruye completo")
+            return None, None
+        for nombre, archivo in anterior.get("archivos", {}).items():
+            if estado["archivos"][nombre]["bytes"] < archivo["bytes"] or \
+                    _sha_prefijo(self.rutas[nombre], archivo["bytes"]) != archivo["sha256"]:
+                print(f"ADVERTENCIA: {os.path.basename(self.rutas[nombre])} cambió antes del final, "
+                      "se reconstruye completo")
+                return None, None
+        for nombre in ("ggal", "adr"):
+            if _dividendo_agregado(self.rutas[nombre], anterior["archivos"][nombre]["bytes"]):
+                print(f"ADVERTENCIA: {os.path.basename(self.rutas[nombre])} agregó un dividendo, "
+                      "se reconstruye completo")
+                return None, None
+        return pd.read_parquet(self.ruta_salida), anterior
+
+    def actualizar(self, reconstruir=False):
+        """Recalcula las ruedas nuevas (o todo). Devuelve la cantidad de ruedas recalculadas."""
+        estado = self._estado()
+        guardado, anterior = (None, None) if reconstruir else self._guardado(estado)
+        desde = None
+        if guardado is not None and len(guardado):
+            if all(a["bytes"] == estado["archivos"][n]["bytes"] for n, a in anterior["archivos"].items()):
+                print(f"INFO: dólar implícito al día ({guardado['fecha'].max():%Y-%m-%d})")
+                return 0
+            desde = guardado["fecha"].max() - pd.Timedelta(days=DIAS_REPASO)
+
+        # Las planillas de bonos no crecen: si el tramo empieza después de su última cotización no se leen
+        con_bonos = desde is None or anterior["bonos_hasta"] is None or desde <= pd.Timestamp(anterior["bonos_hasta"])
+        nuevo = calcular(self.rutas, desde, self.pares, self.umbral, con_bonos)
+        if desde is not None:
+            nuevo = pd.concat([guardado[guardado["fecha"] < nuevo["fecha"].min()], nuevo], ignore_index=True)
+            # Los huecos del publicado dependen de hasta dónde llega la serie: se recalculan en toda la tabla
+            nuevo = conciliar(nuevo, self.umbral)
+        con_mep = nuevo.loc[nuevo["mep_bonos"].notna(), "fecha"]
+        estado["bonos_hasta"] = f"{con_mep.max():%Y-%m-%d}" if len(con_mep) else None
+        self._guardar(nuevo, estado)
+        recalculadas = len(nuevo) - (len(guardado) if desde is not None else 0)
+        print(f"✅ {len(nuevo)} ruedas en {self.ruta_salida}"
+              + (f" ({recalculadas} nuevas)" if desde is not None else ""))
+        return recalculadas
+
+    def _guardar(self, df, estado):
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}),
+                                               "dolar_implicito": json.dumps(estado)})
+        pq.write_table(tabla, self.ruta_salida + ".tmp")
+        os.replace(self.ruta_salida + ".tmp", self.ruta_salida)
+
+    def cargar(self):
+        return pd.read_parquet(self.ruta_salida).set_index("fecha")
+
+
+def resumen(df):
+    """Mediana del desvío absoluto, alertas y huecos por serie."""
+    filas = {}
+    for serie, implicito in (("ccl", "ccl_ggal"), ("mep", "mep_bonos")):
+        comparables = df[f"desvio_{serie}"].notna()
+        filas[serie] = {"ruedas_comparables": int(comparables.sum()),
+                        "mediana_desvio_abs": df.loc[comparables, f"desvio_{serie}"].abs().median(),
+                        "alertas": int(df[f"alerta_{serie}"].sum()),
+                        "huecos_publicado": int(df[f"hueco_{serie}_publicado"].sum()),
+                        "ruedas_implicito": int(df[implicito].notna().sum())}
+    filas["ccl"]["huecos_implicito"] = int(df["hueco_ccl_ggal"].sum())
+    tabla = pd.DataFrame(filas).T
+    conteos = [c for c in tabla.columns if c != "mediana_desvio_abs"]
+    return tabla.astype({c: "Int64" for c in conteos} | {"mediana_desvio_abs": "float64"})
+
+
+def benchmark(ruedas_nuevas=1):
+    """
+    Reconstrucción completa contra actualización incremental cuando se agregan `ruedas_nuevas`
+    filas al final de los CSV (en copias), y verificación de que las dos dan lo mismo.
+    """
+    temporal = tempfile.mkdtemp(prefix="bench_dolar_")
+    try:
+        rutas = {"ggal": RUTA_GGAL, "adr": RUTA_ADR, "ccl": RUTA_CCL, "mep": RUTA_MEP}
+        copias = {n: os.path.join(temporal, os.path.basename(r)) for n, r in rutas.items()}
+        lineas = {}
+        for nombre, ruta in rutas.items():
+            with open(ruta, encoding="utf-8") as f:
+                lineas[nombre] = f.readlines()
+            with open(copias[nombre], "w", encoding="utf-8") as f:
+                f.writelines(lineas[nombre][:-ruedas_nuevas])
+
+        motor = DolarImplicito(copias["ggal"], copias["adr"], copias["ccl"], copias["mep"],
+                               ruta_salida=os.path.join(temporal, "dolar_implicito.parquet"))
+        inicio = time.perf_counter()
+        motor.actualizar(reconstruir=True)
+        t_completo = time.perf_counter() - inicio
+
+        for nombre in rutas:
+            with open(copias[nombre], "a", encoding="utf-8") as f:
+                f.writelines(lineas[nombre][-ruedas_nuevas:])
+        inicio = time.perf_counter()
+        motor.actualizar()
+        t_incremental = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        motor.actualizar()
+        t_al_dia = time.perf_counter() - inicio
+
+        incremental = motor.cargar()
+        completo = calcular({**copias, "bonos": CARPETA}).set_index("fecha")
+        pd.testing.assert_frame_equal(incremental, completo)
+        print(f"Reconstrucción completa {t_completo * 1000:6.0f} ms | incremental ({ruedas_nuevas} ruedas nuevas) "
+              f"{t_incremental * 1000:5.0f} ms | al día {t_al_dia * 1000:4.0f} ms | incremental == completa")
+        print(resumen(completo).round(4).to_string())
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dólar CCL / MEP implícito y conciliación")
+    parser.add_argument("--reconstruir", action="store_true")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+        # 30 ruedas incluyen el dividendo de GGAL del 2025-05-09: el incremental debe reconstruir
+        benchmark(30)
+    else:
+        motor = DolarImplicito()
+        motor.actualizar(args.reconstruir)
+        print(resumen(motor.cargar().reset_index()).round(4).to_string())
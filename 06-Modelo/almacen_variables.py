@@ -0,0 +1,386 @@
+"""
+Matriz de variables del modelo: todas las fuentes alineadas al calendario de ruedas de GGAL.
+
+Cada fuente de FUENTES tiene una función que la lee y la devuelve con una columna `fecha`
+(fecha desde la que el dato se conoce, sin zona horaria) y sus variables. Las fuentes se
+alinean con el calendario de ruedas de BYMA (las fechas de 00-Cotizacion/GGAL.csv) con un
+`merge_asof` hacia atrás: cada rueda toma el último dato conocido, nunca uno posterior.
+
+    - Los datos mensuales (IPC) se fechan en el día en que se publican, no en el mes al
+      que corresponden (RETRASO_PUBLICACION_IPC días después de terminado el mes).
+    - GGAL en Nueva York cierra después que BYMA: se usa el cierre de la rueda anterior.
+    - `tolerancia` limita cuántos días se arrastra un dato (ej. series que terminan).
+
+Cada fuente alineada se guarda en CARPETA_CACHE/<fuente>.parquet con la huella (SHA-256
+de sus archivos de entrada, de los módulos que la calculan y VERSION) en los metadatos. Sólo
+se recalculan las fuentes cuyos archivos o código cambiaron; la matriz completa es el join por
+fecha de los parquets cacheados.
+
+Uso:
+    from almacen_variables import matriz_modelo
+    X = matriz_modelo()                       # DataFrame indexado por fecha
+
+    python almacen_variables.py [--reconstruir] [--fuentes ggal ccl ...]
+    python almacen_variables.py --benchmark
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARPETA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_variables")
+RUTA_MATRIZ = "matriz_modelo.parquet"
+
+# Cambiar VERSION invalida todas las fuentes cacheadas. El código de cada fuente ya entra en su huella.
+VERSION = 1
+RETRASO_PUBLICACION_IPC = 15
+TAMANIO_BLOQUE_HASH = 1 << 20
+
+
+def _modulo(carpeta, nombre):
+    """Importa `nombre`.py de otra carpeta del repo (tienen espacios y no son paquetes)."""
+    ruta = os.path.join(RAIZ, carpeta, f"{nombre}.py")
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _fecha_local(columna):
+    """'2020-01-02 00:00:00-03:00' -> Timestamp('2020-01-02'): la fecha de la rueda en su plaza."""
+    return pd.to_datetime(columna.str[:10]).astype("datetime64[ns]")
+
+
+# --- Lectura de cada fuente ---
+
+def leer_ggal(rutas):
+    df = pd.read_csv(rutas[0], usecols=["Date", "Close", "Volume"])
+    return pd.DataFrame({"fecha": _fecha_local(df["Date"]), "ggal_cierre": df["Close"],
+                         "ggal_volumen": df["Volume"].astype("float64")})
+
+
+def leer_ggal_ny(rutas):
+    df = pd.read_csv(rutas[0], usecols=["Date", "Close", "Volume"])
+    return pd.DataFrame({"fecha": _fecha_local(df["Date"]), "ggal_ny_cierre": df["Close"],
+                         "ggal_ny_volumen": df["Volume"].astype("float64")})
+
+
+def leer_ipc(rutas):
+    """IPC empalmado base dic-2016 (df_comb.csv), fechado al día de publicación."""
+    df = pd.read_csv(rutas[0], usecols=["fecha", "base_2016_12"], parse_dates=["fecha"])
+    publicacion = df["fecha"] + pd.offsets.MonthBegin(1) + pd.Timedelta(days=RETRASO_PUBLICACION_IPC)
+    return pd.DataFrame({"fecha": publicacion.astype("datetime64[ns]"), "ipc": df["base_2016_12"],
+                         "inflacion_mensual": df["base_2016_12"].pct_change()})
+
+
+def leer_leliq(rutas):
+    # Los valores del archivo crecen de 10 a 15 millones: parecen el stock de LELIQ (en millones
+    # de $) más que una tasa. Se usa tal cual viene.
+    df = pd.read_csv(rutas[0], parse_dates=["Fecha"])
+    return pd.DataFrame({"fecha": df["Fecha"].astype("datetime64[ns]"), "leliq": df["Tasa"].astype("float64")})
+
+
+COLUMNAS_BAIBOR = {"bai001": "baibor_1d", "bai003": "baibor_30d", "bai007": "baibor_365d"}
+
+
+def leer_baibor(rutas):
+    """BAIBOR en pesos del BCRA (diar_bai.xls): el encabezado útil es la fila 'fecha, bai001, ...'."""
+    crudo = _modulo("", "planillas").leer_planilla(rutas[0])
+    encabezado = crudo.index[crudo[0] == "fecha"][0]
+    df = crudo.iloc[encabezado + 2:]
+    df.columns = crudo.iloc[encabezado]
+    salida = pd.DataFrame({"fecha": pd.to_datetime(df["fecha"], format="%d/%m/%Y", errors="coerce")})
+    for origen, destino in COLUMNAS_BAIBOR.items():
+        salida[destino] = pd.to_numeric(df[origen], errors="coerce")
+    return salida.dropna(subset=["fecha"]).astype({"fecha": "datetime64[ns]"})
+
+
+def _leer_dolar(ruta, nombre):
+    df = pd.read_csv(ruta, usecols=["fecha", "cierre"], parse_dates=["fecha"])
+    return pd.DataFrame({"fecha": df["fecha"].astype("datetime64[ns]"), nombre: df["cierre"]})
+
+
+def leer_ccl(rutas):
+    return _leer_dolar(rutas[0], "dolar_ccl")
+
+
+def leer_mep(rutas):
+    return _leer_dolar(rutas[0], "dolar_mep")
+
+
+def leer_dolar_implicito(rutas):
+    """CCL implícito por GGAL local / ADR y su desvío contra el CCL publicado (dolar_implicito.py)."""
+    dolar = _modulo("05-Cotizacion Dolar", "dolar_implicito")
+    # Los bonos y la salida están en la carpeta del CCL publicado (la de `raiz`, no la del repo)
+    carpeta = os.path.dirname(rutas[2])
+    motor = dolar.DolarImplicito(*rutas[:4], carpeta_bonos=carpeta,
+                                 ruta_salida=os.path.join(carpeta, os.path.basename(dolar.RUTA_SALIDA)))
+    motor.actualizar()
+    df = pd.read_parquet(motor.ruta_salida)
+    return pd.DataFrame({"fecha": df["fecha"], "ccl_ggal": df["ccl_ggal"], "ccl_ggal_desvio": df["desvio_ccl"]})
+
+
+def _leer_futuros(ruta, prefijo):
+    """1ra posición, tasa implícita entre 1ra y 2da e índice continuo (indice_futuros.py)."""
+    indice = _modulo("04-Cotizacion Futuros", "indice_futuros").IndiceFuturos(ruta)
+    indice.actualizar()
+    df = pd.read_parquet(indice.ruta_continuo)
+    return pd.DataFrame({"fecha": df["fecha"], f"{prefijo}_ajuste": df["ajuste_1"],
+                         f"{prefijo}_tasa_implicita": df["tasa_implicita_1_2"],
+                         f"{prefijo}_indice": df["indice_continuo"]})
+
+
+def leer_futuro_dolar(rutas):
+    return _leer_futuros(rutas[0], "fut_dolar")
+
+
+def leer_futuro_ggal(rutas):
+    return _leer_futuros(rutas[0], "fut_ggal")
+
+
+def leer_opciones(rutas):
+    """Resumen diario de la superficie de volatilidad (volatilidad_implicita.py)."""
+    vi = _modulo("03-CotizacionOpciones", "volatilidad_implicita")
+    df_iv = vi.calcular_volatilidades(pd.read_parquet(rutas[0]), pd.read_parquet(rutas[1]),
+                                      vi.cargar_spot(rutas[2]), verbose=False)
+    superficie = vi.superficie_diaria(df_iv).drop(columns="plazo")
+    return superficie.rename(columns={c: f"opc_{c}" for c in superficie.columns if c != "Fecha"}
+                             ).rename(columns={"Fecha": "fecha"})
+
+
+# Planillas de bonos de dolar_implicito.PARES_BONOS; las páginas web de Excel guardan la hoja
+# en <planilla>_archivos/sheet001.htm
+PLANILLAS_BONOS = [f"05-Cotizacion Dolar/{e}_Cotizaciones_Historicas{sufijo}"
+                   for e in ("AA17", "AA17D", "AY24", "AY24D") for sufijo in (".xls", "_archivos/sheet001.htm")] \
+    + ["05-Cotizacion Dolar/RO15_Cotizaciones_Historicas.xls", "05-Cotizacion Dolar/RO15D_Cotizaciones_Historicas.xls"]
+
+# archivos: rutas relativas a la raíz del repo. codigo: módulos del repo que calculan la fuente
+# (además de este). cierre_posterior: el dato del día se conoce después del cierre de BYMA.
+# tolerancia: días máximos que se arrastra el último dato.
+FUENTES = {
+    "ggal": {"archivos": ["00-Cotizacion/GGAL.csv"], "lector": leer_ggal},
+    "ggal_ny": {"archivos": ["00-Cotizacion/GGAL_NY.csv"], "lector": leer_ggal_ny,
+                "cierre_posterior": True, "tolerancia": 7},
+    "ipc": {"archivos": ["01-Inflacion/df_comb.csv"], "lector": leer_ipc, "tolerancia": 62},
+    "leliq": {"archivos": ["02-TasaLibreDeRiesgo/tasa_leliq.csv"], "lector": leer_leliq, "tolerancia": 7},
+    "baibor": {"archivos": ["02-TasaLibreDeRiesgo/diar_bai.xls"], "lector": leer_baibor,
+               "codigo": ["planillas.py"], "tolerancia": 7},
+    "ccl": {"archivos": ["05-Cotizacion Dolar/DOLAR CCL - Cotizaciones historicas.csv"], "lector": leer_ccl,
+            "tolerancia": 7},
+    "mep": {"archivos": ["05-Cotizacion Dolar/DOLAR MEP - Cotizaciones historicas.csv"], "lector": leer_mep,
+            "tolerancia": 7},
+    # El CCL implícito usa el cierre del ADR de la misma sesión, que termina después que BYMA
+    "dolar_implicito": {"archivos": ["00-Cotizacion/GGAL.csv", "00-Cotizacion/GGAL_NY.csv",
+                                     "05-Cotizacion Dolar/DOLAR CCL - Cotizaciones historicas.csv",
+                                     "05-Cotizacion Dolar/DOLAR MEP - Cotizaciones historicas.csv"] + PLANILLAS_BONOS,
+                        "lector": leer_dolar_implicito,
+                        "codigo": ["05-Cotizacion Dolar/dolar_implicito.py", "03-CotizacionOpciones/volatilidad_implicita.py",
+                                   "planillas.py"],
+                        "cierre_posterior": True, "tolerancia": 7},
+    "futuro_dolar": {"archivos": ["04-Cotizacion Futuros/df_futuro_dolar.parquet"], "lector": leer_futuro_dolar,
+                     "codigo": ["04-Cotizacion Futuros/indice_futuros.py"], "tolerancia": 7},
+    "futuro_ggal": {"archivos": ["04-Cotizacion Futuros/df_futuro_GGAL.parquet"], "lector": leer_futuro_ggal,
+                    "codigo": ["04-Cotizacion Futuros/indice_futuros.py"], "tolerancia": 7},
+    "opciones": {"archivos": ["03-CotizacionOpciones/df_opciones.parquet", "03-CotizacionOpciones/df_vtos_tasa.parquet",
+                              "00-Cotizacion/GGAL.csv"], "lector": leer_opciones,
+                 "codigo": ["03-CotizacionOpciones/volatilidad_implicita.py"], "tolerancia": 7},
+}
+FUENTE_CALENDARIO = "ggal"
+
+
+# --- Caché ---
+
+def _hash_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(TAMANIO_BLOQUE_HASH), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def huella(nombre, raiz=RAIZ):
+    """
+    SHA-256 de los archivos de entrada de la fuente (en `raiz`), de su código (siempre el del
+    repo: este módulo y los de `codigo`), su configuración y VERSION.
+    """
+    config = FUENTES[nombre]
+    sha = hashlib.sha256(f"{VERSION}|{config.get('cierre_posterior', False)}|{config.get('tolerancia')}".encode())
+    for archivo in config["archivos"]:
+        sha.update(archivo.encode())
+        sha.update(_hash_archivo(os.path.join(raiz, archivo)).encode())
+    for modulo in ["06-Modelo/almacen_variables.py"] + config.get("codigo", []):
+        sha.update(modulo.encode())
+        sha.update(_hash_archivo(os.path.join(RAIZ, modulo)).encode())
+    return sha.hexdigest()
+
+
+def _ruta_cache(nombre, carpeta_cache):
+    return os.path.join(carpeta_cache, f"{nombre}.parquet")
+
+
+def _huella_guardada(ruta):
+    if not os.path.exists(ruta):
+        return None
+    metadatos = pq.read_schema(ruta).metadata or {}
+    return metadatos.get(b"huella", b"").decode() or None
+
+
+def _guardar(df, ruta, metadatos):
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}), **metadatos})
+    pq.write_table(tabla, ruta + ".tmp")
+    os.replace(ruta + ".tmp", ruta)
+
+
+def alinear(fuente, calendario, cierre_posterior=False, tolerancia=None):
+    """
+    Valores de `fuente` (columna fecha + variables) vigentes en cada fecha de `calendario`,
+    sin mirar hacia adelante: el último dato con fecha <= rueda (< rueda si `cierre_posterior`).
+    """
+    fuente = fuente.dropna(subset=["fecha"]).sort_values("fecha").drop_duplicates("fecha", keep="last")
+    return pd.merge_asof(
+        pd.DataFrame({"fecha": calendario}), fuente, on="fecha", direction="backward",
+        allow_exact_matches=not cierre_posterior,
+        tolerance=pd.Timedelta(days=tolerancia) if tolerancia is not None else None,
+    )
+
+
+def calendario_ruedas(raiz=RAIZ):
+    """Fechas de rueda de BYMA: las de la fuente FUENTE_CALENDARIO."""
+    config = FUENTES[FUENTE_CALENDARIO]
+    fechas = config["lector"]([os.path.join(raiz, a) for a in config["archivos"]])["fecha"]
+    return pd.DatetimeIndex(fechas.drop_duplicates().sort_values(), name="fecha")
+
+
+def actualizar_fuentes(fuentes=None, reconstruir=False, raiz=RAIZ, carpeta_cache=CARPETA_CACHE, verbose=True):
+    """
+    Recalcula las fuentes cuya huella cambió (o todas si `reconstruir`). Devuelve la lista
+    de fuentes recalculadas. Si una fuente no se puede leer se propaga el error, en lugar de
+    seguir con su versión cacheada.
+    """
+    os.makedirs(carpeta_cache, exist_ok=True)
+    fuentes = fuentes or list(FUENTES)
+    pendientes = []
+    huellas = {}
+    for nombre in fuentes:
+        huellas[nombre] = huella(nombre, raiz)
+        if reconstruir or _huella_guardada(_ruta_cache(nombre, carpeta_cache)) != huellas[nombre]:
+            pendientes.append(nombre)
+    if not pendientes:
+        return []
+
+    # El calendario depende de GGAL.csv: si cambió, cambió la huella de 'ggal' y se recalcula todo
+    calendario = calendario_ruedas(raiz)
+    huella_calendario = huella(FUENTE_CALENDARIO, raiz)
+    for nombre in fuentes:
+        ruta = _ruta_cache(nombre, carpeta_cache)
+        if nombre not in pendientes and os.path.exists(ruta):
+            calendario_guardado = (pq.read_schema(ruta).metadata or {}).get(b"calendario", b"").decode()
+            if calendario_guardado != huella_calendario:
+                pendientes.append(nombre)
+
+    for nombre in pendientes:
+        inicio = time.perf_counter()
+        config = FUENTES[nombre]
+        try:
+            datos = config["lector"]([os.path.join(raiz, a) for a in config["archivos"]])
+        except Exception as e:
+            # No se sigue con el parquet cacheado: la matriz saldría con una fuente vieja sin aviso
+            print(f"ERROR: no se pudo leer la fuente {nombre}: {e}")
+            raise
+        alineada = alinear(datos, calendario, config.get("cierre_posterior", False), config.get("tolerancia"))
+        _guardar(alineada, _ruta_cache(nombre, carpeta_cache),
+                 {"huella": huellas[nombre], "calendario": huella_calendario})
+        if verbose:
+            print(f"INFO: fuente {nombre} alineada ({alineada.shape[1] - 1} variables) "
+                  f"en {time.perf_counter() - inicio:.2f}s")
+    return pendientes
+
+
+def matriz_modelo(fuentes=None, reconstruir=False, raiz=RAIZ, carpeta_cache=CARPETA_CACHE, verbose=True):
+    """
+    Matriz de variables indexada por fecha de rueda, con una columna por variable de cada
+    fuente. Sólo se recalculan las fuentes cuyos archivos cambiaron.
+    """
+    fuentes = fuentes or list(FUENTES)
+    actualizar_fuentes(fuentes, reconstruir, raiz, carpeta_cache, verbose)
+    partes = []
+    for nombre in fuentes:
+        ruta = _ruta_cache(nombre, carpeta_cache)
+        if os.path.exists(ruta):
+            partes.append(pd.read_parquet(ruta).set_index("fecha"))
+    return pd.concat(partes, axis=1)
+
+
+def guardar_matriz(ruta=None, **kwargs):
+    """matriz_modelo() en un parquet (por defecto CARPETA_CACHE/../RUTA_MATRIZ)."""
+    ruta = ruta or os.path.join(os.path.dirname(CARPETA_CACHE), RUTA_MATRIZ)
+    matriz = matriz_modelo(**kwargs)
+    huellas = {n: _huella_guardada(_ruta_cache(n, kwargs.get("carpeta_cache", CARPETA_CACHE)))
+               for n in (kwargs.get("fuentes") or FUENTES)}
+    _guardar(matriz.reset_index(), ruta, {"huellas": json.dumps(huellas)})
+    print(f"✅ Matriz de {matriz.shape[0]} ruedas x {matriz.shape[1]} variables guardada en {ruta}")
+    return matriz
+
+
+def _cadena_notebooks(raiz=RAIZ):
+    """Como hoy: cada fuente se vuelve a leer de su CSV/XLS/parquet y se junta, sin caché."""
+    calendario = calendario_ruedas(raiz)
+    partes = []
+    for config in FUENTES.values():
+        datos = config["lector"]([os.path.join(raiz, a) for a in config["archivos"]])
+        alineada = alinear(datos, calendario, config.get("cierre_posterior", False), config.get("tolerancia"))
+        partes.append(alineada.set_index("fecha"))
+    return pd.concat(partes, axis=1)
+
+
+def benchmark(raiz=RAIZ):
+    """Sin caché contra caché vacía, caché al día y una fuente modificada (en una copia de la caché)."""
+    carpeta_cache = tempfile.mkdtemp(prefix="bench_variables_")
+    try:
+        mediciones = []
+        inicio = time.perf_counter()
+        referencia = _cadena_notebooks(raiz)
+        mediciones.append(("releyendo todas las fuentes", time.perf_counter() - inicio))
+
+        for nombre in ("caché vacía", "caché al día"):
+            inicio = time.perf_counter()
+            matriz = matriz_modelo(raiz=raiz, carpeta_cache=carpeta_cache, verbose=False)
+            mediciones.append((nombre, time.perf_counter() - inicio))
+        pd.testing.assert_frame_equal(matriz, referencia)
+
+        # Una fuente que cambia: se invalida sólo su huella guardada
+        ruta = _ruta_cache("ccl", carpeta_cache)
+        _guardar(pd.read_parquet(ruta), ruta, {"huella": "modificada"})
+        inicio = time.perf_counter()
+        matriz_modelo(raiz=raiz, carpeta_cache=carpeta_cache, verbose=False)
+        mediciones.append(("cambió una fuente (ccl)", time.perf_counter() - inicio))
+
+        print(f"Matriz: {matriz.shape[0]} ruedas x {matriz.shape[1]} variables, "
+              f"{matriz.notna().mean().mean():.0%} de celdas con dato")
+        for nombre, duracion in mediciones:
+            print(f"{nombre:>28}: {duracion:6.2f}s")
+    finally:
+        shutil.rmtree(carpeta_cache, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Matriz de variables del modelo")
+    parser.add_argument("--fuentes", nargs="*", choices=list(FUENTES))
+    parser.add_argument("--reconstruir", action="store_true")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        guardar_matriz(fuentes=args.fuentes, reconstruir=args.reconstruir)
@@ -0,0 +1,130 @@
+"""
+Prueba de carga del servicio de predicción (servicio_prediccion.py).
+
+Manda `--solicitudes` pedidos con `--concurrencia` hilos y reporta solicitudes/s y
+latencias p50 / p95 / p99:
+    - rueda      POST /rueda con una rueda nueva por pedido (variables incrementales + predicción)
+    - predecir   POST /predecir con un lote de `--lote` filas
+También mide la API en proceso (Servicio.puntuar_rueda y Servicio.predecir), sin HTTP.
+
+Sin `--url` levanta una instancia local en un puerto libre con `--modelo`. Contra un servicio
+externo (`--url`) sólo se mide /predecir: /rueda le agregaría ruedas falsas a su estado.
+
+Uso:
+    python prueba_carga.py [--url http://127.0.0.1:8000] [--solicitudes 2000] [--concurrencia 4]
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from servicio_prediccion import RUTA_MODELO, Servicio, crear_servidor
+
+
+def _percentiles(latencias):
+    p50, p95, p99 = np.percentile(np.array(latencias) * 1000, [50, 95, 99])
+    return f"p50 {p50:6.2f} ms | p95 {p95:6.2f} ms | p99 {p99:6.2f} ms"
+
+
+def _post(url, cuerpo):
+    pedido = urllib.request.Request(url, data=json.dumps(cuerpo).encode(),
+                                    headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(pedido) as respuesta:
+        return json.loads(respuesta.read())
+
+
+def _pedidos_rueda(desde, cantidad):
+    """Ruedas hábiles sucesivas con valores de GGAL y CCL al azar (camino aleatorio)."""
+    fechas = pd.bdate_range(desde + pd.Timedelta(days=1), periods=cantidad)
+    azar = np.random.default_rng(0)
+    ggal = 6800 * np.exp(np.cumsum(azar.normal(0, 0.02, cantidad)))
+    ccl = 1170 * np.exp(np.cumsum(azar.normal(0, 0.005, cantidad)))
+    return [{"fecha": f"{f:%Y-%m-%d}", "valores": {"ggal_cierre": g, "ggal_volumen": 1e6, "dolar_ccl": c}}
+            for f, g, c in zip(fechas, ggal, ccl)]
+
+
+def carga_http(url, pedidos, ruta, concurrencia):
+    """Devuelve (solicitudes/s, latencias). Con ruta 'rueda' los pedidos se mandan en orden de fecha."""
+    latencias = []
+    bloqueo = threading.Lock()
+
+    def uno(cuerpo):
+        inicio = time.perf_counter()
+        _post(url + ruta, cuerpo)
+        duracion = time.perf_counter() - inicio
+        with bloqueo:
+            latencias.append(duracion)
+
+    inicio = time.perf_counter()
+    if ruta == "/rueda":
+        # Cada rueda depende de la anterior: un solo cliente, en orden
+        for cuerpo in pedidos:
+            uno(cuerpo)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            list(pool.map(uno, pedidos))
+    return len(pedidos) / (time.perf_counter() - inicio), latencias
+
+
+def main(url=None, ruta_modelo=RUTA_MODELO, solicitudes=2000, concurrencia=4, lote=1):
+    servicio = None
+    servidor = None
+    if url is None:
+        servicio = Servicio(ruta_modelo)
+        servidor = crear_servidor(Servicio(ruta_modelo), puerto=0)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{servidor.server_port}"
+        print(f"INFO: instancia local en {url}")
+
+    try:
+        salud = json.loads(urllib.request.urlopen(url + "/salud").read())
+        desde = pd.Timestamp(salud["ultima_rueda"])
+        variables = len(salud["variables"])
+        azar = np.random.default_rng(1)
+
+        # API en proceso (sólo con la instancia local)
+        if servicio is not None:
+            latencias = []
+            for cuerpo in _pedidos_rueda(servicio.estado.ultima_fecha, solicitudes):
+                inicio = time.perf_counter()
+                servicio.puntuar_rueda(cuerpo["fecha"], cuerpo["valores"])
+                latencias.append(time.perf_counter() - inicio)
+            print(f"{'en proceso, rueda':>22}: {_percentiles(latencias)}")
+            X = azar.normal(size=(lote, variables))
+            latencias = []
+            for _ in range(solicitudes):
+                inicio = time.perf_counter()
+                servicio.predecir(X)
+                latencias.append(time.perf_counter() - inicio)
+            print(f"{f'en proceso, lote de {lote}':>22}: {_percentiles(latencias)}")
+
+        # HTTP
+        if servidor is not None:
+            por_segundo, latencias = carga_http(url, _pedidos_rueda(desde, solicitudes), "/rueda", concurrencia)
+            print(f"{'HTTP /rueda':>22}: {_percentiles(latencias)} | {por_segundo:7.0f} solicitudes/s")
+        else:
+            print("ADVERTENCIA: servicio externo, no se prueba /rueda (cargaría ruedas falsas en su estado)")
+        pedidos = [{"filas": azar.normal(size=(lote, variables)).tolist()} for _ in range(solicitudes)]
+        por_segundo, latencias = carga_http(url, pedidos, "/predecir", concurrencia)
+        print(f"{f'HTTP /predecir x{concurrencia}':>22}: {_percentiles(latencias)} | {por_segundo:7.0f} solicitudes/s")
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de predicción")
+    parser.add_argument("--url")
+    parser.add_argument("--modelo", default=RUTA_MODELO)
+    parser.add_argument("--solicitudes", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, default=4)
+    parser.add_argument("--lote", type=int, default=1)
+    args = parser.parse_args()
+
+    main(args.url, args.modelo, args.solicitudes, args.concurrencia, args.lote)
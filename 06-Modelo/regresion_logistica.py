@@ -0,0 +1,279 @@
+"""
+Regresión logística de la dirección del rendimiento de GGAL: ajuste, backtest walk-forward y grilla.
+
+    - `ajustar_lote` ajusta con IRLS (Newton) varias regularizaciones L2 a la vez sobre los
+      mismos datos: los gradientes y hessianos de todo el lote salen de productos de matrices
+      y se resuelven con un único `np.linalg.solve`. Acepta coeficientes iniciales (warm start).
+      `ajustar_lbfgs` es la alternativa con scipy para un ajuste suelto.
+    - `walk_forward` reajusta en cada fecha con la ventana expansiva o móvil hasta esa fecha y
+      predice las ruedas siguientes. Cada ajuste arranca de la solución de la ventana anterior,
+      que cambia en pocas filas, y converge en 2-3 iteraciones. Las medias y desvíos para
+      estandarizar salen de sumas acumuladas, sin recorrer la ventana.
+    - `grilla` corre el walk-forward de cada subconjunto de variables en un proceso aparte
+      (ProcessPoolExecutor), con todas las regularizaciones en el mismo lote.
+
+Para no mirar hacia adelante, en la fecha t sólo se entrena con filas cuyo objetivo ya se
+conoce (i + horizonte <= t).
+
+Uso:
+    python regresion_logistica.py [--ventana 0] [--paso 1] [--workers 4]
+    python regresion_logistica.py --benchmark
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from almacen_variables import matriz_modelo
+
+HORIZONTE = 1
+VENTANA_MINIMA = 250
+LAMBDAS = (1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+TOLERANCIA = 1e-8
+MAX_ITERACIONES = 50
+RUTA_RESULTADOS = "resultados_walk_forward.parquet"
+
+# Variables derivadas de la matriz de almacen_variables: nombre -> (columna, transformación, rezago).
+# "log_dif": log(x_t) - log(x_{t-rezago}); "nivel": x_t.
+VARIABLES_DERIVADAS = {
+    "ggal_r1": ("ggal_cierre", "log_dif", 1),
+    "ggal_r5": ("ggal_cierre", "log_dif", 5),
+    "ggal_r20": ("ggal_cierre", "log_dif", 20),
+    "ggal_volumen_r1": ("ggal_volumen", "log_dif", 1),
+    "ggal_ny_r1": ("ggal_ny_cierre", "log_dif", 1),
+    "dolar_ccl_r1": ("dolar_ccl", "log_dif", 1),
+    "dolar_ccl_r20": ("dolar_ccl", "log_dif", 20),
+    "fut_dolar_r1": ("fut_dolar_indice", "log_dif", 1),
+    "fut_dolar_tasa_implicita": ("fut_dolar_tasa_implicita", "nivel", 0),
+    "opc_iv_atm": ("opc_iv_atm", "nivel", 0),
+    "opc_skew": ("opc_skew", "nivel", 0),
+    "opc_pendiente_plazos": ("opc_pendiente_plazos", "nivel", 0),
+}
+
+SUBCONJUNTOS = {
+    "precio": ["ggal_r1", "ggal_r5", "ggal_r20", "ggal_volumen_r1"],
+    "precio_ny": ["ggal_r1", "ggal_r5", "ggal_r20", "ggal_volumen_r1", "ggal_ny_r1"],
+    "dolar": ["ggal_r1", "ggal_r5", "ggal_r20", "dolar_ccl_r1", "dolar_ccl_r20"],
+    "futuros": ["ggal_r1", "ggal_r5", "ggal_r20", "fut_dolar_r1", "fut_dolar_tasa_implicita"],
+    "opciones": ["ggal_r1", "ggal_r5", "ggal_r20", "opc_iv_atm", "opc_skew", "opc_pendiente_plazos"],
+}
+
+
+def variables_modelo(matriz, horizonte=HORIZONTE):
+    """Variables derivadas y objetivo (1 si el rendimiento de GGAL a `horizonte` ruedas es positivo)."""
+    df = pd.DataFrame(index=matriz.index)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for nombre, (columna, transformacion, rezago) in VARIABLES_DERIVADAS.items():
+            serie = matriz[columna]
+            df[nombre] = np.log(serie.where(serie > 0)).diff(rezago) if transformacion == "log_dif" else serie
+
+    log_ggal = np.log(matriz["ggal_cierre"])
+    futuro = log_ggal.shift(-horizonte) - log_ggal
+    df["objetivo"] = (futuro > 0).astype("float64").where(futuro.notna())
+    return df.replace([np.inf, -np.inf], np.nan)
+
+
+# --- Ajuste ---
+
+def _sigmoide(z):
+    return 0.5 * (1 + np.tanh(0.5 * z))
+
+
+def ajustar_lote(X, y, lambdas, W0=None, tol=TOLERANCIA, max_iteraciones=MAX_ITERACIONES):
+    """
+    IRLS de `len(lambdas)` regresiones logísticas con penalización L2 sobre los mismos datos.
+    X (n, p) incluye la columna de unos en la posición 0 (no se penaliza). Minimiza
+    log-verosimilitud media + lambda / 2 * ||w||². Devuelve (W (B, p), iteraciones).
+    """
+    n, p = X.shape
+    lambdas = np.asarray(lambdas, dtype=float)
+    W = np.zeros((len(lambdas), p)) if W0 is None else np.array(W0, dtype=float)
+    penalizacion = lambdas[:, None] * np.r_[0.0, np.ones(p - 1)]         # (B, p)
+    identidad = np.eye(p)
+
+    for iteracion in range(1, max_iteraciones + 1):
+        mu = _sigmoide(W @ X.T)                                            # (B, n)
+        gradiente = (mu - y) @ X / n + penalizacion * W                    # (B, p)
+        pesos = mu * (1 - mu) / n
+        # (B, p, n) @ (n, p): un producto de matrices por lote, en BLAS
+        hessiano = (pesos[:, None, :] * X.T) @ X + penalizacion[:, :, None] * identidad
+        paso = np.linalg.solve(hessiano, gradiente[:, :, None])[:, :, 0]
+        W -= paso
+        if np.abs(paso).max() < tol:
+            break
+    return W, iteracion
+
+
+def ajustar_lbfgs(X, y, lambda_, w0=None):
+    """Un ajuste con L-BFGS de scipy (misma función objetivo que `ajustar_lote`)."""
+    from scipy.optimize import minimize
+
+    n, p = X.shape
+    penalizacion = lambda_ * np.r_[0.0, np.ones(p - 1)]
+
+    def objetivo(w):
+        z = X @ w
+        perdida = np.mean(np.logaddexp(0, z) - y * z) + 0.5 * np.sum(penalizacion * w * w)
+        return perdida, X.T @ (_sigmoide(z) - y) / n + penalizacion * w
+
+    resultado = minimize(objetivo, np.zeros(p) if w0 is None else w0, jac=True, method="L-BFGS-B",
+                         options={"gtol": 1e-10})
+    return resultado.x, resultado.nit
+
+
+# --- Walk-forward ---
+
+def _sumas_acumuladas(Z):
+    ceros = np.zeros((1, Z.shape[1]))
+    return np.vstack([ceros, np.cumsum(Z, axis=0)]), np.vstack([ceros, np.cumsum(Z * Z, axis=0)])
+
+
+def walk_forward(datos, variables, lambdas=LAMBDAS, ventana=0, paso=1, horizonte=HORIZONTE,
+                 ventana_minima=VENTANA_MINIMA, warm_start=True):
+    """
+    Backtest walk-forward de las filas de `datos` con `variables` y objetivo completos.
+        ventana   0: expansiva (desde el principio); > 0: móvil de ese largo
+        paso      cada cuántas ruedas se reajusta (predice las `paso` ruedas siguientes)
+    Devuelve (predicciones: DataFrame fecha x lambda con la probabilidad, objetivo y
+    estadísticas: ajustes e iteraciones).
+    """
+    completas = datos[variables + ["objetivo"]].dropna()
+    Z = completas[variables].to_numpy(float)
+    y = completas["objetivo"].to_numpy(float)
+    n, p = Z.shape
+    S1, S2 = _sumas_acumuladas(Z)
+
+    W = None
+    probabilidades = np.full((n, len(lambdas)), np.nan)
+    ajustes = iteraciones = 0
+    for t in range(ventana_minima + horizonte, n, paso):
+        fin = t - horizonte + 1                                   # filas [inicio, fin) con objetivo conocido en t
+        inicio = max(0, fin - ventana) if ventana else 0
+        filas = fin - inicio
+        media = (S1[fin] - S1[inicio]) / filas
+        desvio = np.sqrt(np.maximum((S2[fin] - S2[inicio]) / filas - media ** 2, 0)) + 1e-12
+        X = np.hstack([np.ones((filas, 1)), (Z[inicio:fin] - media) / desvio])
+
+        W, k = ajustar_lote(X, y[inicio:fin], lambdas, W if warm_start else None)
+        ajustes += len(lambdas)
+        iteraciones += k
+
+        hasta = min(t + paso, n)
+        X_nuevo = np.hstack([np.ones((hasta - t, 1)), (Z[t:hasta] - media) / desvio])
+        probabilidades[t:hasta] = _sigmoide(X_nuevo @ W.T)
+
+    predicciones = pd.DataFrame(probabilidades, index=completas.index, columns=[f"p_{l:g}" for l in lambdas])
+    predicciones["objetivo"] = y
+    return predicciones.dropna(), {"ajustes": ajustes, "iteraciones": iteraciones}
+
+
+def _auc(y, p):
+    """Área bajo la curva ROC por rangos (Mann-Whitney)."""
+    rangos = pd.Series(p).rank().to_numpy()
+    positivos = y == 1
+    n1, n0 = positivos.sum(), (~positivos).sum()
+    return (rangos[positivos].sum() - n1 * (n1 + 1) / 2) / (n1 * n0) if n1 and n0 else np.nan
+
+
+def metricas(predicciones):
+    """Exactitud, log-loss y AUC de cada columna de probabilidad."""
+    y = predicciones["objetivo"].to_numpy()
+    filas = []
+    for columna in predicciones.columns.drop("objetivo"):
+        p = np.clip(predicciones[columna].to_numpy(), 1e-12, 1 - 1e-12)
+        filas.append({"lambda": float(columna[2:]), "exactitud": np.mean((p > 0.5) == y),
+                      "log_loss": -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)), "auc": _auc(y, p),
+                      "predicciones": len(y)})
+    return pd.DataFrame(filas)
+
+
+# --- Grilla ---
+
+def _correr_subconjunto(datos, nombre, variables, lambdas, ventana, paso, horizonte):
+    inicio = time.perf_counter()
+    predicciones, estadisticas = walk_forward(datos, variables, lambdas, ventana, paso, horizonte)
+    resultado = metricas(predicciones)
+    resultado.insert(0, "subconjunto", nombre)
+    resultado["ajustes"] = estadisticas["ajustes"] // len(lambdas)
+    return resultado, estadisticas, time.perf_counter() - inicio
+
+
+def grilla(datos, subconjuntos=None, lambdas=LAMBDAS, ventana=0, paso=1, horizonte=HORIZONTE, workers=None,
+           verbose=True):
+    """Walk-forward de cada subconjunto de variables en paralelo. Devuelve las métricas por subconjunto y lambda."""
+    subconjuntos = subconjuntos or SUBCONJUNTOS
+    workers = workers or min(len(subconjuntos), os.cpu_count() or 1)
+    resultados = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(_correr_subconjunto, datos, nombre, variables, lambdas, ventana, paso, horizonte): nombre
+                   for nombre, variables in subconjuntos.items()}
+        for futuro, nombre in futuros.items():
+            resultado, estadisticas, duracion = futuro.result()
+            resultados.append(resultado)
+            if verbose:
+                print(f"INFO: {nombre}: {estadisticas['ajustes']} ajustes en {duracion:.1f}s "
+                      f"({estadisticas['ajustes'] / duracion:.0f} ajustes/s)")
+    return pd.concat(resultados, ignore_index=True)
+
+
+# --- Benchmark ---
+
+def benchmark(datos, variables=None, paso=5, workers=None):
+    """Ajustes/s del walk-forward: L-BFGS uno por uno sin warm start, IRLS por lotes con y sin warm start, grilla."""
+    variables = variables or SUBCONJUNTOS["precio"]
+    completas = datos[variables + ["objetivo"]].dropna()
+    print(f"Benchmark: {len(completas)} filas, {len(variables)} variables, {len(LAMBDAS)} lambdas, paso {paso}")
+
+    # Referencia: scipy L-BFGS, un ajuste por lambda y por fecha desde cero (sobre una parte de las fechas)
+    Z = completas[variables].to_numpy(float)
+    y = completas["objetivo"].to_numpy(float)
+    fechas = range(VENTANA_MINIMA + HORIZONTE, len(Z), paso * 20)
+    inicio = time.perf_counter()
+    ajustes = 0
+    for t in fechas:
+        fin = t - HORIZONTE + 1
+        Zt = Z[:fin]
+        X = np.hstack([np.ones((fin, 1)), (Zt - Zt.mean(axis=0)) / Zt.std(axis=0)])
+        for lambda_ in LAMBDAS:
+            ajustar_lbfgs(X, y[:fin], lambda_)
+            ajustes += 1
+    duracion = time.perf_counter() - inicio
+    print(f"{'L-BFGS sin warm start':>28}: {ajustes / duracion:8.0f} ajustes/s")
+
+    for nombre, warm_start in (("IRLS por lotes", False), ("IRLS por lotes + warm start", True)):
+        inicio = time.perf_counter()
+        predicciones, estadisticas = walk_forward(datos, variables, paso=paso, warm_start=warm_start)
+        duracion = time.perf_counter() - inicio
+        print(f"{nombre:>28}: {estadisticas['ajustes'] / duracion:8.0f} ajustes/s "
+              f"({estadisticas['ajustes']} ajustes en {duracion:.2f}s, "
+              f"{estadisticas['iteraciones'] / (estadisticas['ajustes'] / len(LAMBDAS)):.1f} iteraciones por lote)")
+
+    inicio = time.perf_counter()
+    resultados = grilla(datos, lambdas=LAMBDAS, paso=paso, workers=workers, verbose=False)
+    duracion = time.perf_counter() - inicio
+    total = resultados["ajustes"].sum()
+    print(f"{'grilla (' + str(len(SUBCONJUNTOS)) + ' subconjuntos)':>28}: {total / duracion:8.0f} ajustes/s "
+          f"({total} ajustes en {duracion:.2f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regresión logística walk-forward sobre la matriz del modelo")
+    parser.add_argument("--ventana", type=int, default=0, help="0: expansiva; > 0: móvil de ese largo")
+    parser.add_argument("--paso", type=int, default=1)
+    parser.add_argument("--horizonte", type=int, default=HORIZONTE)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    datos = variables_modelo(matriz_modelo(verbose=False), args.horizonte)
+    if args.benchmark:
+        benchmark(datos, workers=args.workers)
+    else:
+        resultados = grilla(datos, ventana=args.ventana, paso=args.paso, horizonte=args.horizonte,
+                            workers=args.workers)
+        resultados.to_parquet(RUTA_RESULTADOS, index=False)
+        print(resultados.sort_values("log_loss").to_string(index=False))
+        print(f"✅ Resultados guardados en {RUTA_RESULTADOS}")
@@ -0,0 +1,241 @@
+"""
+Servicio de predicción del modelo de dirección de GGAL: el modelo se carga una vez y queda en memoria.
+
+    - `entrenar_modelo` ajusta la regresión logística (regresion_logistica.ajustar_lote) con
+      todas las ruedas disponibles y la guarda en un JSON: variables, coeficientes, media y
+      desvío de estandarización y la definición de cada variable derivada.
+    - `Modelo.predecir` recibe un array de NumPy (n, variables), una tabla de Arrow o un
+      DataFrame y devuelve las probabilidades de suba.
+    - `EstadoVariables` guarda sólo las últimas ruedas de las columnas que hacen falta
+      (el rezago más largo + 1). `agregar_rueda` recibe los valores nuevos (ej. GGAL, CCL,
+      tasas); las columnas que no vienen se arrastran de la rueda anterior, igual que en
+      almacen_variables. Si la fecha es la de la última rueda, la reemplaza (intradiario).
+      Las variables de esa rueda se calculan sin recorrer el histórico.
+    - `servir` expone lo mismo por HTTP (http.server, sin dependencias):
+          GET  /salud                                   modelo y última rueda
+          POST /predecir  {"filas": [[...], ...]}       probabilidades de un lote
+          POST /rueda     {"fecha": "2025-05-16", "valores": {"ggal_cierre": 6780, ...}}
+
+Uso:
+    python servicio_prediccion.py entrenar [--subconjunto precio] [--lambda 1.0]
+    python servicio_prediccion.py servir [--puerto 8000]
+"""
+import argparse
+import json
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from almacen_variables import matriz_modelo
+from regresion_logistica import HORIZONTE, SUBCONJUNTOS, VARIABLES_DERIVADAS, ajustar_lote, variables_modelo
+
+RUTA_MODELO = "modelo_ggal.json"
+PUERTO = 8000
+LAMBDA = 1.0
+
+
+def entrenar_modelo(matriz, variables, lambda_=LAMBDA, horizonte=HORIZONTE, ruta=RUTA_MODELO):
+    """Ajusta con todas las ruedas con datos completos y guarda el modelo en `ruta` (JSON)."""
+    datos = variables_modelo(matriz, horizonte)[variables + ["objetivo"]].dropna()
+    Z = datos[variables].to_numpy(float)
+    media, desvio = Z.mean(axis=0), Z.std(axis=0) + 1e-12
+    X = np.hstack([np.ones((len(Z), 1)), (Z - media) / desvio])
+    W, _ = ajustar_lote(X, datos["objetivo"].to_numpy(float), [lambda_])
+
+    modelo = {
+        "variables": variables,
+        "derivadas": {v: list(VARIABLES_DERIVADAS[v]) for v in variables},
+        "coeficientes": W[0].tolist(),
+        "media": media.tolist(),
+        "desvio": desvio.tolist(),
+        "lambda": lambda_,
+        "horizonte": horizonte,
+        "filas": len(datos),
+        "entrenado_hasta": f"{datos.index.max():%Y-%m-%d}",
+    }
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(modelo, f, indent=1, ensure_ascii=False)
+    print(f"✅ Modelo con {len(variables)} variables y {len(datos)} ruedas guardado en {ruta}")
+    return modelo
+
+
+class Modelo:
+    """Regresión logística serializada por `entrenar_modelo`."""
+
+    def __init__(self, ruta=RUTA_MODELO):
+        with open(ruta, encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.variables = self.config["variables"]
+        self.intercepto = self.config["coeficientes"][0]
+        # Se pliega la estandarización en los coeficientes: p = sigmoide(b0' + X @ b')
+        coeficientes = np.array(self.config["coeficientes"][1:])
+        desvio, media = np.array(self.config["desvio"]), np.array(self.config["media"])
+        self.pesos = coeficientes / desvio
+        self.intercepto -= float(self.pesos @ media)
+
+    def _matriz(self, X):
+        if isinstance(X, pa.Table):
+            return np.column_stack([X.column(v).to_numpy(zero_copy_only=False) for v in self.variables]).astype(float)
+        if isinstance(X, pd.DataFrame):
+            return X[self.variables].to_numpy(float)
+        X = np.asarray(X, dtype=float)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def predecir(self, X):
+        """Probabilidad de suba para cada fila (NaN si falta alguna variable)."""
+        z = self._matriz(X) @ self.pesos + self.intercepto
+        return 0.5 * (1 + np.tanh(0.5 * z))
+
+
+class EstadoVariables:
+    """Últimas ruedas de las columnas de la matriz que usan las variables del modelo."""
+
+    def __init__(self, derivadas):
+        self.derivadas = derivadas
+        self.columnas = sorted({columna for columna, _, _ in derivadas.values()})
+        self.largo = max(rezago for _, _, rezago in derivadas.values()) + 1
+        self.fechas = deque(maxlen=self.largo)
+        self.filas = deque(maxlen=self.largo)
+        self.bloqueo = threading.Lock()
+
+    @classmethod
+    def desde_matriz(cls, matriz, derivadas):
+        estado = cls(derivadas)
+        for fecha, fila in matriz[estado.columnas].tail(estado.largo).iterrows():
+            estado.fechas.append(fecha)
+            estado.filas.append(fila.to_numpy(float))
+        return estado
+
+    def agregar_rueda(self, fecha, valores):
+        """
+        Incorpora los `valores` (columna -> valor) de `fecha` y devuelve las variables de esa rueda
+        en el orden de `derivadas`.
+        """
+        fecha = pd.Timestamp(fecha)
+        with self.bloqueo:
+            intradiario = bool(self.fechas) and fecha == self.fechas[-1]
+            if self.fechas and fecha < self.fechas[-1]:
+                raise ValueError(f"La fecha {fecha:%Y-%m-%d} es anterior a la última rueda ({self.fechas[-1]:%Y-%m-%d})")
+            fila = self.filas[-1].copy() if self.filas else np.full(len(self.columnas), np.nan)
+            for columna, valor in valores.items():
+                if columna in self.columnas:
+                    fila[self.columnas.index(columna)] = float(valor)
+            if intradiario:
+                self.filas[-1] = fila
+            else:
+                self.fechas.append(fecha)
+                self.filas.append(fila)
+            return self._variables()
+
+    def _variables(self):
+        resultado = []
+        for columna, transformacion, rezago in self.derivadas.values():
+            i = self.columnas.index(columna)
+            actual = self.filas[-1][i]
+            if transformacion == "nivel":
+                resultado.append(actual)
+            elif len(self.filas) > rezago and actual > 0 and self.filas[-1 - rezago][i] > 0:
+                resultado.append(np.log(actual) - np.log(self.filas[-1 - rezago][i]))
+            else:
+                resultado.append(np.nan)
+        return np.array(resultado)
+
+    @property
+    def ultima_fecha(self):
+        return self.fechas[-1] if self.fechas else None
+
+
+class Servicio:
+    """Modelo + estado de variables, compartidos por la API en proceso y el servidor HTTP."""
+
+    def __init__(self, ruta_modelo=RUTA_MODELO, matriz=None):
+        self.modelo = Modelo(ruta_modelo)
+        derivadas = {v: tuple(d) for v, d in self.modelo.config["derivadas"].items()}
+        matriz = matriz if matriz is not None else matriz_modelo(verbose=False)
+        self.estado = EstadoVariables.desde_matriz(matriz, derivadas)
+
+    def predecir(self, X):
+        return self.modelo.predecir(X)
+
+    def puntuar_rueda(self, fecha, valores):
+        """Actualiza el estado con la rueda y devuelve (variables, probabilidad)."""
+        variables = self.estado.agregar_rueda(fecha, valores)
+        return variables, float(self.modelo.predecir(variables)[0])
+
+
+def _manejador(servicio):
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _responder(self, codigo, cuerpo):
+            datos = json.dumps(cuerpo, allow_nan=True).encode()
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def do_GET(self):
+            if self.path != "/salud":
+                return self._responder(404, {"error": "ruta desconocida"})
+            ultima = servicio.estado.ultima_fecha
+            self._responder(200, {"variables": servicio.modelo.variables,
+                                  "entrenado_hasta": servicio.modelo.config["entrenado_hasta"],
+                                  "ultima_rueda": f"{ultima:%Y-%m-%d}" if ultima is not None else None})
+
+        def do_POST(self):
+            try:
+                pedido = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path == "/predecir":
+                    probabilidades = servicio.predecir(np.array(pedido["filas"], dtype=float))
+                    return self._responder(200, {"probabilidades": probabilidades.tolist()})
+                if self.path == "/rueda":
+                    variables, probabilidad = servicio.puntuar_rueda(pedido["fecha"], pedido.get("valores", {}))
+                    return self._responder(200, {"fecha": pedido["fecha"], "probabilidad": probabilidad,
+                                                 "variables": dict(zip(servicio.modelo.variables, variables.tolist()))})
+                self._responder(404, {"error": "ruta desconocida"})
+            except (KeyError, ValueError, TypeError) as e:
+                self._responder(400, {"error": str(e)})
+
+        def log_message(self, *args):
+            pass
+
+    return Manejador
+
+
+def crear_servidor(servicio, puerto=PUERTO, host="127.0.0.1"):
+    """ThreadingHTTPServer con los endpoints del servicio (sin arrancar)."""
+    return ThreadingHTTPServer((host, puerto), _manejador(servicio))
+
+
+def servir(ruta_modelo=RUTA_MODELO, puerto=PUERTO, host="127.0.0.1"):
+    servidor = crear_servidor(Servicio(ruta_modelo), puerto, host)
+    print(f"INFO: sirviendo {ruta_modelo} en http://{host}:{servidor.server_port}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio de predicción del modelo de GGAL")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    entrenar = subcomandos.add_parser("entrenar")
+    entrenar.add_argument("--subconjunto", choices=list(SUBCONJUNTOS), default="precio")
+    entrenar.add_argument("--lambda", dest="lambda_", type=float, default=LAMBDA)
+    entrenar.add_argument("--modelo", default=RUTA_MODELO)
+    servidor = subcomandos.add_parser("servir")
+    servidor.add_argument("--modelo", default=RUTA_MODELO)
+    servidor.add_argument("--puerto", type=int, default=PUERTO)
+    args = parser.parse_args()
+
+    if args.comando == "entrenar":
+        entrenar_modelo(matriz_modelo(verbose=False), SUBCONJUNTOS[args.subconjunto], args.lambda_, ruta=args.modelo)
+    else:
+        servir(args.modelo, args.puerto)
@@ -0,0 +1,600 @@
+"""
+Corrida completa del repo como un grafo de tareas: scraping -> PDFs -> ETLs -> variables -> modelo.
+
+Cada tarea de TAREAS declara sus entradas (globs relativos a la raíz), sus salidas y los
+módulos de los que depende su código. El grafo sale de cruzar las salidas de cada tarea con
+las entradas de las demás:
+
+    scrape -> pdf -> opciones ─┐
+                  -> tasas ────┤
+    futuros ───────────────────┤
+    inflacion ─────────────────┼-> variables -> entrenar
+    dolar ─────────────────────┘
+
+    - La huella de una tarea es el SHA-256 de sus entradas, de su código y de VERSION. Si no
+      cambió y sus salidas siguen como las dejó, la tarea no se vuelve a correr. Los hashes
+      de los archivos se guardan en <raiz>/.pipeline/estado.json con el tamaño y la fecha de
+      modificación: sólo se vuelve a hashear lo que se tocó.
+    - Las tareas independientes corren en paralelo en un pool de procesos, cada una en un
+      proceso nuevo (así la memoria máxima medida es la de esa tarea).
+    - Por tarea se registran segundos, memoria máxima (RSS), filas y filas/s en un perfil JSON.
+    - opciones y tasas agregan las fechas extraídas a df_opciones.parquet / df_vtos_tasa.parquet
+      (reemplazando esas fechas): DataOpciones puede tener sólo los informes del último scraping.
+    - Una tarea sin entradas (ej. sin PDFs descargados) se saltea con una advertencia y las
+      siguientes usan las salidas que ya están en el repo. `scrape` necesita Chrome y red:
+      sólo corre si se la pide explícitamente.
+
+Uso:
+    python pipeline.py                              # todo lo que no está al día
+    python pipeline.py --tareas variables entrenar  # esas tareas y las anteriores
+    python pipeline.py --tareas scrape pdf          # descargar los informes del año y extraerlos
+    python pipeline.py --forzar --perfil perfil.json
+    python pipeline.py --benchmark                  # muestra incluida, compara con el benchmark anterior
+"""
+import argparse
+import contextlib
+import fnmatch
+import glob
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+CARPETA_ESTADO = ".pipeline"
+CARPETA_PDFS = "03-CotizacionOpciones/DataOpciones"
+DATASET_SECCIONES = f"{CARPETA_PDFS}/datos_secciones_pdf"
+CARPETA_MUESTRA = "04-Cotizacion Futuros/IAMC_Informes_2015_01"
+RUTA_PERFIL_BENCHMARK = "perfil_benchmark.json"
+
+# Cambiar VERSION invalida todas las tareas (ej. si cambia cómo se arma una tarea)
+VERSION = 1
+TAMANIO_BLOQUE_HASH = 1 << 20
+# Una tarea es una regresión si tarda más que (1 + UMBRAL_REGRESION) veces lo del benchmark anterior
+UMBRAL_REGRESION = 0.25
+SEGUNDOS_MINIMOS_REGRESION = 0.5
+
+
+def _modulo(carpeta, nombre):
+    """Importa `nombre`.py de una carpeta del repo (cada tarea corre en su propio proceso)."""
+    ruta = os.path.join(RAIZ, carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+    return importlib.import_module(nombre)
+
+
+def _filas_parquet(ruta):
+    return pq.read_metadata(ruta).num_rows
+
+
+# --- Tareas: reciben la raíz de los datos y devuelven las filas que produjeron ---
+
+def tarea_scrape(raiz):
+    """Informes del IAMC del año en curso (scraper_iamc.py)."""
+    scraper = _modulo("03-CotizacionOpciones", "scraper_iamc")
+    hoy = datetime.now()
+    carpeta = os.path.join(raiz, CARPETA_PDFS)
+    scraper.ejecutar_pool(datetime(hoy.year, 1, 1), hoy, carpeta_base=carpeta,
+                          ruta_manifiesto=os.path.join(carpeta, "manifiesto_iamc.sqlite"))
+    return len(glob.glob(os.path.join(carpeta, "**", "*.pdf"), recursive=True))
+
+
+def tarea_pdf(raiz):
+    """Anexo A de cada informe al dataset particionado (extraccion_secciones.py)."""
+    secciones = _modulo("03-CotizacionOpciones", "extraccion_secciones")
+    resultados = secciones.procesar_secciones(os.path.join(raiz, CARPETA_PDFS),
+                                              os.path.join(raiz, DATASET_SECCIONES))
+    return sum(r["filas"] or 0 for r in resultados)
+
+
+def _actualizar_historia(ruta, nuevas, **kwargs):
+    """
+    Agrega `nuevas` al parquet histórico `ruta`: las fechas extraídas reemplazan a las mismas
+    fechas de la historia y el resto de la historia queda igual. DataOpciones puede tener sólo
+    los informes del último scraping, así que nunca se escribe la extracción sola.
+    """
+    if os.path.exists(ruta):
+        historia = pd.read_parquet(ruta)
+        historia = historia[~historia["Fecha"].isin(nuevas["Fecha"].unique())]
+        nuevas = pd.concat([historia, nuevas[historia.columns]], ignore_index=True)
+    nuevas = nuevas.sort_values(by="Fecha", kind="stable").reset_index(drop=True)
+    nuevas.to_parquet(ruta + ".tmp", index=False, **kwargs)
+    os.replace(ruta + ".tmp", ruta)
+    print(f"✅ {ruta}: {len(nuevas)} filas hasta {nuevas['Fecha'].max():%Y-%m-%d}")
+
+
+def tarea_opciones(raiz):
+    """Fechas extraídas de df_opciones.parquet desde el dataset de secciones (etl_opciones.py)."""
+    secciones = _modulo("03-CotizacionOpciones", "extraccion_secciones")
+    etl = _modulo("03-CotizacionOpciones", "etl_opciones")
+    df, _ = etl.etl_opciones(secciones.leer_opciones(os.path.join(raiz, DATASET_SECCIONES)))
+    _actualizar_historia(os.path.join(raiz, "03-CotizacionOpciones", "df_opciones.parquet"), df)
+    return len(df)
+
+
+def tarea_tasas(raiz):
+    """Fechas extraídas de df_vtos_tasa.parquet (lo que hace ETL_Vto_Tasas.ipynb) desde el dataset de secciones."""
+    secciones = _modulo("03-CotizacionOpciones", "extraccion_secciones")
+    df = secciones.leer_vencimientos(os.path.join(raiz, DATASET_SECCIONES))
+    df = df[secciones.ESQUEMA_VENCIMIENTOS.names].sort_values(by="Fecha", kind="stable")
+    df = df.drop_duplicates().reset_index(drop=True)
+    _actualizar_historia(os.path.join(raiz, "03-CotizacionOpciones", "df_vtos_tasa.parquet"), df,
+                         compression="snappy")
+    return len(df)
+
+
+def tarea_futuros(raiz):
+    """df_futuro_*.parquet (ingesta_futuros.py) y su serie continua y curva (indice_futuros.py)."""
+    ingesta = _modulo("04-Cotizacion Futuros", "ingesta_futuros")
+    indice = _modulo("04-Cotizacion Futuros", "indice_futuros")
+    carpeta = os.path.join(raiz, "04-Cotizacion Futuros")
+    filas = 0
+    for nombre, config in ingesta.SUBYACENTES.items():
+        filas += ingesta.ingestar_subyacente(nombre, carpeta)
+        indice.IndiceFuturos(os.path.join(carpeta, config["salida"])).actualizar()
+    return filas
+
+
+def tarea_inflacion(raiz):
+    """df_comb.csv y deflactor_diario.parquet (indice_inflacion.py)."""
+    inflacion = _modulo("01-Inflacion", "indice_inflacion")
+    comb, deflactor = inflacion.procesar(os.path.join(raiz, "01-Inflacion"))
+    return len(comb) + len(deflactor)
+
+
+def tarea_dolar(raiz):
+    """CCL / MEP implícitos conciliados con los publicados (dolar_implicito.py)."""
+    dolar = _modulo("05-Cotizacion Dolar", "dolar_implicito")
+    carpeta = os.path.join(raiz, "05-Cotizacion Dolar")
+    motor = dolar.DolarImplicito(
+        os.path.join(raiz, "00-Cotizacion", "GGAL.csv"), os.path.join(raiz, "00-Cotizacion", "GGAL_NY.csv"),
+        os.path.join(carpeta, "DOLAR CCL - Cotizaciones historicas.csv"),
+        os.path.join(carpeta, "DOLAR MEP - Cotizaciones historicas.csv"),
+        carpeta_bonos=carpeta, ruta_salida=os.path.join(carpeta, "dolar_implicito.parquet"))
+    motor.actualizar()
+    return _filas_parquet(motor.ruta_salida)
+
+
+def tarea_variables(raiz):
+    """06-Modelo/matriz_modelo.parquet con todas las fuentes alineadas (almacen_variables.py)."""
+    almacen = _modulo("06-Modelo", "almacen_variables")
+    carpeta = os.path.join(raiz, "06-Modelo")
+    matriz = almacen.guardar_matriz(os.path.join(carpeta, almacen.RUTA_MATRIZ), raiz=raiz,
+                                    carpeta_cache=os.path.join(carpeta, "cache_variables"), verbose=False)
+    return len(matriz)
+
+
+def tarea_entrenar(raiz):
+    """Modelo de dirección de GGAL con el subconjunto 'precio' (servicio_prediccion.py)."""
+    servicio = _modulo("06-Modelo", "servicio_prediccion")
+    regresion = _modulo("06-Modelo", "regresion_logistica")
+    carpeta = os.path.join(raiz, "06-Modelo")
+    matriz = pd.read_parquet(os.path.join(carpeta, "matriz_modelo.parquet")).set_index("fecha")
+    modelo = servicio.entrenar_modelo(matriz, regresion.SUBCONJUNTOS["precio"],
+                                      ruta=os.path.join(carpeta, servicio.RUTA_MODELO))
+    return modelo["filas"]
+
+
+# entradas: globs relativos a la raíz de los datos. salidas: archivos o carpetas. codigo: módulos
+# (relativos al repo) que entran en la huella. externa: sólo corre si se la pide por nombre.
+# historia: la salida acumula lo extraído sobre la versión anterior (no es una entrada, porque
+# la tarea la reescribe).
+_BONOS = ["05-Cotizacion Dolar/*_Cotizaciones_Historicas.xls", "05-Cotizacion Dolar/*_Cotizaciones_Historicas_archivos/*"]
+TAREAS = {
+    "scrape": {"funcion": tarea_scrape, "externa": True, "entradas": [],
+               "salidas": [f"{CARPETA_PDFS}/**/*.pdf"],
+               "codigo": ["03-CotizacionOpciones/scraper_iamc.py", "03-CotizacionOpciones/descarga_iamc.py",
+                          "03-CotizacionOpciones/manifiesto_iamc.py", "03-CotizacionOpciones/esperas.py"]},
+    "pdf": {"funcion": tarea_pdf, "entradas": [f"{CARPETA_PDFS}/**/*.pdf"], "salidas": [DATASET_SECCIONES],
+            "codigo": ["03-CotizacionOpciones/extraccion_secciones.py", "03-CotizacionOpciones/extraccion_pdf.py",
+                       "03-CotizacionOpciones/cache_extraccion.py"]},
+    "opciones": {"funcion": tarea_opciones, "historia": True, "entradas": [f"{DATASET_SECCIONES}/opciones/**/*.parquet"],
+                 "salidas": ["03-CotizacionOpciones/df_opciones.parquet"],
+                 "codigo": ["03-CotizacionOpciones/etl_opciones.py", "03-CotizacionOpciones/extraccion_secciones.py"]},
+    "tasas": {"funcion": tarea_tasas, "historia": True, "entradas": [f"{DATASET_SECCIONES}/vencimientos/**/*.parquet"],
+              "salidas": ["03-CotizacionOpciones/df_vtos_tasa.parquet"],
+              "codigo": ["03-CotizacionOpciones/extraccion_secciones.py"]},
+    "futuros": {"funcion": tarea_futuros, "entradas": ["04-Cotizacion Futuros/Futuros*.csv"],
+                "salidas": ["04-Cotizacion Futuros/df_futuro_dolar.parquet", "04-Cotizacion Futuros/df_futuro_GGAL.parquet",
+                            "04-Cotizacion Futuros/df_futuro_dolar_continuo.parquet",
+                            "04-Cotizacion Futuros/df_futuro_GGAL_continuo.parquet"],
+                "codigo": ["04-Cotizacion Futuros/ingesta_futuros.py", "04-Cotizacion Futuros/indice_futuros.py"]},
+    "inflacion": {"funcion": tarea_inflacion,
+                  "entradas": ["01-Inflacion/IpcTramo*.csv", "01-Inflacion/diario diar_cer 2002.xls"],
+                  "salidas": ["01-Inflacion/df_comb.csv", "01-Inflacion/deflactor_diario.parquet"],
+                  "codigo": ["01-Inflacion/indice_inflacion.py", "planillas.py"]},
+    "dolar": {"funcion": tarea_dolar,
+              "entradas": ["00-Cotizacion/GGAL.csv", "00-Cotizacion/GGAL_NY.csv",
+                           "05-Cotizacion Dolar/DOLAR CCL - Cotizaciones historicas.csv",
+                           "05-Cotizacion Dolar/DOLAR MEP - Cotizaciones historicas.csv"] + _BONOS,
+              "salidas": ["05-Cotizacion Dolar/dolar_implicito.parquet"],
+              "codigo": ["05-Cotizacion Dolar/dolar_implicito.py", "03-CotizacionOpciones/volatilidad_implicita.py",
+                         "planillas.py"]},
+    "variables": {"funcion": tarea_variables,
+                  "entradas": ["00-Cotizacion/GGAL.csv", "00-Cotizacion/GGAL_NY.csv", "01-Inflacion/df_comb.csv",
+                               "02-TasaLibreDeRiesgo/tasa_leliq.csv", "02-TasaLibreDeRiesgo/diar_bai.xls",
+                               "05-Cotizacion Dolar/DOLAR CCL - Cotizaciones historicas.csv",
+                               "05-Cotizacion Dolar/DOLAR MEP - Cotizaciones historicas.csv",
+                               "05-Cotizacion Dolar/dolar_implicito.parquet",
+                               "04-Cotizacion Futuros/df_futuro_dolar.parquet",
+                               "04-Cotizacion Futuros/df_futuro_GGAL.parquet",
+                               "03-CotizacionOpciones/df_opciones.parquet",
+                               "03-CotizacionOpciones/df_vtos_tasa.parquet"] + _BONOS,
+                  "salidas": ["06-Modelo/matriz_modelo.parquet"],
+                  "codigo": ["06-Modelo/almacen_variables.py", "05-Cotizacion Dolar/dolar_implicito.py",
+                             "04-Cotizacion Futuros/indice_futuros.py", "03-CotizacionOpciones/volatilidad_implicita.py",
+                             "planillas.py"]},
+    "entrenar": {"funcion": tarea_entrenar, "entradas": ["06-Modelo/matriz_modelo.parquet"],
+                 "salidas": ["06-Modelo/modelo_ggal.json"],
+                 "codigo": ["06-Modelo/servicio_prediccion.py", "06-Modelo/regresion_logistica.py"]},
+}
+
+
+# --- Grafo ---
+
+def _produce(salida, entrada):
+    """True si la salida `salida` (archivo, carpeta o glob) alimenta el glob de entrada `entrada`."""
+    return salida == entrada or fnmatch.fnmatch(salida, entrada) or entrada.startswith(salida.rstrip("/") + "/")
+
+
+def dependencias(tareas=TAREAS):
+    """{tarea: tareas cuyas salidas usa}."""
+    return {nombre: sorted(otra for otra, config_otra in tareas.items() if otra != nombre
+                           and any(_produce(s, e) for s in config_otra["salidas"] for e in config["entradas"]))
+            for nombre, config in tareas.items()}
+
+
+def orden_topologico(tareas=TAREAS):
+    deps = dependencias(tareas)
+    orden, pendientes = [], dict(deps)
+    while pendientes:
+        listas = sorted(n for n, d in pendientes.items() if all(x in orden for x in d))
+        if not listas:
+            raise ValueError(f"Ciclo entre las tareas: {sorted(pendientes)}")
+        orden.extend(listas)
+        for n in listas:
+            del pendientes[n]
+    return orden
+
+
+def seleccionar(pedidas=None, tareas=TAREAS):
+    """Las tareas pedidas y todas las anteriores; las externas sólo si se las pidió por nombre."""
+    deps = dependencias(tareas)
+    if not pedidas:
+        return [n for n in orden_topologico(tareas) if not tareas[n].get("externa")]
+    desconocidas = set(pedidas) - set(tareas)
+    if desconocidas:
+        raise ValueError(f"Tareas desconocidas: {sorted(desconocidas)} (opciones: {list(tareas)})")
+    elegidas, pila = set(), list(pedidas)
+    while pila:
+        nombre = pila.pop()
+        if nombre not in elegidas:
+            elegidas.add(nombre)
+            pila.extend(d for d in deps[nombre] if not tareas[d].get("externa") or d in pedidas)
+    return [n for n in orden_topologico(tareas) if n in elegidas]
+
+
+# --- Huellas ---
+
+def _expandir(raiz, patron):
+    """Archivos (relativos a `raiz`, con '/') de un glob, archivo o carpeta."""
+    absoluto = os.path.join(raiz, patron)
+    if os.path.isdir(absoluto):
+        absoluto = os.path.join(absoluto, "**", "*")
+    return sorted(os.path.relpath(r, raiz).replace(os.sep, "/")
+                  for r in glob.glob(absoluto, recursive=True) if os.path.isfile(r))
+
+
+class Hashes:
+    """SHA-256 de archivos con caché por (tamaño, fecha de modificación)."""
+
+    def __init__(self, raiz, cache=None):
+        self.raiz = raiz
+        self.cache = cache or {}
+
+    def __call__(self, relativa, raiz=None):
+        ruta = os.path.join(raiz or self.raiz, relativa)
+        stat = os.stat(ruta)
+        clave = os.path.abspath(ruta)
+        guardado = self.cache.get(clave)
+        if guardado and guardado[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return guardado[2]
+        sha = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(TAMANIO_BLOQUE_HASH), b""):
+                sha.update(bloque)
+        self.cache[clave] = [stat.st_size, stat.st_mtime_ns, sha.hexdigest()]
+        return sha.hexdigest()
+
+
+def huella(nombre, entradas, hashes, tareas=TAREAS):
+    """SHA-256 de VERSION, los archivos de entrada (ya expandidos) y el código de la tarea."""
+    sha = hashlib.sha256(f"{VERSION}|{nombre}".encode())
+    for archivo in entradas:
+        sha.update(f"{archivo}|{hashes(archivo)}".encode())
+    for archivo in tareas[nombre]["codigo"]:
+        sha.update(f"{archivo}|{hashes(archivo, RAIZ)}".encode())
+    return sha.hexdigest()
+
+
+def _salidas(raiz, nombre, hashes, tareas=TAREAS):
+    """{archivo: sha} de las salidas de la tarea, o None si falta alguna."""
+    resultado = {}
+    for salida in tareas[nombre]["salidas"]:
+        archivos = _expandir(raiz, salida)
+        if not archivos:
+            return None
+        resultado.update({a: hashes(a) for a in archivos})
+    return resultado
+
+
+def _leer_estado(raiz):
+    try:
+        with open(os.path.join(raiz, CARPETA_ESTADO, "estado.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"version": VERSION, "archivos": {}, "tareas": {}}
+
+
+def _guardar_estado(raiz, estado):
+    carpeta = os.path.join(raiz, CARPETA_ESTADO)
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, "estado.json")
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=1, ensure_ascii=False)
+    os.replace(ruta + ".tmp", ruta)
+
+
+# --- Ejecución ---
+
+def _rss_max_mb():
+    """Memoria máxima del proceso (y de sus hijos, ej. el pool de extracción de PDFs) en MB."""
+    if resource is None:
+        return None
+    maximo = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                 resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return maximo / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _ejecutar(nombre, raiz, ruta_log):
+    """Corre la tarea en el proceso del pool, con su salida en `ruta_log`."""
+    inicio = time.perf_counter()
+    with open(ruta_log, "w", encoding="utf-8") as log, contextlib.redirect_stdout(log), \
+            contextlib.redirect_stderr(log):
+        filas = TAREAS[nombre]["funcion"](raiz)
+    return {"segundos": time.perf_counter() - inicio, "rss_max_mb": _rss_max_mb(), "filas": int(filas or 0)}
+
+
+def ejecutar(pedidas=None, raiz=RAIZ, forzar=False, workers=None, ruta_perfil=None, verbose=True):
+    """
+    Corre las tareas pedidas (todas las no externas por defecto) que no están al día y
+    devuelve el perfil: una entrada por tarea con estado, segundos, rss_max_mb, filas y filas/s.
+    """
+    seleccion = seleccionar(pedidas)
+    deps = dependencias()
+    estado = _leer_estado(raiz)
+    if estado.get("version") != VERSION:
+        estado = {"version": VERSION, "archivos": {}, "tareas": {}}
+    hashes = Hashes(raiz, estado["archivos"])
+    carpeta_logs = os.path.join(raiz, CARPETA_ESTADO, "logs")
+    os.makedirs(carpeta_logs, exist_ok=True)
+
+    resultados = {}
+    en_curso = {}
+    inicio = time.perf_counter()
+
+    def terminar(nombre, resultado):
+        resultados[nombre] = {"tarea": nombre, "segundos": 0.0, "rss_max_mb": None, "filas": 0, **resultado}
+        if verbose:
+            r = resultados[nombre]
+            detalle = f" en {r['segundos']:.2f}s, {r['filas']} filas" if r["estado"] == "ejecutada" else ""
+            print(f"INFO: {nombre:<10} {r['estado']}{detalle}")
+
+    # max_tasks_per_child=1: cada tarea en un proceso nuevo, con su propia memoria máxima
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), max_tasks_per_child=1,
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        while len(resultados) < len(seleccion):
+            for nombre in seleccion:
+                if nombre in resultados or nombre in en_curso:
+                    continue
+                previas = [d for d in deps[nombre] if d in seleccion]
+                if not all(d in resultados for d in previas):
+                    continue
+                fallidas = [d for d in previas if resultados[d]["estado"] in ("error", "omitida")]
+                if fallidas:
+                    terminar(nombre, {"estado": "omitida", "detalle": f"falló {', '.join(fallidas)}"})
+                    continue
+                config = TAREAS[nombre]
+                entradas = [_expandir(raiz, e) for e in config["entradas"]]
+                if any(not archivos for archivos in entradas):
+                    faltan = [e for e, archivos in zip(config["entradas"], entradas) if not archivos]
+                    print(f"ADVERTENCIA: {nombre} sin entradas ({', '.join(faltan)}): se usan las salidas existentes")
+                    terminar(nombre, {"estado": "sin_entradas"})
+                    continue
+                actual = huella(nombre, sorted({a for archivos in entradas for a in archivos}), hashes)
+                guardado = estado["tareas"].get(nombre, {})
+                if (not forzar and not config.get("externa") and guardado.get("huella") == actual
+                        and _salidas(raiz, nombre, hashes) == guardado.get("salidas")):
+                    terminar(nombre, {"estado": "al_dia"})
+                    continue
+                ruta_log = os.path.join(carpeta_logs, f"{nombre}.log")
+                en_curso[nombre] = (pool.submit(_ejecutar, nombre, raiz, ruta_log), actual)
+
+            if not en_curso:
+                continue
+            listos, _ = wait([futuro for futuro, _ in en_curso.values()], return_when=FIRST_COMPLETED)
+            for nombre in [n for n, (f, _) in en_curso.items() if f in listos]:
+                futuro, actual = en_curso.pop(nombre)
+                try:
+                    medicion = futuro.result()
+                except Exception as e:
+                    print(f"ERROR: la tarea {nombre} falló: {e} (ver {CARPETA_ESTADO}/logs/{nombre}.log)")
+                    estado["tareas"].pop(nombre, None)
+                    terminar(nombre, {"estado": "error", "detalle": str(e)})
+                    continue
+                # Se guarda la huella con la que corrió: si las entradas cambiaron mientras tanto, se vuelve a correr
+                estado["tareas"][nombre] = {"huella": actual, "salidas": _salidas(raiz, nombre, hashes)}
+                terminar(nombre, {"estado": "ejecutada", **medicion})
+            _guardar_estado(raiz, estado)
+
+    _guardar_estado(raiz, estado)
+    perfil = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "version": VERSION,
+        "workers": workers or os.cpu_count(),
+        "segundos": time.perf_counter() - inicio,
+        "tareas": [],
+    }
+    for nombre in seleccion:
+        r = resultados[nombre]
+        r["filas_por_segundo"] = r["filas"] / r["segundos"] if r["segundos"] > 0 else None
+        perfil["tareas"].append(r)
+    if ruta_perfil:
+        with open(ruta_perfil, "w", encoding="utf-8") as f:
+            json.dump(perfil, f, indent=1, ensure_ascii=False)
+    return perfil
+
+
+def imprimir_perfil(perfil):
+    print(f"{'tarea':<10} {'estado':<13} {'segundos':>9} {'RSS máx MB':>11} {'filas':>9} {'filas/s':>11}")
+    for r in perfil["tareas"]:
+        rss = f"{r['rss_max_mb']:.0f}" if r["rss_max_mb"] is not None else "-"
+        por_segundo = f"{r['filas_por_segundo']:.0f}" if r["filas_por_segundo"] else "-"
+        print(f"{r['tarea']:<10} {r['estado']:<13} {r['segundos']:9.2f} {rss:>11} {r['filas']:9d} {por_segundo:>11}")
+    print(f"{'total':<10} {'':<13} {perfil['segundos']:9.2f}")
+
+
+# --- Benchmark ---
+
+def _entradas_fuente(raiz=RAIZ, tareas=TAREAS):
+    """
+    Archivos de entrada que no produce ninguna tarea, más las historias que acumulan las tareas
+    con `historia`: lo que hay que copiar para correr todo.
+    """
+    producidas = {a for config in tareas.values() for s in config["salidas"] for a in _expandir(raiz, s)}
+    historias = {a for config in tareas.values() if config.get("historia")
+                 for s in config["salidas"] for a in _expandir(raiz, s)}
+    return sorted(({a for nombre, config in tareas.items() if not config.get("externa")
+                    for e in config["entradas"] for a in _expandir(raiz, e)} - producidas) | historias)
+
+
+def _comparar(perfil, ruta_anterior):
+    """Avisa las tareas que tardaron más de UMBRAL_REGRESION por encima del benchmark anterior."""
+    if not os.path.exists(ruta_anterior):
+        print(f"INFO: no hay benchmark anterior en {ruta_anterior}")
+        return []
+    with open(ruta_anterior, encoding="utf-8") as f:
+        anterior = {r["tarea"]: r for r in json.load(f)["tareas"]}
+    regresiones = []
+    for r in perfil["tareas"]:
+        previa = anterior.get(r["tarea"])
+        if previa is None or r["estado"] != "ejecutada" or previa["estado"] != "ejecutada":
+            continue
+        limite = max(previa["segundos"] * (1 + UMBRAL_REGRESION), previa["segundos"] + SEGUNDOS_MINIMOS_REGRESION)
+        if r["segundos"] > limite:
+            regresiones.append(r["tarea"])
+            print(f"⚠️ {r['tarea']}: {r['segundos']:.2f}s contra {previa['segundos']:.2f}s del benchmark anterior")
+    if not regresiones:
+        print("✅ Sin regresiones contra el benchmark anterior")
+    return regresiones
+
+
+def benchmark(raiz=RAIZ, workers=None, ruta_perfil=None):
+    """
+    Todo el pipeline sobre una copia de los datos del repo con los informes de muestra
+    (CARPETA_MUESTRA): en frío, al día, con una entrada tocada sin cambios y con una rueda
+    nueva de CCL. El perfil en frío se compara con el anterior y se guarda en `ruta_perfil`.
+    """
+    ruta_perfil = ruta_perfil or os.path.join(raiz, RUTA_PERFIL_BENCHMARK)
+    trabajo = tempfile.mkdtemp(prefix="bench_pipeline_")
+    cache_anterior = os.environ.get("CACHE_PLANILLAS")
+    # Las planillas convertidas van a la copia, para que la corrida en frío sea en frío
+    os.environ["CACHE_PLANILLAS"] = os.path.join(trabajo, "cache_planillas")
+    try:
+        for archivo in _entradas_fuente(raiz):
+            destino = os.path.join(trabajo, archivo)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            shutil.copy2(os.path.join(raiz, archivo), destino)
+        shutil.copytree(os.path.join(raiz, CARPETA_MUESTRA),
+                        os.path.join(trabajo, CARPETA_PDFS, os.path.basename(CARPETA_MUESTRA)))
+
+        corridas = []
+        frio = ejecutar(raiz=trabajo, workers=workers, verbose=False)
+        corridas.append(("en frío", frio))
+        # Los informes de muestra se agregan a la historia: no la reemplazan
+        for config in TAREAS.values():
+            if config.get("historia"):
+                for salida in config["salidas"]:
+                    antes, despues = (pq.read_table(os.path.join(r, salida), columns=["Fecha"])["Fecha"].to_pandas()
+                                      for r in (raiz, trabajo))
+                    if antes.min() < despues.min() or not antes.drop_duplicates().isin(despues).all():
+                        print(f"ERROR: {salida} perdió fechas de la historia ({len(antes)} -> {len(despues)} filas)")
+        corridas.append(("al día", ejecutar(raiz=trabajo, workers=workers, verbose=False)))
+
+        # Misma entrada con otra fecha de modificación: se rehashea pero no se corre nada
+        ggal = os.path.join(trabajo, "00-Cotizacion", "GGAL.csv")
+        os.utime(ggal, ns=(time.time_ns(), time.time_ns()))
+        corridas.append(("GGAL.csv tocado", ejecutar(raiz=trabajo, workers=workers, verbose=False)))
+
+        # Una rueda nueva de CCL: dolar, variables y entrenar
+        ccl = os.path.join(trabajo, "05-Cotizacion Dolar", "DOLAR CCL - Cotizaciones historicas.csv")
+        with open(ccl, encoding="utf-8") as f:
+            ultima = f.read().rstrip("\n").rsplit("\n", 1)[-1].split(",")
+        ultima[11] = f"{pd.Timestamp(ultima[11]) + pd.offsets.BDay(1):%Y-%m-%d}"
+        with open(ccl, "a", encoding="utf-8") as f:
+            f.write(",".join(ultima) + "\n")
+        corridas.append(("rueda nueva de CCL", ejecutar(raiz=trabajo, workers=workers, verbose=False)))
+
+        for nombre, perfil in corridas:
+            print(f"\n--- {nombre} ---")
+            imprimir_perfil(perfil)
+        fallidas = [r["tarea"] for _, p in corridas for r in p["tareas"] if r["estado"] in ("error", "omitida")]
+        if fallidas:
+            print(f"ERROR: tareas con error u omitidas: {fallidas} (logs en {trabajo})")
+            return frio
+
+        print()
+        _comparar(frio, ruta_perfil)
+        with open(ruta_perfil, "w", encoding="utf-8") as f:
+            json.dump(frio, f, indent=1, ensure_ascii=False)
+        print(f"INFO: perfil en frío guardado en {ruta_perfil}")
+        shutil.rmtree(trabajo, ignore_errors=True)
+        return frio
+    finally:
+        if cache_anterior is None:
+            os.environ.pop("CACHE_PLANILLAS", None)
+        else:
+            os.environ["CACHE_PLANILLAS"] = cache_anterior
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline completo del repo con perfil por tarea")
+    parser.add_argument("--tareas", nargs="+", help=f"Tareas a correr (con sus anteriores): {list(TAREAS)}")
+    parser.add_argument("--forzar", action="store_true", help="Correr aunque estén al día")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--perfil", help="Ruta del perfil JSON (por defecto .pipeline/perfil.json)")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(workers=args.workers, ruta_perfil=args.perfil)
+    else:
+        perfil = ejecutar(args.tareas, forzar=args.forzar, workers=args.workers,
+                          ruta_perfil=args.perfil or os.path.join(RAIZ, CARPETA_ESTADO, "perfil.json"))
+        imprimir_perfil(perfil)
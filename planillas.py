@@ -0,0 +1,377 @@
+"""
+Caché en parquet de las planillas Excel heredadas (.xls / .xlsx y las "xls" que en realidad
+son páginas HTML exportadas por Excel, como los *_Cotizaciones_Historicas.xls de bonos).
+
+Cada planilla se convierte una sola vez: todas sus hojas se guardan en
+CARPETA_CACHE/<planilla>/hoja_NNN.parquet y un indice.json con el tamaño, la fecha de
+modificación y el SHA-256 de los archivos de origen. `leer_planilla` devuelve la hoja desde
+el parquet y sólo vuelve a convertir si el origen cambió:
+
+    - mismo tamaño y misma fecha de modificación -> se usa el parquet sin leer el origen
+    - cambió la fecha pero no el SHA-256 (ej. copiado de nuevo) -> se actualiza indice.json
+    - cambió el contenido o VERSION -> se vuelve a convertir
+
+Las hojas se leen como pd.read_excel(header=None) y se guardan tipadas sin perder nada:
+cada columna de la hoja se parte según el tipo de sus celdas en "<j>:num" (float64),
+"<j>:fecha" (timestamp) y "<j>:texto" (string), y `leer_planilla` la vuelve a armar igual
+que la devuelve read_excel (los encabezados y notas mezclados con los datos incluidos).
+
+Uso:
+    from planillas import leer_planilla
+    df = leer_planilla("02-TasaLibreDeRiesgo/diar_bai.xls")            # hoja 0
+    df = leer_planilla("01-Inflacion/sh_ipc_2008.xls", "Serie Histórica")
+
+    python planillas.py [--reconstruir]       # convierte todas las PLANILLAS
+    python planillas.py --benchmark
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from html.parser import HTMLParser
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+# CACHE_PLANILLAS permite otra carpeta (ej. el benchmark de pipeline.py, para medir en frío)
+CARPETA_CACHE = os.environ.get("CACHE_PLANILLAS", os.path.join(RAIZ, "cache_planillas"))
+
+# Cambiar VERSION invalida todas las planillas convertidas (ej. si cambia la codificación)
+VERSION = 1
+TAMANIO_BLOQUE_HASH = 1 << 20
+
+PLANILLAS = [
+    "01-Inflacion/NO Series_estadisticas.xlsx",
+    "01-Inflacion/diario diar_cer 2002.xls",
+    "01-Inflacion/mensual IPCBA_base_2021100.xlsx",
+    "01-Inflacion/sh_ipc_2008.xls",
+    "02-TasaLibreDeRiesgo/diar_bai.xls",
+    "05-Cotizacion Dolar/com3500.xls",
+    "05-Cotizacion Dolar/AA17_Cotizaciones_Historicas.xls",
+    "05-Cotizacion Dolar/AA17D_Cotizaciones_Historicas.xls",
+    "05-Cotizacion Dolar/AY24_Cotizaciones_Historicas.xls",
+    "05-Cotizacion Dolar/AY24D_Cotizaciones_Historicas.xls",
+    "05-Cotizacion Dolar/RO15_Cotizaciones_Historicas.xls",
+    "05-Cotizacion Dolar/RO15D_Cotizaciones_Historicas.xls",
+]
+
+NUMERO_HTML = re.compile(r"-?(\d{1,3}(,\d{3})+|\d+)(\.\d+)?")
+
+
+# --- Planillas HTML ---
+
+class _TablaHTML(HTMLParser):
+    """Celdas (td/th) de las tablas de una página, fila por fila."""
+
+    def __init__(self):
+        super().__init__()
+        self.filas = []
+        self._celda = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self.filas.append([])
+        elif tag in ("td", "th") and self.filas:
+            self._celda = []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._celda is not None:
+            self.filas[-1].append(" ".join("".join(self._celda).split()))
+            self._celda = None
+
+    def handle_data(self, data):
+        if self._celda is not None:
+            self._celda.append(data)
+
+
+def _es_html(ruta):
+    with open(ruta, "rb") as f:
+        return f.read(512).lstrip().lower().startswith(b"<html")
+
+
+def _hojas_html(ruta):
+    """
+    Excel guarda "Página web" como un frameset (el .xls) y una página por hoja en
+    <nombre>_archivos/sheetNNN.htm. Devuelve [(nombre de hoja, ruta de la página)].
+    """
+    with open(ruta, encoding="latin-1") as f:
+        texto = f.read()
+    paginas = re.findall(r'<link id="shLink" href="([^"]+)"', texto)
+    if not paginas:
+        return [(os.path.splitext(os.path.basename(ruta))[0], ruta)]
+    nombres = re.findall(r'c_rgszSh\[\d+\] = "([^"]*)"', texto)
+    carpeta = os.path.dirname(ruta)
+    return [(nombres[i] if i < len(nombres) else f"Hoja{i + 1}", os.path.join(carpeta, pagina))
+            for i, pagina in enumerate(paginas)]
+
+
+def _celda_html(texto):
+    """Como la abre Excel: '1,592.00' -> 1592, '28.5' -> 28.5, '' -> NaN; el resto queda texto."""
+    if not texto:
+        return np.nan
+    if NUMERO_HTML.fullmatch(texto):
+        numero = float(texto.replace(",", ""))
+        return int(numero) if numero.is_integer() else numero
+    return texto
+
+
+def _leer_html(ruta):
+    hojas = {}
+    for nombre, pagina in _hojas_html(ruta):
+        tabla = _TablaHTML()
+        with open(pagina, encoding="latin-1") as f:
+            tabla.feed(f.read())
+        # Excel agrega una fila oculta de celdas vacías para fijar el ancho de las columnas
+        filas = [[_celda_html(c) for c in fila] for fila in tabla.filas if any(fila)]
+        hojas[nombre] = pd.DataFrame(filas)
+    return hojas
+
+
+def _archivos_origen(ruta):
+    """La planilla y, si es una página web de Excel, las páginas de sus hojas."""
+    if not _es_html(ruta):
+        return [ruta]
+    return [ruta] + [pagina for _, pagina in _hojas_html(ruta) if pagina != ruta]
+
+
+# --- Codificación tipada de una hoja ---
+
+def _tipo(valor):
+    if isinstance(valor, (bool, np.bool_)):
+        return "texto"
+    if isinstance(valor, (int, float, np.integer, np.floating)):
+        return None if np.isnan(valor) else "num"
+    if isinstance(valor, (datetime.datetime, np.datetime64)):
+        return None if pd.isna(valor) else "fecha"
+    return None if valor is None else "texto"
+
+
+def _codificar(df):
+    """Hoja de read_excel(header=None) -> tabla de Arrow con una columna por (columna, tipo)."""
+    columnas = {}
+    for j in range(df.shape[1]):
+        valores = df.iloc[:, j].to_numpy(dtype=object)
+        tipos = np.array([_tipo(v) for v in valores], dtype=object)
+        for tipo in ("num", "fecha", "texto"):
+            mascara = tipos == tipo
+            if not mascara.any():
+                continue
+            if tipo == "num":
+                columna = pa.array(np.where(mascara, valores, np.nan).astype("float64"), mask=~mascara)
+            elif tipo == "fecha":
+                columna = pa.array(pd.to_datetime(np.where(mascara, valores, pd.NaT)).astype("datetime64[ns]"))
+            else:
+                columna = pa.array([str(v) if m else None for v, m in zip(valores, mascara)], pa.string())
+            columnas[f"{j}:{tipo}"] = columna
+    tabla = pa.table(columnas) if columnas else pa.table({})
+    return tabla.replace_schema_metadata({"filas": str(len(df)), "columnas": str(df.shape[1])})
+
+
+def _decodificar(tabla):
+    """Inversa de `_codificar`: el mismo DataFrame que devuelve read_excel(header=None)."""
+    metadatos = tabla.schema.metadata
+    filas, n_columnas = int(metadatos[b"filas"]), int(metadatos[b"columnas"])
+    partes = {}
+    for nombre in tabla.column_names:
+        j, tipo = nombre.split(":")
+        partes.setdefault(int(j), {})[tipo] = tabla.column(nombre)
+
+    datos = {}
+    for j in range(n_columnas):
+        tipos = partes.get(j, {})
+        if not tipos:
+            datos[j] = np.full(filas, np.nan)
+        elif list(tipos) == ["num"]:
+            numeros = tipos["num"].to_numpy(zero_copy_only=False)
+            enteros = not np.isnan(numeros).any() and np.array_equal(numeros, np.trunc(numeros))
+            datos[j] = numeros.astype("int64") if enteros else numeros
+        elif list(tipos) == ["fecha"]:
+            datos[j] = tipos["fecha"].to_pandas()
+        elif list(tipos) == ["texto"]:
+            datos[j] = tipos["texto"].to_pandas()
+        else:
+            # Columna mezclada: objetos de Python, enteros como int, igual que read_excel
+            columna = np.full(filas, np.nan, dtype=object)
+            if "num" in tipos:
+                numeros = tipos["num"].to_numpy(zero_copy_only=False)
+                hay = ~np.isnan(numeros)
+                enteros = hay & (numeros == np.trunc(numeros))
+                columna[hay] = numeros[hay].astype(object)
+                columna[enteros] = numeros[enteros].astype("int64").astype(object)
+            if "fecha" in tipos:
+                fechas = tipos["fecha"]
+                hay = fechas.is_valid().to_numpy(zero_copy_only=False)
+                # datetime64[us] -> datetime.datetime sin pasar por Timestamp (mucho más rápido)
+                columna[hay] = fechas.to_numpy(zero_copy_only=False)[hay].astype("datetime64[us]").astype(object)
+            if "texto" in tipos:
+                textos = tipos["texto"]
+                hay = textos.is_valid().to_numpy(zero_copy_only=False)
+                columna[hay] = textos.to_numpy(zero_copy_only=False)[hay]
+            datos[j] = columna
+    return pd.DataFrame(datos, index=pd.RangeIndex(filas))
+
+
+# --- Caché ---
+
+def _hash_archivos(rutas):
+    sha = hashlib.sha256(str(VERSION).encode())
+    for ruta in rutas:
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(TAMANIO_BLOQUE_HASH), b""):
+                sha.update(bloque)
+    return sha.hexdigest()
+
+
+def _firma(rutas):
+    """(tamaño, fecha de modificación en ns) de cada archivo: lo que se mira antes de hashear."""
+    return [[os.stat(r).st_size, os.stat(r).st_mtime_ns] for r in rutas]
+
+
+def _carpeta_planilla(ruta, raiz, carpeta_cache):
+    relativa = os.path.relpath(os.path.abspath(ruta), raiz)
+    if relativa.startswith(".."):
+        # Planilla fuera de la raíz (ej. una copia de trabajo): nombre + hash de su carpeta
+        carpeta = hashlib.sha256(os.path.dirname(os.path.abspath(ruta)).encode()).hexdigest()[:12]
+        relativa = f"{carpeta}__{os.path.basename(ruta)}"
+    return os.path.join(carpeta_cache, relativa.replace(os.sep, "__").replace("/", "__"))
+
+
+def _leer_indice(carpeta):
+    try:
+        with open(os.path.join(carpeta, "indice.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir_indice(carpeta, indice):
+    ruta = os.path.join(carpeta, "indice.json")
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(indice, f, indent=1, ensure_ascii=False)
+    os.replace(ruta + ".tmp", ruta)
+
+
+def convertir(ruta, reconstruir=False, raiz=RAIZ, carpeta_cache=CARPETA_CACHE, verbose=True):
+    """
+    Deja al día la conversión de la planilla `ruta` (absoluta o relativa a `raiz`) y devuelve
+    su indice.json. Sólo lee el Excel si el origen cambió o si `reconstruir`.
+    """
+    ruta = os.path.join(raiz, ruta)
+    carpeta = _carpeta_planilla(ruta, raiz, carpeta_cache)
+    origen = _archivos_origen(ruta)
+    firma = _firma(origen)
+    indice = _leer_indice(carpeta)
+    if not reconstruir and indice is not None and indice["version"] == VERSION:
+        if indice["firma"] == firma:
+            return indice
+        sha = _hash_archivos(origen)
+        if indice["sha256"] == sha:
+            _escribir_indice(carpeta, {**indice, "firma": firma})
+            return {**indice, "firma": firma}
+    else:
+        sha = _hash_archivos(origen)
+
+    inicio = time.perf_counter()
+    hojas = _leer_html(ruta) if _es_html(ruta) else pd.read_excel(ruta, sheet_name=None, header=None)
+    shutil.rmtree(carpeta, ignore_errors=True)
+    os.makedirs(carpeta)
+    for i, df in enumerate(hojas.values()):
+        pq.write_table(_codificar(df), os.path.join(carpeta, f"hoja_{i:03d}.parquet"))
+    # indice.json se escribe al final: si la conversión se corta, la planilla queda sin convertir
+    indice = {"origen": os.path.relpath(ruta, raiz), "version": VERSION, "sha256": sha,
+              "firma": firma, "hojas": list(hojas)}
+    _escribir_indice(carpeta, indice)
+    if verbose:
+        print(f"INFO: {indice['origen']} convertida ({len(hojas)} hojas) en {time.perf_counter() - inicio:.2f}s")
+    return indice
+
+
+def leer_planilla(ruta, hoja=0, raiz=RAIZ, carpeta_cache=CARPETA_CACHE):
+    """
+    Hoja `hoja` (posición o nombre) de la planilla, como pd.read_excel(ruta, sheet_name=hoja,
+    header=None), leída del parquet convertido.
+    """
+    indice = convertir(ruta, raiz=raiz, carpeta_cache=carpeta_cache, verbose=False)
+    posicion = indice["hojas"].index(hoja) if isinstance(hoja, str) else hoja
+    carpeta = _carpeta_planilla(os.path.join(raiz, ruta), raiz, carpeta_cache)
+    return _decodificar(pq.read_table(os.path.join(carpeta, f"hoja_{posicion:03d}.parquet")))
+
+
+def hojas_planilla(ruta, raiz=RAIZ, carpeta_cache=CARPETA_CACHE):
+    """Nombres de las hojas de la planilla, en orden."""
+    return convertir(ruta, raiz=raiz, carpeta_cache=carpeta_cache, verbose=False)["hojas"]
+
+
+def convertir_todas(planillas=PLANILLAS, reconstruir=False, raiz=RAIZ, carpeta_cache=CARPETA_CACHE):
+    for ruta in planillas:
+        try:
+            convertir(ruta, reconstruir, raiz, carpeta_cache)
+        except Exception as e:
+            print(f"ERROR: no se pudo convertir {ruta}: {e}")
+
+
+def benchmark(planillas=PLANILLAS, raiz=RAIZ):
+    """
+    Lectura de todas las hojas desde el Excel contra la caché vacía y la caché al día.
+
+    Para las planillas HTML la referencia es el mismo `_leer_html` (no hay un lector
+    independiente sin lxml): "idéntica" sólo verifica la ida y vuelta por el parquet.
+    """
+    carpeta_cache = tempfile.mkdtemp(prefix="bench_planillas_")
+    try:
+        print(f"{'planilla':>45} | {'Excel':>7} | {'convertir':>9} | {'parquet':>8} | idéntica")
+        totales = np.zeros(3)
+        hay_html = False
+        for ruta in planillas:
+            absoluta = os.path.join(raiz, ruta)
+            html = _es_html(absoluta)
+            hay_html |= html
+            inicio = time.perf_counter()
+            original = (_leer_html(absoluta) if html
+                        else pd.read_excel(absoluta, sheet_name=None, header=None))
+            excel = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            convertir(ruta, raiz=raiz, carpeta_cache=carpeta_cache, verbose=False)
+            conversion = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            leidas = {nombre: leer_planilla(ruta, i, raiz, carpeta_cache)
+                      for i, nombre in enumerate(hojas_planilla(ruta, raiz, carpeta_cache))}
+            parquet = time.perf_counter() - inicio
+
+            identica = list(leidas) == list(original)
+            for nombre, df in original.items():
+                try:
+                    pd.testing.assert_frame_equal(leidas[nombre], df, check_dtype=False, check_column_type=False)
+                except (AssertionError, KeyError):
+                    identica = False
+            totales += (excel, conversion, parquet)
+            print(f"{os.path.basename(ruta):>45} | {excel:6.3f}s | {conversion:8.3f}s | "
+                  f"{parquet * 1000:6.1f}ms | {'sí' if identica else 'NO'}{'*' if html else ''}")
+        print(f"{'total':>45} | {totales[0]:6.3f}s | {totales[1]:8.3f}s | {totales[2] * 1000:6.1f}ms")
+        if hay_html:
+            print("* página web de Excel: la referencia es el mismo parser HTML, sólo se verifica el parquet "
+                  "(no se comparó con un lector independiente)")
+    finally:
+        shutil.rmtree(carpeta_cache, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caché en parquet de las planillas Excel")
+    parser.add_argument("--reconstruir", action="store_true")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        convertir_todas(reconstruir=args.reconstruir)